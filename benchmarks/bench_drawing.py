@@ -0,0 +1,85 @@
+# benchmarks/bench_drawing.py
+"""
+Compara el dibujo del esqueleto landmark a landmark (una llamada a ``cv2.line``
+por conexión y a ``cv2.circle`` por punto, con la conversión a píxeles en Python)
+con ``SkeletonRenderer``, y pone ambos junto al coste de codificar el fotograma.
+
+Uso:
+    python -m benchmarks.bench_drawing [--width 1080] [--height 1920] [--frames 300]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from mediapipe.python.solutions.pose import POSE_CONNECTIONS
+
+from src.F_visualization.drawing_utils import SkeletonRenderer
+
+LINE_COLOR, POINT_COLOR = (0, 255, 0), (0, 0, 255)
+
+
+def legacy_draw(image: np.ndarray, landmarks: np.ndarray) -> None:
+    h, w, _ = image.shape
+    visible = landmarks[:, 3] > 0.5
+    points = [(int(x * w), int(y * h)) if v else None for x, y, v in zip(landmarks[:, 0], landmarks[:, 1], visible)]
+    for start_idx, end_idx in POSE_CONNECTIONS:
+        if points[start_idx] and points[end_idx]:
+            cv2.line(image, points[start_idx], points[end_idx], LINE_COLOR, 2)
+    for point in points:
+        if point:
+            cv2.circle(image, point, 4, POINT_COLOR, -1)
+
+
+def fake_pose(rng: np.random.Generator, n_frames: int) -> np.ndarray:
+    """Landmarks plausibles: un cuerpo en el centro del encuadre que se mueve poco entre fotogramas."""
+    base = np.column_stack([0.4 + 0.2 * rng.random(33), 0.2 + 0.6 * rng.random(33)])
+    drift = np.cumsum(rng.normal(0, 0.002, (n_frames, 33, 2)), axis=0)
+    landmarks = np.empty((n_frames, 33, 4), dtype=np.float32)
+    landmarks[..., :2] = base + drift
+    landmarks[..., 2] = 0.0
+    landmarks[..., 3] = rng.random((n_frames, 33)) * 0.5 + 0.5
+    return landmarks
+
+
+def time_per_frame(fn, n_frames: int) -> float:
+    fn(0)
+    start = time.perf_counter()
+    for i in range(n_frames):
+        fn(i)
+    return (time.perf_counter() - start) / n_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=1080)
+    parser.add_argument('--height', type=int, default=1920)
+    parser.add_argument('--frames', type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    landmarks = fake_pose(rng, args.frames)
+    renderer = SkeletonRenderer(LINE_COLOR, POINT_COLOR, 2, 4)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = cv2.VideoWriter(
+            os.path.join(tmp, 'bench.mp4'), cv2.VideoWriter_fourcc(*'mp4v'), 30, (args.width, args.height)
+        )
+        encode = time_per_frame(lambda i: writer.write(frame), args.frames)
+        writer.release()
+
+    results = {
+        'por landmark': time_per_frame(lambda i: legacy_draw(frame, landmarks[i]), args.frames),
+        'vectorizado': time_per_frame(lambda i: renderer.draw(frame, landmarks[i]), args.frames),
+    }
+    print(f"Fotograma {args.width}x{args.height}, {args.frames} fotogramas:")
+    for name, elapsed in results.items():
+        print(f"  {name:<13} {elapsed * 1e3:7.3f} ms/fotograma  ({elapsed / encode:6.1%} de la codificación)")
+    print(f"  {'codificación':<13} {encode * 1e3:7.3f} ms/fotograma")
+
+
+if __name__ == '__main__':
+    main()
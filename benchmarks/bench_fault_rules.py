@@ -0,0 +1,103 @@
+# benchmarks/bench_fault_rules.py
+"""
+Mide la evaluación de reglas de fallo sobre una sesión sintética larga: el
+``FaultEngine`` vectorizado frente a recorrer repetición a repetición y regla a
+regla con pandas (la forma directa de escribir cada comprobación).
+
+Uso:
+    python -m benchmarks.bench_fault_rules [--minutes 30] [--fps 30] [--rules 20]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import FaultRule, settings
+from src.constants import FaultReduce, FaultType, FaultWindow
+from src.D_modeling.exercise_analyzer import segment_repetitions
+from src.D_modeling.fault_engine import FaultEngine, exercise_fault_rules
+
+COLUMNS = ['rodilla_izq', 'rodilla_der', 'cadera_izq', 'cadera_der']
+
+
+def fake_session(rng: np.random.Generator, minutes: float, fps: int) -> pd.DataFrame:
+    """Sentadillas de ~3 s con ruido y algún NaN, con las columnas que usan las reglas."""
+    n = int(minutes * 60 * fps)
+    time_s = np.arange(n) / fps
+    knee = 120 + 50 * np.cos(2 * np.pi * time_s / 3.3) + rng.normal(0, 0.5, n)
+    df = pd.DataFrame({'frame_idx': np.arange(n), 'time_s': time_s})
+    for i, name in enumerate(COLUMNS):
+        df[name] = knee + rng.normal(0, 8, n) + 3 * i
+        df.loc[rng.random(n) < 0.02, name] = np.nan
+    df['rodilla_izq'] = knee
+    return df
+
+
+def synthetic_rules(rng: np.random.Generator, base: list, total: int) -> list:
+    """Completa las reglas del ejercicio hasta ``total`` combinando tramos, reducciones y columnas."""
+    rules = list(base)
+    windows, reduces = list(FaultWindow), list(FaultReduce)
+    for k in range(max(0, total - len(rules))):
+        rules.append(FaultRule(
+            name=f'regla_{k}', metric=COLUMNS[k % 4], minus=COLUMNS[(k + 1) % 4] if k % 2 else None,
+            absolute=k % 3 == 0, window=windows[k % 3], reduce=reduces[k % 5], max=float(rng.uniform(0, 150))
+        ))
+    return rules
+
+
+def loop_evaluate(df: pd.DataFrame, reps, rules: list) -> int:
+    frames = df['frame_idx'].to_numpy()
+    n_faults = 0
+    for r in range(reps.count):
+        start, bottom, end = (int(np.searchsorted(frames, x[r])) for x in (reps.start, reps.bottom, reps.end))
+        bounds = {FaultWindow.REP: (start, end), FaultWindow.DESCENT: (start, bottom), FaultWindow.ASCENT: (bottom, end)}
+        for rule in rules:
+            a, b = bounds[rule.window]
+            window = df.iloc[a:b + 1]
+            if rule.type == FaultType.DURATION:
+                value = window['time_s'].iloc[-1] - window['time_s'].iloc[0]
+            else:
+                signal = window[rule.metric] - (window[rule.minus] if rule.minus else 0)
+                if rule.absolute:
+                    signal = signal.abs()
+                if rule.reduce == FaultReduce.RISE:
+                    value = signal.iloc[-1] - signal.iloc[0]
+                elif rule.reduce == FaultReduce.RANGE:
+                    value = signal.max() - signal.min()
+                else:
+                    value = getattr(signal, rule.reduce.value)()
+            if (rule.min is not None and value < rule.min) or (rule.max is not None and value > rule.max):
+                n_faults += 1
+    return n_faults
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=30)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--rules', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    params = settings.exercises['squat']
+    df = fake_session(rng, args.minutes, args.fps)
+    reps = segment_repetitions(df, params)
+    rules = synthetic_rules(rng, exercise_fault_rules(params), args.rules)
+
+    start = time.perf_counter()
+    engine = FaultEngine(rules)
+    faults = engine.evaluate(df, reps)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    n_loop = loop_evaluate(df, reps, rules)
+    loop = time.perf_counter() - start
+
+    print(f"{len(df)} fotogramas, {reps.count} repeticiones, {len(rules)} reglas:")
+    print(f"  vectorizado  {vectorized * 1e3:9.1f} ms  ({len(faults)} fallos)")
+    print(f"  por bucle    {loop * 1e3:9.1f} ms  ({n_loop} fallos)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_metrics.py
+"""
+Mide cuánto cuesta añadir métricas a un ejercicio: evalúa las métricas de la
+sentadilla de config.yaml y después las mismas más 15 de los tipos extendidos
+(distancias, desplazamientos horizontales, inclinación del tronco, velocidades,
+aceleraciones y simetrías) sobre landmarks sintéticos de una sesión larga.
+
+Uso:
+    python -m benchmarks.bench_metrics [--minutes 30] [--fps 30] [--runs 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.config import MetricDefinition, settings
+from src.B_pose_estimation.landmarks import LandmarkSequence, VISIBILITY
+from src.D_modeling.metric_engine import MetricEngine
+
+EXTENDED = [
+    {'name': 'separacion_pies', 'type': 'distance', 'point_names': ['LEFT_ANKLE', 'RIGHT_ANKLE']},
+    {'name': 'anchura_hombros', 'type': 'distance', 'point_names': ['LEFT_SHOULDER', 'RIGHT_SHOULDER']},
+    {'name': 'muslo_izq', 'type': 'distance', 'point_names': ['LEFT_HIP', 'LEFT_KNEE']},
+    {'name': 'rodilla_sobre_pie', 'type': 'horizontal_displacement', 'point_names': ['LEFT_KNEE', 'LEFT_FOOT_INDEX']},
+    {'name': 'deriva_cadera', 'type': 'horizontal_displacement', 'point_name': 'LEFT_HIP'},
+    {'name': 'deriva_hombro', 'type': 'horizontal_displacement', 'point_name': 'LEFT_SHOULDER'},
+    {'name': 'inclinacion_tronco', 'type': 'torso_lean'},
+    {'name': 'codo_izq', 'type': 'angle', 'point_names': ['LEFT_SHOULDER', 'LEFT_ELBOW', 'LEFT_WRIST']},
+    {'name': 'vel_rodilla_izq', 'type': 'angular_velocity', 'sources': ['rodilla_izq']},
+    {'name': 'vel_rodilla_der', 'type': 'angular_velocity', 'sources': ['rodilla_der']},
+    {'name': 'vel_cadera_izq', 'type': 'angular_velocity', 'sources': ['cadera_izq']},
+    {'name': 'acel_rodilla_izq', 'type': 'angular_acceleration', 'sources': ['rodilla_izq']},
+    {'name': 'acel_rodilla_der', 'type': 'angular_acceleration', 'sources': ['rodilla_der']},
+    {'name': 'simetria_rodillas', 'type': 'symmetry', 'sources': ['rodilla_izq', 'rodilla_der']},
+    {'name': 'simetria_vel_rodillas', 'type': 'symmetry', 'sources': ['vel_rodilla_izq', 'vel_rodilla_der']},
+]
+
+
+def fake_landmarks(rng: np.random.Generator, n_frames: int) -> LandmarkSequence:
+    image = rng.random((n_frames, 33, 4)).astype(np.float32)
+    world = rng.normal(0, 0.5, (n_frames, 33, 4)).astype(np.float32)
+    world[..., VISIBILITY] = image[..., VISIBILITY]
+    return LandmarkSequence.from_arrays(image, world)
+
+
+def best_time(engine: MetricEngine, landmarks: LandmarkSequence, fps: int, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine.evaluate(landmarks, fps)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=30)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    landmarks = fake_landmarks(np.random.default_rng(0), int(args.minutes * 60 * args.fps))
+    base = list(settings.exercises['squat'].metric_definitions)
+    extended = base + [MetricDefinition(**metric) for metric in EXTENDED]
+
+    print(f"{len(landmarks)} fotogramas:")
+    for definitions in (base, extended):
+        elapsed = best_time(MetricEngine(definitions), landmarks, args.fps, args.runs)
+        print(f"  {len(definitions):3d} métricas  {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_preprocessing.py
+"""
+Compara el preprocesado de fotogramas antiguo (rotar el original, redimensionar
+a un fotograma nuevo, copiarlo al anillo y convertir a RGB en el estimador) con
+el ``FramePreprocessor`` fusionado que escribe directamente en un buffer reservado.
+
+Mide, por fotograma, los bytes reservados (con tracemalloc, que ve las
+reservas de numpy y de OpenCV) y el tiempo medio.
+
+Uso:
+    python -m benchmarks.bench_preprocessing [--width 1920] [--height 1080] [--frames 200]
+"""
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.A_preprocessing.frame_extraction import FramePreprocessor, rotate_frame
+
+
+def legacy_path(frame: np.ndarray, out: np.ndarray, rotate: int, size) -> np.ndarray:
+    rotated = rotate_frame(frame, rotate)
+    resized = cv2.resize(rotated, size, interpolation=cv2.INTER_LINEAR)
+    out[...] = resized
+    # Conversión que hacía el estimador en cada fotograma
+    return cv2.cvtColor(out, cv2.COLOR_BGR2RGB)
+
+
+def measure(fn, frames: int):
+    fn()  # Primera llamada fuera de la medida (reservas de una sola vez)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    allocated = 0
+    for _ in range(frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return allocated / frames, elapsed / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--rotate', type=int, default=90)
+    parser.add_argument('--size', type=int, nargs=2, default=[480, 854], metavar=('W', 'H'))
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    frame = np.random.randint(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+    size = tuple(args.size)
+    preprocessor = FramePreprocessor(args.rotate, size, to_rgb=True)
+    out = np.empty(preprocessor.output_shape(frame.shape), dtype=np.uint8)
+
+    results = {
+        'antiguo': measure(lambda: legacy_path(frame, out, args.rotate, size), args.frames),
+        'fusionado': measure(lambda: preprocessor(frame, out=out), args.frames),
+    }
+    print(f"Fotograma {args.width}x{args.height}, rotación {args.rotate}, salida {size[0]}x{size[1]}:")
+    for name, (allocated, elapsed) in results.items():
+        print(f"  {name:<10} {allocated / 1e6:8.2f} MB reservados/fotograma  {elapsed * 1e3:7.2f} ms/fotograma")
+    saved = results['antiguo'][0] - results['fusionado'][0]
+    print(f"  Ahorro: {saved / 1e6:.2f} MB reservados por fotograma")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_render_modes.py
+"""
+Compara los dos modos de renderizado del vídeo de depuración:
+
+- ``inline``: los originales viajan por el grafo junto a la estimación de pose y
+  se dibujan en cuanto llegan sus landmarks. El vídeo se decodifica una vez, pero
+  cada fotograma en vuelo (anillo de pose + originales esperando al render) ocupa
+  memoria a resolución completa.
+- ``redecode``: la estimación de pose solo conserva los landmarks y el vídeo se
+  vuelve a decodificar al final para dibujarlo. La memoria de fotogramas se
+  reduce a la del anillo de pose, a cambio de una segunda decodificación.
+
+Cada modo se ejecuta en un proceso propio para que el pico de memoria (RSS
+máximo del proceso principal; los procesos de pose no cambian entre modos) no
+arrastre el de la ejecución anterior. La caché de landmarks se desactiva.
+
+Uso:
+    python -m benchmarks.bench_render_modes VIDEO [--rotate 90] [--exercise squat] [--runs 1]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ('inline', 'redecode')
+
+
+def run_child(args) -> None:
+    """Ejecuta el pipeline una vez en este proceso e imprime tiempo y pico de memoria en JSON."""
+    from src.config import settings
+    from src.pipeline import run_full_pipeline_in_memory
+
+    settings.performance_params.render_mode = args.mode
+    settings.performance_params.landmark_cache_mb = 0
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        run_full_pipeline_in_memory(args.video, {
+            'output_dir': output_dir, 'rotate': args.rotate, 'exercise': args.exercise,
+            'generate_debug_video': True,
+        })
+        elapsed = time.perf_counter() - start
+    # En Linux ru_maxrss está en KB
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({'elapsed': elapsed, 'peak_rss': peak_rss}))
+
+
+def measure(args, mode: str) -> dict:
+    command = [
+        sys.executable, '-m', 'benchmarks.bench_render_modes', args.video, '--child', mode,
+        '--rotate', str(args.rotate), '--exercise', args.exercise,
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('video')
+    parser.add_argument('--rotate', type=int, default=0)
+    parser.add_argument('--exercise', default='squat')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--child', dest='mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_child(args)
+        return
+
+    print(f"Vídeo: {os.path.basename(args.video)} ({args.runs} ejecución/es por modo)")
+    for mode in MODES:
+        results = [measure(args, mode) for _ in range(args.runs)]
+        elapsed = min(r['elapsed'] for r in results)
+        peak_rss = max(r['peak_rss'] for r in results)
+        print(f"  {mode:<9} {elapsed:7.2f} s  pico RSS {peak_rss / 1e6:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
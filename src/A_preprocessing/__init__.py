@@ -1,5 +1,6 @@
 """Preprocessing utilities."""
 
+from .video_metadata import VideoProbe, probe_video
 from .video_utils import validate_video
 
-__all__ = ["validate_video"]
+__all__ = ["VideoProbe", "probe_video", "validate_video"]
@@ -2,24 +2,161 @@
 
 import cv2
 import os
+import queue
 import logging
-from typing import List, Tuple, Optional
+import threading
+import numpy as np
+from typing import List, Tuple, Optional, Iterator, NamedTuple
 
 # --- CAMBIO CLAVE: Importamos la constante desde el fichero correcto ---
 from src.constants import VIDEO_EXTENSIONS
+from src.A_preprocessing.video_metadata import probe_video
 
 logger = logging.getLogger(__name__)
 
-def extract_and_preprocess_frames(
-    video_path: str, 
-    rotate: Optional[int] = None, 
-    sample_rate: int = 1
-) -> Tuple[List, float]:
+# Tamaño por defecto del buffer de prefetch (en fotogramas)
+DEFAULT_PREFETCH = 32
+
+_ROTATE_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+# Marcador de fin de stream que el hilo decodificador envía al consumidor
+_END_OF_STREAM = object()
+# Marcador de fin de tramo en la decodificación en paralelo
+_END_OF_CHUNK = object()
+
+# Fotogramas (del vídeo original) de cada tramo en la decodificación en paralelo
+DEFAULT_DECODE_CHUNK = 64
+
+
+# Ancho (px) de la miniatura en escala de grises con la que se mide el movimiento
+MOTION_THUMB_WIDTH = 64
+
+
+class FrameItem(NamedTuple):
     """
-    Extrae fotogramas de un vídeo, los rota si es necesario y aplica un sample rate.
+    Un fotograma decodificado junto a su posición en la secuencia muestreada
+    (``index``), su posición en el vídeo original (``source_index``) y su instante
+    real en segundos (``timestamp``), válido también con muestreo no uniforme.
+    """
+    index: int
+    timestamp: float
+    frame: np.ndarray
+    source_index: int
+
+
+class MotionSampler:
+    """
+    Muestreo adaptativo por movimiento. Compara una miniatura en escala de grises
+    de cada fotograma con la del último fotograma conservado y descarta los casi
+    estáticos (diferencia media absoluta por debajo de ``threshold``, en niveles de
+    gris 0-255). Tras ``max_skip`` descartes seguidos se conserva uno igualmente,
+    para no dejar huecos arbitrariamente largos.
+    """
+    def __init__(self, threshold: float, max_skip: int):
+        self.threshold = threshold
+        self.max_skip = max(0, int(max_skip))
+        self._reference: Optional[np.ndarray] = None
+        self._skipped = 0
+
+    @staticmethod
+    def thumbnail(frame: np.ndarray) -> np.ndarray:
+        """Miniatura en escala de grises con la que se compara el fotograma."""
+        h, w = frame.shape[:2]
+        thumb_size = (MOTION_THUMB_WIDTH, max(1, round(h * MOTION_THUMB_WIDTH / w)))
+        return cv2.cvtColor(cv2.resize(frame, thumb_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+    def keep(self, frame: np.ndarray) -> bool:
+        """Decide si el fotograma se conserva y, en ese caso, lo toma como nueva referencia."""
+        return self.keep_thumbnail(self.thumbnail(frame))
+
+    def keep_thumbnail(self, thumb: np.ndarray) -> bool:
+        """Como ``keep``, a partir de una miniatura ya calculada con ``thumbnail``."""
+        if (self._reference is None or self._skipped >= self.max_skip
+                or cv2.absdiff(thumb, self._reference).mean() >= self.threshold):
+            self._reference = thumb
+            self._skipped = 0
+            return True
+        self._skipped += 1
+        return False
+
+
+def rotate_frame(frame: np.ndarray, rotate: Optional[int]) -> np.ndarray:
+    """Rota un fotograma 90, 180 o 270 grados en sentido horario."""
+    code = _ROTATE_CODES.get(rotate) if rotate else None
+    return cv2.rotate(frame, code) if code is not None else frame
+
+
+class FramePreprocessor:
+    """
+    Rotación, redimensionado y conversión BGR->RGB de un fotograma en una sola
+    pasada sobre un buffer de salida ya reservado (p. ej. un slot del anillo
+    compartido), sin crear fotogramas intermedios a tamaño completo.
+
+    Cuando hay que redimensionar, se redimensiona primero (a las dimensiones
+    previas a la rotación) y se rota después el fotograma pequeño. El buffer
+    auxiliar de ese paso se reutiliza entre llamadas, así que cada instancia
+    debe usarse desde un único hilo.
     """
+    def __init__(
+        self,
+        rotate: Optional[int] = None,
+        size: Optional[Tuple[int, int]] = None,
+        to_rgb: bool = False,
+        interpolation: int = cv2.INTER_LINEAR
+    ):
+        self.rotate_code = _ROTATE_CODES.get(rotate) if rotate else None
+        self.size = tuple(size) if size else None
+        self.to_rgb = to_rgb
+        self.interpolation = interpolation
+        self._scratch: Optional[np.ndarray] = None
+
+    @property
+    def _swaps_axes(self) -> bool:
+        return self.rotate_code in (cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE)
+
+    def output_shape(self, frame_shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        """Forma del fotograma procesado a partir de la del fotograma decodificado."""
+        height, width = frame_shape[:2]
+        if self.size:
+            width, height = self.size
+        elif self._swaps_axes:
+            height, width = width, height
+        return (height, width) + tuple(frame_shape[2:])
+
+    def __call__(self, frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Procesa ``frame`` y escribe el resultado en ``out`` (que se crea si no se pasa)."""
+        if out is None:
+            out = np.empty(self.output_shape(frame.shape), dtype=frame.dtype)
+
+        src = frame
+        if self.size:
+            if self.rotate_code is None:
+                cv2.resize(src, self.size, dst=out, interpolation=self.interpolation)
+                src = out
+            else:
+                resized_size = self.size[::-1] if self._swaps_axes else self.size
+                scratch_shape = (resized_size[1], resized_size[0]) + frame.shape[2:]
+                if self._scratch is None or self._scratch.shape != scratch_shape or self._scratch.dtype != frame.dtype:
+                    self._scratch = np.empty(scratch_shape, dtype=frame.dtype)
+                src = cv2.resize(src, resized_size, dst=self._scratch, interpolation=self.interpolation)
+        if self.rotate_code is not None:
+            src = cv2.rotate(src, self.rotate_code, dst=out)
+
+        # La conversión a RGB se hace una sola vez, ya sobre el buffer de salida
+        if self.to_rgb:
+            cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=out)
+        elif src is not out:
+            np.copyto(out, src)
+        return out
+
+
+def _check_video_path(video_path: str) -> None:
     ext = os.path.splitext(video_path)[1].lower()
-    
+
     # La comprobación ahora usa la constante importada directamente
     if ext not in VIDEO_EXTENSIONS:
         raise ValueError(f"Formato de vídeo no soportado: {ext}. Soportados: {VIDEO_EXTENSIONS}")
@@ -27,37 +164,249 @@ def extract_and_preprocess_frames(
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"El fichero de vídeo no se encuentra en la ruta: {video_path}")
 
-    logger.info(f"Iniciando extracción para: {video_path}")
-    cap = cv2.VideoCapture(video_path)
-    
-    if not cap.isOpened():
-        raise IOError(f"No se pudo abrir el fichero de vídeo: {video_path}")
-
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    logger.info(f"Propiedades del vídeo: {total_frames} frames, {fps:.2f} FPS")
-
-    frames = []
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        if rotate and rotate != 0:
-            if rotate == 90:
-                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-            elif rotate == 180:
-                frame = cv2.rotate(frame, cv2.ROTATE_180)
-            elif rotate == 270:
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-
-        frames.append(frame)
-
-        # Saltamos frames innecesarios usando grab para optimizar
-        for _ in range(sample_rate - 1):
+
+class FrameStream:
+    """
+    Fuente de fotogramas en streaming. Decodifica el vídeo en un hilo de fondo y
+    entrega los fotogramas uno a uno a través de un buffer acotado, de modo que la
+    memoria usada depende de ``prefetch`` y no de la duración del clip.
+
+    Cada iteración abre su propia captura, por lo que el stream puede recorrerse
+    varias veces. Con ``prefetch=0`` la decodificación se hace en el hilo del consumidor.
+
+    Con ``motion_threshold > 0``, además del ``sample_rate`` fijo se descartan los
+    fotogramas casi estáticos (ver ``MotionSampler``); cada fotograma conservado
+    lleva su timestamp real.
+
+    Con ``decode_workers > 1`` el vídeo se divide en tramos de ``decode_chunk``
+    fotogramas que decodifican varios hilos, cada uno con su propia captura, y se
+    entregan en orden. OpenCV libera el GIL al decodificar, así que los hilos se
+    reparten los núcleos sin copiar los fotogramas entre procesos. Cada hilo
+    adelanta hasta un tramo, por lo que la memoria crece a
+    ``decode_workers * decode_chunk`` fotogramas.
+    """
+    def __init__(
+        self,
+        video_path: str,
+        rotate: Optional[int] = None,
+        sample_rate: int = 1,
+        prefetch: int = DEFAULT_PREFETCH,
+        motion_threshold: float = 0.0,
+        motion_max_skip: int = 15,
+        decode_workers: int = 1,
+        decode_chunk: int = DEFAULT_DECODE_CHUNK
+    ):
+        _check_video_path(video_path)
+        self.video_path = video_path
+        self.rotate = rotate
+        self.sample_rate = max(1, int(sample_rate or 1))
+        self.prefetch = max(0, int(prefetch))
+        self.motion_threshold = max(0.0, float(motion_threshold or 0.0))
+        self.motion_max_skip = motion_max_skip
+        self.decode_workers = max(1, int(decode_workers or 1))
+        # Los tramos empiezan en múltiplos del sample rate para conservar los mismos fotogramas
+        self.decode_chunk = max(1, -(-int(decode_chunk) // self.sample_rate)) * self.sample_rate
+
+        probe = probe_video(video_path)
+        self.total_frames = probe.frame_count
+        self.fps = probe.fps
+        logger.info(f"Propiedades del vídeo: {self.total_frames} frames, {self.fps:.2f} FPS")
+
+    @property
+    def expected_frames(self) -> int:
+        """
+        Número aproximado de fotogramas que producirá el stream (según los metadatos).
+        Con muestreo por movimiento es una cota superior.
+        """
+        return -(-self.total_frames // self.sample_rate)
+
+    @property
+    def sampling_settings(self) -> dict:
+        """Ajustes que determinan qué fotogramas entrega el stream."""
+        return {
+            'sample_rate': self.sample_rate,
+            'motion_threshold': self.motion_threshold,
+            'motion_max_skip': self.motion_max_skip if self.motion_threshold > 0 else None,
+        }
+
+    def _open_capture(self) -> cv2.VideoCapture:
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise IOError(f"No se pudo abrir el fichero de vídeo: {self.video_path}")
+        return cap
+
+    def _read_range(
+        self, cap: cv2.VideoCapture, start: int, end: Optional[int]
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Lee de ``cap``, ya situada en ``start``, los fotogramas del sample rate hasta
+        ``end`` (excluido; None = fin del vídeo). Devuelve (índice en el original, fotograma).
+        """
+        source_index = start
+        while end is None or source_index < end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield source_index, frame
+            source_index += 1
+
+            # Saltamos frames innecesarios usando grab para optimizar
+            for _ in range(self.sample_rate - 1):
+                if not cap.grab():
+                    return
+                source_index += 1
+
+    def _decode(self) -> Iterator[FrameItem]:
+        """Generador síncrono: decodifica, aplica el sample rate y el muestreo por movimiento, y rota."""
+        if self.decode_workers > 1 and self.total_frames > self.decode_chunk:
+            yield from self._decode_parallel()
+            return
+
+        cap = self._open_capture()
+        fps = self.fps or 1.0
+        sampler = MotionSampler(self.motion_threshold, self.motion_max_skip) if self.motion_threshold > 0 else None
+        try:
+            index = 0
+            for source_index, frame in self._read_range(cap, 0, None):
+                # La rotación no afecta a la diferencia entre fotogramas: se mide antes, más barato
+                if sampler is None or sampler.keep(frame):
+                    yield FrameItem(index, source_index / fps, rotate_frame(frame, self.rotate), source_index)
+                    index += 1
+        finally:
+            cap.release()
+
+    def _seek(self, cap: cv2.VideoCapture, start: int) -> cv2.VideoCapture:
+        """Sitúa la captura en el fotograma ``start``; si el salto no es exacto, avanza desde el principio."""
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+            return cap
+        logger.debug(f"Salto impreciso al fotograma {start}; se avanza secuencialmente.")
+        cap.release()
+        cap = self._open_capture()
+        for _ in range(start):
             if not cap.grab():
                 break
+        return cap
+
+    def _decode_chunks(self, chunks: List[int], output: queue.Queue, stop: threading.Event) -> None:
+        """Hilo decodificador de tramos: envía (índice, fotograma rotado, miniatura) y un fin por tramo."""
+        last_start = (self.total_frames - 1) // self.decode_chunk * self.decode_chunk
+        cap = None
+        try:
+            cap = self._open_capture()
+            for start in chunks:
+                if start > 0:
+                    cap = self._seek(cap, start)
+                # El último tramo lee hasta el final real, por si los metadatos se quedan cortos
+                end = None if start == last_start else start + self.decode_chunk
+                for source_index, frame in self._read_range(cap, start, end):
+                    # La miniatura del muestreo por movimiento se calcula aquí, en paralelo
+                    thumb = MotionSampler.thumbnail(frame) if self.motion_threshold > 0 else None
+                    if not self._put(output, stop, (source_index, rotate_frame(frame, self.rotate), thumb)):
+                        return
+                if not self._put(output, stop, _END_OF_CHUNK):
+                    return
+        except Exception as e:
+            self._put(output, stop, e)
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _decode_parallel(self) -> Iterator[FrameItem]:
+        """Reparte los tramos entre hilos (por turnos) y los reensambla en orden."""
+        starts = list(range(0, self.total_frames, self.decode_chunk))
+        workers = min(self.decode_workers, len(starts))
+        stop = threading.Event()
+        outputs = [queue.Queue(maxsize=self.decode_chunk // self.sample_rate + 1) for _ in range(workers)]
+        threads = [
+            threading.Thread(
+                target=self._decode_chunks, args=(starts[w::workers], outputs[w], stop),
+                name=f"frame-decoder-{w}", daemon=True
+            )
+            for w in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        fps = self.fps or 1.0
+        sampler = MotionSampler(self.motion_threshold, self.motion_max_skip) if self.motion_threshold > 0 else None
+        try:
+            index = 0
+            for chunk in range(len(starts)):
+                output = outputs[chunk % workers]
+                while True:
+                    entry = output.get()
+                    if entry is _END_OF_CHUNK:
+                        break
+                    if isinstance(entry, Exception):
+                        raise entry
+                    source_index, frame, thumb = entry
+                    if sampler is None or sampler.keep_thumbnail(thumb):
+                        yield FrameItem(index, source_index / fps, frame, source_index)
+                        index += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _producer(self, buffer: queue.Queue, stop: threading.Event) -> None:
+        """Hilo decodificador: rellena el buffer hasta que se agota el vídeo o se cancela."""
+        try:
+            for item in self._decode():
+                if not self._put(buffer, stop, item):
+                    return
+            self._put(buffer, stop, _END_OF_STREAM)
+        except Exception as e:
+            self._put(buffer, stop, e)
+
+    @staticmethod
+    def _put(buffer: queue.Queue, stop: threading.Event, item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator[FrameItem]:
+        if self.prefetch == 0:
+            yield from self._decode()
+            return
+
+        buffer: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._producer, args=(buffer, stop), name="frame-decoder", daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                item = buffer.get()
+                if item is _END_OF_STREAM:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Si el consumidor abandona el stream, paramos el hilo y liberamos el buffer
+            stop.set()
+            producer.join()
 
-    cap.release()
+
+def extract_and_preprocess_frames(
+    video_path: str,
+    rotate: Optional[int] = None,
+    sample_rate: int = 1,
+    decode_workers: int = 1
+) -> Tuple[List, float]:
+    """
+    Extrae fotogramas de un vídeo, los rota si es necesario y aplica un sample rate.
+    Carga todo el clip en memoria; para vídeos largos es preferible iterar un ``FrameStream``.
+    Con ``decode_workers > 1`` la decodificación se reparte por tramos entre varios hilos.
+    """
+    logger.info(f"Iniciando extracción para: {video_path}")
+    stream = FrameStream(video_path, rotate, sample_rate, prefetch=0, decode_workers=decode_workers)
+    frames = [item.frame for item in stream]
     logger.info(f"Proceso completado. Se han extraído {len(frames)} fotogramas en memoria.")
-    return frames, fps
+    return frames, stream.fps
@@ -1,30 +1,167 @@
-# src/A_preprocessing/video_metadata.py (Versión con depuración mejorada)
-
+# src/A_preprocessing/video_metadata.py
+"""
+Lectura rápida de los metadatos de un vídeo. ``probe_video`` obtiene en una sola
+pasada fps, número de fotogramas, duración, resolución y rotación: la rotación
+sale de la matriz del átomo ``tkhd`` en MP4/MOV (sin decodificar nada) y el resto
+de una única ``cv2.VideoCapture``. Los resultados se memorizan por
+(ruta, tamaño, mtime), así que volver a seleccionar el mismo fichero no cuesta nada.
+"""
 import logging
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+import cv2
 
 logger = logging.getLogger(__name__)
 
-def get_video_rotation(video_path: str) -> int:
+# Contenedores con estructura de átomos ISO BMFF en los que se busca el tkhd
+_ISO_BMFF_EXTENSIONS = ('.mp4', '.mov', '.m4v', '.3gp')
+
+# Matriz de transformación (a, b, c, d) del tkhd -> rotación en grados (convención de ffmpeg)
+_MATRIX_ROTATIONS = {
+    (0, 1, -1, 0): 90,
+    (-1, 0, 0, -1): 180,
+    (0, -1, 1, 0): 270,
+}
+
+
+@dataclass(frozen=True)
+class VideoProbe:
+    """Metadatos básicos de un fichero de vídeo."""
+    fps: float
+    frame_count: int
+    duration: float
+    width: int
+    height: int
+    rotation: int
+
+
+# Sondeos ya realizados, indexados por (ruta, tamaño, mtime)
+_probes: Dict[Tuple[str, int, int], VideoProbe] = {}
+_probes_lock = threading.Lock()
+
+
+def _iter_atoms(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Recorre los átomos entre ``start`` y ``end`` devolviendo (tipo, inicio del contenido, fin)."""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack('>I4s', header)
+        body = offset + 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            body += 8
+        elif size == 0:
+            size = end - offset
+        if size < body - offset:
+            return
+        yield kind, body, offset + size
+        offset += size
+
+
+def _tkhd_rotation(f: BinaryIO, start: int) -> Optional[int]:
+    """Rotación del tkhd que empieza en ``start``; None si la pista no es de vídeo (sin dimensiones)."""
+    f.seek(start)
+    version = f.read(1)[0]
+    # Saltamos flags, fechas, track_id, reservado, duración, reservado, capa, grupo, volumen y reservado
+    f.seek(start + (52 if version == 1 else 40))
+    matrix = struct.unpack('>9i', f.read(36))
+    width, height = struct.unpack('>II', f.read(8))
+    if width == 0 or height == 0:
+        return None
+    a, b, _, c, d = (round(v / 65536) for v in matrix[:5])
+    return _MATRIX_ROTATIONS.get((a, b, c, d), 0)
+
+
+def _read_container_rotation(video_path: str) -> Optional[int]:
+    """Rotación de la primera pista de vídeo de un MP4/MOV, o None si no se puede leer."""
+    if os.path.splitext(video_path)[1].lower() not in _ISO_BMFF_EXTENSIONS:
+        return None
+    try:
+        with open(video_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            for kind, body, end in _iter_atoms(f, 0, file_size):
+                if kind != b'moov':
+                    continue
+                for trak_kind, trak_body, trak_end in _iter_atoms(f, body, end):
+                    if trak_kind != b'trak':
+                        continue
+                    for box_kind, box_body, _ in _iter_atoms(f, trak_body, trak_end):
+                        if box_kind == b'tkhd':
+                            rotation = _tkhd_rotation(f, box_body)
+                            if rotation is not None:
+                                return rotation
+                return None
+    except (OSError, struct.error, IndexError) as e:
+        logger.debug(f"No se pudo leer la cabecera de {video_path}: {e}")
+    return None
+
+
+def _probe_uncached(video_path: str) -> VideoProbe:
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise IOError(f"No se pudo abrir el fichero de vídeo: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        rotation = _read_container_rotation(video_path)
+        if rotation is None:
+            # Otros contenedores: OpenCV expone la rotación de los metadatos si el backend la conoce
+            rotation = int(cap.get(cv2.CAP_PROP_ORIENTATION_META)) % 360
+    finally:
+        cap.release()
+
+    return VideoProbe(
+        fps=fps,
+        frame_count=frame_count,
+        duration=frame_count / fps if fps else 0.0,
+        width=width,
+        height=height,
+        rotation=rotation if rotation in (90, 180, 270) else 0,
+    )
+
+
+def probe_video(video_path: str) -> VideoProbe:
     """
-    Usa moviepy para leer los metadatos de un vídeo y detectar su rotación.
+    Devuelve los metadatos del vídeo, memorizados mientras el fichero no cambie.
+
+    Raises:
+        FileNotFoundError: si el fichero no existe.
+        IOError: si OpenCV no puede abrirlo.
     """
-    try:
-        from moviepy.editor import VideoFileClip
-    except ImportError as e:
-        # --- CAMBIO CLAVE: Ahora mostramos el error real ---
-        logger.warning(f"No se pudo importar MoviePy. Puede que falte una dependencia como FFMPEG.")
-        logger.warning(f"Error original: {e}")
-        return 0
+    stat = os.stat(video_path)
+    memo_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+    with _probes_lock:
+        cached = _probes.get(memo_key)
+    if cached is not None:
+        return cached
+
+    probe = _probe_uncached(video_path)
+    with _probes_lock:
+        _probes[memo_key] = probe
+    return probe
 
+
+def get_video_rotation(video_path: str) -> int:
+    """
+    Lee los metadatos de un vídeo y detecta su rotación (0, 90, 180 o 270).
+    """
     try:
-        with VideoFileClip(video_path) as clip:
-            rotation = clip.rotation
-            if rotation in [90, 180, 270]:
-                logger.info(f"Rotación detectada en los metadatos del vídeo: {rotation} grados.")
-                return rotation
-            else:
-                logger.info("No se detectó rotación en los metadatos (o es 0).")
-                return 0
+        rotation = probe_video(video_path).rotation
     except Exception as e:
-        logger.error(f"Error al leer los metadatos del vídeo con MoviePy: {e}")
+        logger.error(f"Error al leer los metadatos del vídeo: {e}")
         return 0
+
+    if rotation:
+        logger.info(f"Rotación detectada en los metadatos del vídeo: {rotation} grados.")
+    else:
+        logger.info("No se detectó rotación en los metadatos (o es 0).")
+    return rotation
@@ -0,0 +1,240 @@
+# src/A_preprocessing/video_preview.py
+"""
+Previsualizaciones de vídeo cacheadas: una miniatura del primer fotograma y una
+tira de scrub (un fotograma pequeño cada ``interval_ms``), que se guardan como
+``<nombre>_preview.npz`` en el directorio de la sesión. Con ellas la GUI puede
+mostrar la miniatura y recorrer el vídeo al instante sin volver a decodificarlo.
+
+Las entradas se validan con el tamaño y la fecha de modificación del vídeo y
+además se memorizan en memoria mientras el fichero no cambie.
+"""
+import logging
+import os
+import tempfile
+import threading
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+
+from src.A_preprocessing.video_metadata import probe_video
+
+logger = logging.getLogger(__name__)
+
+# Lado mayor (px) de la miniatura y de cada fotograma de la tira de scrub
+THUMBNAIL_SIZE = 480
+SCRUB_FRAME_SIZE = 160
+# Separación mínima entre fotogramas de la tira y número máximo de fotogramas
+DEFAULT_SCRUB_INTERVAL_MS = 250
+MAX_SCRUB_FRAMES = 600
+# Versión del formato de las entradas; cambiarla invalida todas las anteriores
+PREVIEW_FORMAT_VERSION = 1
+
+
+@dataclass
+class VideoPreview:
+    """
+    Miniatura y tira de scrub de un vídeo, en BGR y sin rotar.
+
+    Attributes:
+        thumbnail: (H, W, 3) primer fotograma reducido a ``THUMBNAIL_SIZE``.
+        strip: (N, h, w, 3) un fotograma cada ``interval_ms``, o None si aún no se ha generado.
+        interval_ms: Separación entre fotogramas de la tira.
+    """
+    thumbnail: np.ndarray
+    strip: Optional[np.ndarray] = None
+    interval_ms: int = DEFAULT_SCRUB_INTERVAL_MS
+
+    def frame_at(self, position_ms: float) -> np.ndarray:
+        """Fotograma de la tira más cercano a ``position_ms`` (la miniatura si no hay tira)."""
+        if self.strip is None or len(self.strip) == 0:
+            return self.thumbnail
+        i = int(round(position_ms / self.interval_ms))
+        return self.strip[min(max(i, 0), len(self.strip) - 1)]
+
+
+def scrub_interval_ms(duration_s: float) -> int:
+    """Separación de la tira para un vídeo de ``duration_s``: la mínima, o más si excede ``MAX_SCRUB_FRAMES``."""
+    return max(DEFAULT_SCRUB_INTERVAL_MS, int(np.ceil(duration_s * 1000.0 / MAX_SCRUB_FRAMES)))
+
+
+def _resize_to_fit(frame: np.ndarray, size: int) -> np.ndarray:
+    """Copia reducida del fotograma con su lado mayor a ``size`` px."""
+    h, w = frame.shape[:2]
+    scale = size / max(h, w)
+    if scale >= 1.0:
+        return frame.copy()
+    return cv2.resize(frame, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+class ScrubStripBuilder:
+    """
+    Construye la tira de scrub a partir de fotogramas que llegan en orden, de modo
+    que quien ya está decodificando (p. ej. el render del vídeo de depuración) la
+    obtiene sin una pasada extra por el vídeo.
+    """
+    def __init__(self, interval_ms: int = DEFAULT_SCRUB_INTERVAL_MS, frame_size: int = SCRUB_FRAME_SIZE):
+        self.interval_ms = interval_ms
+        self.frame_size = frame_size
+        self.thumbnail: Optional[np.ndarray] = None
+        self._frames: List[np.ndarray] = []
+
+    def wants(self, position_ms: float) -> bool:
+        """True si el fotograma en ``position_ms`` entra en la tira (permite no reducir los demás)."""
+        return position_ms >= len(self._frames) * self.interval_ms
+
+    def add(self, position_ms: float, frame: np.ndarray) -> None:
+        """Añade un fotograma; solo se guarda si cubre la siguiente posición de la tira."""
+        if self.thumbnail is None:
+            self.thumbnail = _resize_to_fit(frame, THUMBNAIL_SIZE)
+        if not self.wants(position_ms):
+            return
+        small = _resize_to_fit(frame, self.frame_size)
+        # Si hay huecos (p. ej. con muestreo por movimiento) se repite el fotograma
+        while self.wants(position_ms):
+            self._frames.append(small)
+
+    def build(self) -> Optional[VideoPreview]:
+        if self.thumbnail is None:
+            return None
+        strip = np.stack(self._frames) if self._frames else None
+        return VideoPreview(self.thumbnail, strip, self.interval_ms)
+
+
+# Previsualizaciones ya cargadas, indexadas por (ruta, tamaño, mtime)
+_previews: Dict[Tuple[str, int, int], VideoPreview] = {}
+_previews_lock = threading.Lock()
+
+
+def _source_key(video_path: str) -> Tuple[str, int, int]:
+    stat = os.stat(video_path)
+    return os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns
+
+
+def preview_path(video_path: str, session_dir: str) -> str:
+    """Ruta del fichero de previsualización de ``video_path`` dentro de ``session_dir``."""
+    base_name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(session_dir, f"{base_name}_preview.npz")
+
+
+def _read(path: str, key: Tuple[str, int, int]) -> Optional[VideoPreview]:
+    try:
+        with np.load(path) as data:
+            if int(data['version']) != PREVIEW_FORMAT_VERSION or tuple(data['source']) != key[1:]:
+                return None
+            strip = data['strip'] if 'strip' in data.files else None
+            return VideoPreview(data['thumbnail'], strip, int(data['interval_ms']))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Previsualización corrupta ({path}): {e}. Se regenera.")
+        return None
+
+
+def _write(path: str, key: Tuple[str, int, int], preview: VideoPreview) -> None:
+    """Guarda la previsualización de forma atómica; los fallos solo se registran."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    except OSError as e:
+        logger.warning(f"No se pudo guardar la previsualización: {e}")
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            arrays = dict(
+                version=PREVIEW_FORMAT_VERSION, source=np.array(key[1:], dtype=np.int64),
+                thumbnail=preview.thumbnail, interval_ms=preview.interval_ms,
+            )
+            if preview.strip is not None:
+                arrays['strip'] = preview.strip
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"No se pudo guardar la previsualización: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def save_preview(video_path: str, session_dir: str, preview: VideoPreview) -> None:
+    """Guarda y memoriza una previsualización generada fuera de este módulo."""
+    key = _source_key(video_path)
+    _write(preview_path(video_path, session_dir), key, preview)
+    with _previews_lock:
+        _previews[key] = preview
+
+
+def build_scrub_strip(
+    video_path: str,
+    interval_ms: Optional[int] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Optional[VideoPreview]:
+    """
+    Recorre el vídeo una vez y genera su previsualización. Los fotogramas que no
+    entran en la tira solo se avanzan con ``grab``, sin convertirlos. Si
+    ``should_stop`` devuelve True entre dos fotogramas, se abandona y devuelve None.
+    """
+    probe = probe_video(video_path)
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"No se pudo abrir el fichero de vídeo: {video_path}")
+    builder = ScrubStripBuilder(interval_ms or scrub_interval_ms(probe.duration))
+    try:
+        fps = probe.fps or 30.0
+        index = 0
+        while cap.grab():
+            if should_stop is not None and should_stop():
+                return None
+            position_ms = index * 1000.0 / fps
+            if index == 0 or builder.wants(position_ms):
+                ret, frame = cap.retrieve()
+                if ret:
+                    builder.add(position_ms, frame)
+            index += 1
+    finally:
+        cap.release()
+
+    preview = builder.build()
+    if preview is None:
+        raise IOError(f"No se pudo leer ningún fotograma de: {video_path}")
+    return preview
+
+
+def load_preview(
+    video_path: str,
+    session_dir: str,
+    build_strip: bool = True,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Optional[VideoPreview]:
+    """
+    Devuelve la previsualización del vídeo desde memoria o disco. Si no existe (o
+    no tiene tira y ``build_strip``), la genera y la guarda en ``session_dir``.
+    Con ``build_strip=False`` solo se genera la miniatura, decodificando un fotograma.
+    ``should_stop`` permite interrumpir la generación de la tira (devuelve None).
+    """
+    key = _source_key(video_path)
+    with _previews_lock:
+        preview = _previews.get(key)
+    path = preview_path(video_path, session_dir)
+    if preview is None:
+        preview = _read(path, key)
+
+    if preview is None or (build_strip and preview.strip is None):
+        if build_strip:
+            preview = build_scrub_strip(video_path, should_stop=should_stop)
+            if preview is None:
+                return None
+        else:
+            cap = cv2.VideoCapture(video_path)
+            ret, frame = cap.read()
+            cap.release()
+            if not ret:
+                return None
+            preview = VideoPreview(_resize_to_fit(frame, THUMBNAIL_SIZE))
+        _write(path, key, preview)
+
+    with _previews_lock:
+        _previews[key] = preview
+    return preview
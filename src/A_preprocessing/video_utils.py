@@ -3,12 +3,16 @@
 """Utility functions for working with video files."""
 
 import os
-import cv2
+
+from .video_metadata import probe_video
 
 
 def validate_video(path: str) -> dict:
     """Validate a video file and return its basic properties.
 
+    The properties come from :func:`probe_video`, so repeated calls on the same
+    unchanged file do not open it again.
+
     Parameters
     ----------
     path : str
@@ -29,17 +33,12 @@ def validate_video(path: str) -> dict:
     if not os.path.exists(path):
         raise IOError(f"File does not exist: {path}")
 
-    cap = cv2.VideoCapture(path)
-    if not cap.isOpened():
-        cap.release()
+    try:
+        probe = probe_video(path)
+    except IOError:
         raise IOError(f"Cannot open video file: {path}")
 
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    cap.release()
-
-    if fps == 0:
+    if probe.fps == 0:
         raise ValueError("Video FPS is zero")
 
-    duration = frame_count / fps
-    return {"fps": fps, "frame_count": frame_count, "duration": duration}
+    return {"fps": probe.fps, "frame_count": probe.frame_count, "duration": probe.duration}
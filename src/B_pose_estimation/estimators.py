@@ -7,6 +7,8 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 
+from src.constants import NUM_POSE_LANDMARKS
+
 try:
     import mediapipe as mp
     from mediapipe.python.solutions.pose import Pose
@@ -16,17 +18,67 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Ajustes de MediaPipe Pose usados por ``BlazePose3DEstimator``. Forman parte de la
+# clave de la caché de landmarks: si cambian, los landmarks guardados dejan de valer.
+POSE_SETTINGS = dict(
+    static_image_mode=False,
+    model_complexity=2,
+    smooth_landmarks=True,
+    enable_segmentation=False,
+    min_detection_confidence=0.5,
+)
+
+# Ajustes de ``CroppedPoseEstimator``: el modelo corre sobre un recorte cuadrado de
+# ``input_size`` píxeles alrededor de la persona, ampliado ``padding`` veces su tamaño
+# por cada lado. También forman parte de la clave de la caché de landmarks.
+CROP_SETTINGS = dict(
+    input_size=256,
+    padding=0.25,
+    min_box_fraction=0.2,
+    model_complexity=1,
+    min_detection_confidence=0.5,
+    min_tracking_confidence=0.5,
+)
+
+# Colores (BGR) de la anotación de depuración, los mismos que usa MediaPipe por defecto
+ANNOTATION_LINE_COLOR = (224, 224, 224)
+ANNOTATION_POINT_COLOR = (0, 0, 255)
+
 
 @dataclass
 class EstimationResult:
     """
     Contenedor de datos estandarizado para el resultado de una estimación de pose.
-    Utiliza tipos de datos simples (listas de dicts) para ser seguro entre procesos.
+    Los landmarks son arrays (33, 4) float32 con columnas x, y, z, visibility
+    (o None si no se detectó pose), baratos de serializar entre procesos.
+    ``annotated_image`` solo se rellena si el estimador se creó con
+    ``draw_annotations=True``; si no, se puede generar bajo demanda con ``annotate``.
     """
-    landmarks: Optional[List[Dict[str, float]]] = None
-    world_landmarks: Optional[List[Dict[str, float]]] = None
+    landmarks: Optional[np.ndarray] = None
+    world_landmarks: Optional[np.ndarray] = None
     annotated_image: Optional[np.ndarray] = None
 
+    def annotate(self, image: np.ndarray) -> np.ndarray:
+        """Devuelve una copia de ``image`` con el esqueleto dibujado (o la imagen anotada ya existente)."""
+        if self.annotated_image is not None:
+            return self.annotated_image
+        annotated = image.copy()
+        if self.landmarks is not None:
+            # Importación diferida: la visualización solo se carga si alguien pide la anotación
+            from src.F_visualization.drawing_utils import draw_landmarks
+            draw_landmarks(annotated, self.landmarks, ANNOTATION_LINE_COLOR, ANNOTATION_POINT_COLOR,
+                           line_thickness=2, point_radius=2)
+        return annotated
+
+
+def landmarks_to_array(landmarks: Optional[List[Dict[str, float]]]) -> np.ndarray:
+    """Convierte una lista de landmarks en formato antiguo (dicts) en un array (33, 4) float32; NaN si no hay pose."""
+    arr = np.full((NUM_POSE_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for i, lm in enumerate((landmarks or [])[:NUM_POSE_LANDMARKS]):
+        if lm:
+            arr[i] = (lm['x'], lm['y'], lm.get('z', 0.0), lm.get('visibility', 0.0))
+    return arr
+
 
 class BaseEstimator(ABC):
     """Clase base abstracta para todos los estimadores de pose."""
@@ -35,69 +87,161 @@ class BaseEstimator(ABC):
         """Estima la pose en un único fotograma."""
         raise NotImplementedError
 
+    def reset(self):
+        """Descarta el estado de tracking entre fotogramas (p. ej. al saltar a otro tramo)."""
+        pass
+
     @abstractmethod
     def close(self):
         """Libera los recursos del modelo."""
         raise NotImplementedError
 
 
+def _mp_landmarks_to_array(mp_landmarks) -> np.ndarray:
+    """Convierte una lista de landmarks de MediaPipe en un array (33, 4) float32."""
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in mp_landmarks.landmark], dtype=np.float32
+    )
+
+
 class BlazePose3DEstimator(BaseEstimator):
     """
-    Estimador que utiliza MediaPipe Pose y devuelve los landmarks como listas
-    de diccionarios para garantizar la robustez en el multiprocesamiento.
+    Estimador que utiliza MediaPipe Pose y devuelve los landmarks como arrays
+    (33, 4) float32 para que viajen de forma compacta entre procesos.
+
+    Con ``draw_annotations=False`` solo devuelve landmarks: no copia el fotograma
+    ni dibuja el esqueleto, y el resultado no arrastra la imagen al serializarse.
+    Con ``input_rgb=True`` los fotogramas ya llegan en RGB y no se convierten.
     """
-    def __init__(self):
-        self.pose = Pose(
-            static_image_mode=False,
-            model_complexity=2,
-            smooth_landmarks=True,
-            enable_segmentation=False,
-            min_detection_confidence=0.5
-        )
+    def __init__(self, draw_annotations: bool = True, input_rgb: bool = False):
+        self.draw_annotations = draw_annotations
+        self.input_rgb = input_rgb
+        self.pose = Pose(**POSE_SETTINGS)
 
     def estimate(self, image: np.ndarray) -> EstimationResult:
         """
-        Procesa un frame, extrae los landmarks y los convierte a un formato de datos simple.
+        Procesa un frame, extrae los landmarks y los convierte a arrays numpy.
         """
-        results = self.pose.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        results = self.pose.process(image if self.input_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
 
         if not results.pose_landmarks:
-            return EstimationResult(annotated_image=image)
-        
-        # Convertimos los objetos complejos de MediaPipe a listas de diccionarios simples
-        landmarks_2d = [{'x': lm.x, 'y': lm.y, 'z': lm.z, 'visibility': lm.visibility} 
-                        for lm in results.pose_landmarks.landmark]
-        
-        world_landmarks_3d = [{'x': lm.x, 'y': lm.y, 'z': lm.z, 'visibility': lm.visibility} 
-                              for lm in results.pose_world_landmarks.landmark]
-        
-        # Creamos una imagen anotada para depuración rápida si es necesario
-        annotated_image = image.copy()
-        mp.solutions.drawing_utils.draw_landmarks(
-            annotated_image, 
-            results.pose_landmarks, 
-            mp.solutions.pose.POSE_CONNECTIONS
-        )
-        
+            return EstimationResult(annotated_image=image if self.draw_annotations else None)
+
+        # Convertimos los objetos complejos de MediaPipe a arrays (33, 4)
+        landmarks_2d = _mp_landmarks_to_array(results.pose_landmarks)
+        world_landmarks_3d = _mp_landmarks_to_array(results.pose_world_landmarks)
+
+        # Creamos una imagen anotada para depuración rápida solo si se ha pedido
+        annotated_image = None
+        if self.draw_annotations:
+            annotated_image = image.copy()
+            mp.solutions.drawing_utils.draw_landmarks(
+                annotated_image,
+                results.pose_landmarks,
+                mp.solutions.pose.POSE_CONNECTIONS
+            )
+
         return EstimationResult(
             landmarks=landmarks_2d,
             world_landmarks=world_landmarks_3d,
             annotated_image=annotated_image,
         )
 
+    def reset(self):
+        self.pose.reset()
+
     def close(self):
         self.pose.close()
 
 
 class CroppedPoseEstimator(BaseEstimator):
     """
-    Placeholder para el estimador 2D. Necesitaría ser refactorizado de forma
-    similar para devolver un objeto EstimationResult si se quisiera usar.
+    Estimador 2D con seguimiento de una región de interés (ROI). A partir de los
+    landmarks del fotograma anterior calcula una caja cuadrada con margen alrededor
+    de la persona y ejecuta el modelo solo sobre ese recorte, reescalado a un
+    tamaño fijo pequeño. Los landmarks se devuelven en coordenadas normalizadas
+    del fotograma completo. Si se pierde la pose, vuelve a detectar sobre el
+    fotograma entero. Con ``input_rgb=True`` los fotogramas ya llegan en RGB.
     """
+    def __init__(self, draw_annotations: bool = True, input_rgb: bool = False):
+        self.draw_annotations = draw_annotations
+        self.input_rgb = input_rgb
+        self.input_size = CROP_SETTINGS['input_size']
+        self.padding = CROP_SETTINGS['padding']
+        self.min_box_fraction = CROP_SETTINGS['min_box_fraction']
+        pose_args = dict(
+            model_complexity=CROP_SETTINGS['model_complexity'],
+            smooth_landmarks=True,
+            enable_segmentation=False,
+            min_detection_confidence=CROP_SETTINGS['min_detection_confidence'],
+        )
+        # Modelo con tracking para los recortes (la persona queda casi fija dentro del recorte)
+        self.pose = Pose(static_image_mode=False, min_tracking_confidence=CROP_SETTINGS['min_tracking_confidence'], **pose_args)
+        # Detección independiente sobre el fotograma completo cuando no hay ROI
+        self.detector = Pose(static_image_mode=True, **pose_args)
+        # ROI actual como (centro_x, centro_y, lado) en píxeles del fotograma, o None
+        self._box: Optional[np.ndarray] = None
+
+    def _box_from_landmarks(self, landmarks: np.ndarray, width: int, height: int) -> Optional[np.ndarray]:
+        """Caja cuadrada con margen que envuelve los landmarks visibles (en píxeles)."""
+        visible = landmarks[:, 3] > 0.5
+        if visible.sum() < 2:
+            return None
+        xs, ys = landmarks[visible, 0] * width, landmarks[visible, 1] * height
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1.0 + 2.0 * self.padding)
+        side = max(side, self.min_box_fraction * min(width, height))
+        return np.array([(xs.min() + xs.max()) / 2.0, (ys.min() + ys.max()) / 2.0, side])
+
+    def _estimate_in_box(self, image: np.ndarray, box: np.ndarray):
+        """Ejecuta el modelo sobre el recorte ``box`` y devuelve sus resultados y la transformación."""
+        cx, cy, side = box
+        x0, y0 = cx - side / 2.0, cy - side / 2.0
+        scale = self.input_size / side
+        # Recorte y reescalado en una sola pasada; lo que cae fuera del fotograma queda en negro
+        affine = np.array([[scale, 0.0, -x0 * scale], [0.0, scale, -y0 * scale]], dtype=np.float64)
+        crop = cv2.warpAffine(image, affine, (self.input_size, self.input_size), flags=cv2.INTER_LINEAR)
+        # Si hace falta, la conversión a RGB se hace ya sobre el recorte pequeño
+        if not self.input_rgb:
+            crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=crop)
+        return self.pose.process(crop), (x0, y0, side)
+
     def estimate(self, image: np.ndarray) -> EstimationResult:
-        logger.warning("CroppedPoseEstimator no está completamente implementado con la nueva arquitectura.")
-        # Aquí iría la lógica original, adaptada para devolver un EstimationResult
-        return EstimationResult(annotated_image=image)
+        """Estima la pose en la ROI seguida o, si no la hay, en el fotograma completo."""
+        height, width = image.shape[:2]
+
+        landmarks = world_landmarks = None
+        if self._box is not None:
+            results, (x0, y0, side) = self._estimate_in_box(image, self._box)
+            if results.pose_landmarks:
+                # Del recorte [0, 1] al fotograma completo [0, 1]; z usa la misma escala que x
+                landmarks = _mp_landmarks_to_array(results.pose_landmarks)
+                landmarks[:, 0] = (x0 + landmarks[:, 0] * side) / width
+                landmarks[:, 1] = (y0 + landmarks[:, 1] * side) / height
+                landmarks[:, 2] *= side / width
+                world_landmarks = _mp_landmarks_to_array(results.pose_world_landmarks)
+            else:
+                # Seguimiento perdido: el siguiente intento será sobre el fotograma completo
+                self.reset()
+
+        if landmarks is None:
+            results = self.detector.process(image if self.input_rgb else cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            if results.pose_landmarks:
+                landmarks = _mp_landmarks_to_array(results.pose_landmarks)
+                world_landmarks = _mp_landmarks_to_array(results.pose_world_landmarks)
+
+        if landmarks is None:
+            return EstimationResult(annotated_image=image if self.draw_annotations else None)
+
+        self._box = self._box_from_landmarks(landmarks, width, height)
+        result = EstimationResult(landmarks=landmarks, world_landmarks=world_landmarks)
+        if self.draw_annotations:
+            result.annotated_image = result.annotate(image)
+        return result
+
+    def reset(self):
+        self._box = None
+        self.pose.reset()
 
     def close(self):
-        pass
+        self.pose.close()
+        self.detector.close()
@@ -0,0 +1,150 @@
+# src/B_pose_estimation/filtering.py
+"""
+Filtrado de landmarks entre la estimación de pose y el cálculo de métricas. Trabaja
+sobre el tensor (N, 33, 4) completo, sin bucles Python por fotograma ni por landmark:
+
+1. Relleno de huecos ponderado por confianza. En cada landmark, los fotogramas con
+   visibilidad por encima del umbral son anclas y el resto se interpola linealmente
+   en el tiempo entre el ancla anterior y la siguiente. Una observación con
+   visibilidad baja no se descarta: se mezcla con la interpolación con peso
+   visibilidad / umbral. Los huecos de más de ``max_gap_s`` (o sin ancla a un lado)
+   se dejan como estaban.
+2. Suavizado Savitzky-Golay de cada coordenada a lo largo del tiempo (una sola
+   llamada sobre todo el tensor). Los tramos que siguen sin datos se rellenan solo
+   para filtrar y después vuelven a NaN.
+
+Así el ruido del estimador deja de producir valles espurios en la métrica de
+conteo, y los huecos cortos ya no dependen del ``ffill`` de la detección de
+repeticiones.
+"""
+import logging
+import numpy as np
+from scipy.signal import savgol_filter
+from typing import Tuple
+
+from src.B_pose_estimation.landmarks import LandmarkSequence, X, Z, VISIBILITY
+
+logger = logging.getLogger(__name__)
+
+# Modos de ``filter_landmarks``
+FILTER_MODES = ('savgol', 'interp', 'none')
+
+
+def _neighbors(known: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Para una máscara (N, L), índice del fotograma ``known`` anterior (o igual) y
+    siguiente (o igual) en cada posición; -1 y N si no hay.
+    """
+    n = len(known)
+    index = np.arange(n).reshape(-1, *([1] * (known.ndim - 1)))
+    previous = np.maximum.accumulate(np.where(known, index, -1), axis=0)
+    following = np.minimum.accumulate(np.where(known, index, n)[::-1], axis=0)[::-1]
+    return previous, following
+
+
+def fill_gaps(
+    data: np.ndarray,
+    times: np.ndarray,
+    max_gap_s: float,
+    visibility_thresh: float = 0.5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rellena los huecos de un tensor (N, L, 4) de landmarks. Devuelve el tensor
+    rellenado (una copia) y la máscara (N, L) de muestras modificadas, cuya
+    visibilidad pasa a ser la interpolada entre sus anclas.
+    """
+    n, n_landmarks = data.shape[:2]
+    out = data.copy()
+    if n < 3:
+        return out, np.zeros((n, n_landmarks), dtype=bool)
+
+    visibility = data[:, :, VISIBILITY]
+    anchor = visibility > visibility_thresh                       # NaN cuenta como no visible
+    previous, following = _neighbors(anchor)
+    fillable = ~anchor & (previous >= 0) & (following < n)
+    if not fillable.any():
+        return out, fillable
+
+    a, b = np.clip(previous, 0, n - 1), np.clip(following, 0, n - 1)
+    t_a, t_b = times[a], times[b]
+    span = t_b - t_a
+    fillable &= span <= max_gap_s
+
+    # Interpolación lineal en el tiempo entre las dos anclas de cada muestra
+    landmark = np.arange(n_landmarks)
+    start, end = data[a, landmark], data[b, landmark]                # (N, L, 4)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(span > 0, (times[:, None] - t_a) / span, 0.0).astype(data.dtype)
+    interpolated = start + weight[..., None] * (end - start)
+
+    # Peso de la observación: su visibilidad relativa al umbral (0 si no hay coordenadas)
+    observed = data[:, :, X:Z + 1]
+    has_observation = np.isfinite(observed).all(axis=2) & np.isfinite(visibility)
+    confidence = np.where(has_observation, np.clip(visibility / visibility_thresh, 0.0, 1.0), 0.0)
+    confidence = confidence.astype(data.dtype)[..., None]
+    blended = confidence * np.nan_to_num(observed) + (1 - confidence) * interpolated[:, :, X:Z + 1]
+
+    out[:, :, X:Z + 1] = np.where(fillable[..., None], blended, observed)
+    out[:, :, VISIBILITY] = np.where(fillable, interpolated[:, :, VISIBILITY], visibility)
+    return out, fillable
+
+
+def smooth(data: np.ndarray, window: int, polyorder: int) -> np.ndarray:
+    """
+    Suaviza con Savitzky-Golay las coordenadas x, y, z de un tensor (N, L, 4) a lo
+    largo del eje de fotogramas. Devuelve una copia; los NaN se conservan.
+    """
+    out = data.copy()
+    n = len(data)
+    # Ventana impar, no mayor que la serie y con margen sobre el orden del polinomio
+    window = min(window, n if n % 2 else n - 1)
+    if window % 2 == 0:
+        window -= 1
+    if window <= polyorder:
+        return out
+
+    coords = data[:, :, X:Z + 1]
+    known = np.isfinite(coords)
+    if not known.any():
+        return out
+    # Los tramos sin datos toman el valor válido más cercano (el anterior, o el siguiente al inicio)
+    previous, following = _neighbors(known)
+    nearest = np.where(previous >= 0, previous, following).clip(0, n - 1)
+    filled = np.take_along_axis(coords, nearest, axis=0)
+    smoothed = savgol_filter(filled, window, polyorder, axis=0, mode='interp')
+    out[:, :, X:Z + 1] = np.where(known, smoothed, np.nan)
+    return out
+
+
+def filter_landmarks(
+    landmarks: LandmarkSequence,
+    fps: float,
+    mode: str = 'savgol',
+    max_gap_s: float = 0.5,
+    window_s: float = 0.25,
+    polyorder: int = 2
+) -> LandmarkSequence:
+    """
+    Rellena los huecos cortos y, con ``mode='savgol'``, suaviza los landmarks de
+    imagen y de mundo. ``mode='interp'`` solo rellena huecos y ``'none'`` devuelve
+    la secuencia sin cambios. La ventana del filtro se da en segundos y se convierte
+    a fotogramas con el paso típico entre muestras.
+    """
+    if mode not in FILTER_MODES:
+        raise ValueError(f"Modo de filtrado '{mode}' no válido; opciones: {', '.join(FILTER_MODES)}.")
+    if mode == 'none' or len(landmarks) == 0:
+        return landmarks
+
+    times = landmarks.times(fps)
+    steps = np.diff(times)
+    step = float(np.median(steps[steps > 0])) if (steps > 0).any() else 1.0 / fps
+    window = 2 * int(round(window_s / step / 2)) + 1
+
+    filtered = []
+    for data in (landmarks.image, landmarks.world):
+        data, filled = fill_gaps(data, times, max_gap_s)
+        if mode == 'savgol':
+            data = smooth(data, window, polyorder)
+        filtered.append(data)
+        logger.debug(f"Filtrado de landmarks: {filled.sum()} muestras rellenadas, ventana de {window} fotogramas.")
+    return LandmarkSequence.from_arrays(filtered[0], filtered[1], landmarks.timestamps)
@@ -0,0 +1,238 @@
+# src/B_pose_estimation/frame_transport.py
+"""
+Transporte de fotogramas entre el pipeline y los procesos de estimación de pose
+mediante memoria compartida. El proceso principal escribe cada fotograma en un
+"slot" de un anillo preasignado y a los workers solo les llega un descriptor
+ligero y los índices de los slots; leen los fotogramas in situ y devuelven
+únicamente los landmarks, sin serializar imágenes en ningún sentido.
+
+Para clips que no caben cómodamente en RAM, ``MemmapFrameStore`` ofrece el mismo
+anillo respaldado por un fichero mapeado en memoria: el sistema operativo puede
+volcar sus páginas a disco en lugar de fallar con ``MemoryError``.
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Fracción de la RAM disponible a partir de la cual los fotogramas se vuelcan a disco
+SPILL_MEMORY_FRACTION = 0.5
+
+
+@dataclass(frozen=True)
+class FrameBufferRef:
+    """
+    Descriptor picklable de un buffer de fotogramas compartido: (slots, alto, ancho, canales).
+    ``path`` indica un buffer respaldado por fichero (``MemmapFrameStore``).
+    """
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str = 'uint8'
+    path: Optional[str] = None
+
+
+class SharedFrameRing:
+    """
+    Anillo de ``n_slots`` fotogramas preasignados en un bloque de memoria compartida.
+    Un hilo productor adquiere slots libres y otro (o el mismo) los libera cuando el
+    worker correspondiente ha terminado; la lista de slots libres está protegida
+    por un lock, de modo que productor y consumidor pueden ser hilos distintos.
+
+    Cada slot lleva un contador de referencias: un fotograma que usan dos tareas
+    (p. ej. como calentamiento del segmento siguiente) se ``retain``-ea y solo
+    vuelve a estar libre cuando todas lo han liberado.
+    """
+    def __init__(self, n_slots: int, frame_shape: Tuple[int, ...], dtype: str = 'uint8'):
+        shape = (int(n_slots), *frame_shape)
+        self.frames, self.ref = self._allocate(shape, dtype)
+        self._free = deque(range(shape[0]))
+        self._refs = np.zeros(shape[0], dtype=np.int32)
+        self._slot_freed = threading.Condition()
+
+    def _allocate(self, shape: Tuple[int, ...], dtype: str) -> Tuple[np.ndarray, FrameBufferRef]:
+        """Reserva el bloque de memoria compartida y devuelve la vista de fotogramas y su descriptor."""
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        logger.info(f"Anillo de memoria compartida creado: {shape[0]} slots de {shape[1:]} ({size / 1e6:.1f} MB).")
+        return np.ndarray(shape, dtype=dtype, buffer=self._shm.buf), FrameBufferRef(self._shm.name, shape, dtype)
+
+    @property
+    def n_slots(self) -> int:
+        return self.frames.shape[0]
+
+    @property
+    def frame_shape(self) -> Tuple[int, ...]:
+        return self.frames.shape[1:]
+
+    def has_free_slot(self) -> bool:
+        return bool(self._free)
+
+    def wait_for_slot(self, timeout: Optional[float] = None) -> bool:
+        """Espera hasta que haya un slot libre. Devuelve False si vence el ``timeout``."""
+        with self._slot_freed:
+            return self._slot_freed.wait_for(self.has_free_slot, timeout=timeout)
+
+    def acquire(self) -> int:
+        """Reserva un slot libre y devuelve su índice. Lanza ``IndexError`` si el anillo está lleno."""
+        with self._slot_freed:
+            slot = self._free.popleft()
+            self._refs[slot] = 1
+            return slot
+
+    def retain(self, slots: Iterable[int]) -> None:
+        """Añade una referencia a slots ya adquiridos, que necesitará una liberación más."""
+        with self._slot_freed:
+            for slot in slots:
+                self._refs[slot] += 1
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copia un fotograma en un slot libre y devuelve el índice del slot."""
+        slot = self.acquire()
+        np.copyto(self.frames[slot], frame)
+        return slot
+
+    def release(self, slots: Iterable[int]) -> None:
+        """Suelta una referencia de cada slot; los que quedan sin referencias vuelven al anillo."""
+        with self._slot_freed:
+            for slot in slots:
+                self._refs[slot] -= 1
+                if self._refs[slot] == 0:
+                    self._free.append(slot)
+            self._slot_freed.notify_all()
+
+    def close(self) -> None:
+        """Libera y elimina el bloque de memoria compartida."""
+        self.frames = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemmapFrameStore(SharedFrameRing):
+    """
+    Anillo de fotogramas respaldado por un fichero uint8 mapeado en memoria dentro
+    de ``directory`` (p. ej. el directorio de la sesión). Se usa igual que
+    ``SharedFrameRing``: ``frames[slot]`` son vistas sin copia y los workers lo abren
+    con ``attach_frames``. Como las páginas pertenecen a un fichero, el sistema
+    puede expulsarlas de la RAM cuando hay presión de memoria. El fichero se
+    elimina al cerrar el anillo.
+    """
+    def __init__(self, n_slots: int, frame_shape: Tuple[int, ...], directory: str, dtype: str = 'uint8'):
+        self.directory = directory
+        self.path: Optional[str] = None
+        super().__init__(n_slots, frame_shape, dtype)
+
+    def _allocate(self, shape: Tuple[int, ...], dtype: str) -> Tuple[np.ndarray, FrameBufferRef]:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix='.frames_', suffix='.bin', dir=self.directory)
+        os.close(fd)
+        frames = np.memmap(self.path, dtype=dtype, mode='w+', shape=shape)
+        logger.info(
+            f"Anillo de fotogramas en disco creado en {self.path}: {shape[0]} slots de {shape[1:]} "
+            f"({frames.nbytes / 1e6:.1f} MB)."
+        )
+        return frames, FrameBufferRef(os.path.basename(self.path), shape, dtype, path=self.path)
+
+    def close(self) -> None:
+        """Cierra el mapeo y elimina el fichero."""
+        self.frames = None
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning(f"No se pudo eliminar el fichero de fotogramas {self.path}: {e}")
+
+
+def available_memory() -> Optional[int]:
+    """RAM disponible en bytes, o None si el sistema no la expone."""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def should_spill(n_bytes: int, mode: str = 'auto') -> bool:
+    """
+    Decide si ``n_bytes`` de fotogramas deben ir a disco: siempre con ``mode='disk'``,
+    nunca con ``'memory'`` y, con ``'auto'``, si superan ``SPILL_MEMORY_FRACTION`` de la RAM disponible.
+    """
+    if mode in ('disk', 'memory'):
+        return mode == 'disk'
+    available = available_memory()
+    return available is not None and n_bytes > SPILL_MEMORY_FRACTION * available
+
+
+def create_frame_ring(
+    n_slots: int, frame_shape: Tuple[int, ...], spill_dir: str, spill: bool = False
+) -> SharedFrameRing:
+    """
+    Crea el anillo de fotogramas: en memoria compartida o, con ``spill`` o si no
+    se puede reservar la memoria compartida, en un fichero de ``spill_dir``.
+    """
+    if not spill:
+        try:
+            return SharedFrameRing(n_slots, frame_shape)
+        except (OSError, MemoryError) as e:
+            logger.warning(f"No se pudo reservar la memoria compartida ({e}); los fotogramas irán a disco.")
+    return MemmapFrameStore(n_slots, frame_shape, spill_dir)
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Abre un bloque de memoria compartida existente sin registrarlo en el
+    ``resource_tracker`` de este proceso. Solo el ``SharedFrameRing`` propietario
+    debe seguirlo y liberarlo: si el worker también lo registra, su tracker avisa
+    de un "leaked shared_memory" al cerrar (y puede llegar a borrarlo mientras el
+    propietario aún lo usa). Anular el registro después no basta: con ``fork``, un
+    worker creado después que el tracker del proceso principal comparte ese tracker y
+    el ``unregister`` borraría también la entrada del propietario.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    # Los workers abren los bloques desde un único hilo, así que el parche es seguro
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+# Bloques ya abiertos en este proceso worker, indexados por nombre (None para los ficheros mapeados)
+_attached: Dict[str, Tuple[Optional[shared_memory.SharedMemory], np.ndarray]] = {}
+
+
+def attach_frames(ref: FrameBufferRef) -> np.ndarray:
+    """
+    Lado worker: devuelve una vista numpy sobre el buffer compartido descrito por ``ref``.
+    La conexión se reutiliza entre tareas; al aparecer un buffer nuevo se cierran los anteriores.
+    """
+    entry = _attached.get(ref.name)
+    if entry is None:
+        stale = [shm for shm, _ in _attached.values() if shm is not None]
+        _attached.clear()
+        for shm in stale:
+            try:
+                shm.close()
+            except BufferError:
+                logger.warning(f"No se pudo cerrar el buffer compartido '{shm.name}': aún tiene vistas activas.")
+        if ref.path is not None:
+            entry = (None, np.memmap(ref.path, dtype=ref.dtype, mode='r', shape=ref.shape))
+        else:
+            shm = _attach_untracked(ref.name)
+            entry = (shm, np.ndarray(ref.shape, dtype=ref.dtype, buffer=shm.buf))
+        _attached[ref.name] = entry
+    return entry[1]
@@ -0,0 +1,141 @@
+# src/B_pose_estimation/keyframes.py
+"""
+Inferencia por fotogramas clave. En lugar de ejecutar el modelo en todos los
+fotogramas de un segmento, se ejecuta cada ``interval`` fotogramas y los
+intermedios se interpolan linealmente. Para no interpolar a ciegas los puntos
+donde el movimiento importa (arriba y abajo de cada repetición), los intervalos
+se subdividen por bisección mientras:
+
+- algún landmark se mueve más deprisa que ``velocity_thresh`` (fracción del
+  fotograma por fotograma),
+- el movimiento cambia de sentido respecto al intervalo vecino (un extremo), o
+- el landmark inferido en el punto medio discrepa de la interpolación en más
+  de ``error_thresh``.
+"""
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+from src.constants import NUM_POSE_LANDMARKS
+from src.B_pose_estimation.landmarks import X, Y, VISIBILITY
+
+# Desplazamiento (fracción del fotograma) por debajo del cual se considera ruido
+MOTION_NOISE = 0.005
+
+# Función que estima un fotograma del segmento: índice -> (imagen (33, 4), mundo (33, 4)) o None
+EstimateFn = Callable[[int], Optional[Tuple[np.ndarray, np.ndarray]]]
+
+
+def _displacement(landmarks: np.ndarray, a: int, b: int) -> Optional[np.ndarray]:
+    """Desplazamiento (33, 2) en imagen de los landmarks visibles entre a y b; None si falta alguna pose."""
+    pa, pb = landmarks[a, 0], landmarks[b, 0]
+    if np.isnan(pa[:, X]).all() or np.isnan(pb[:, X]).all():
+        return None
+    visible = (pa[:, VISIBILITY] > 0.5) & (pb[:, VISIBILITY] > 0.5)
+    return np.where(visible[:, None], pb[:, [X, Y]] - pa[:, [X, Y]], 0.0)
+
+
+def _reverses(d1: Optional[np.ndarray], d2: Optional[np.ndarray]) -> bool:
+    """True si algún landmark se mueve de forma apreciable en sentidos opuestos en d1 y d2."""
+    if d1 is None or d2 is None:
+        return False
+    significant = (np.abs(d1) > MOTION_NOISE) & (np.abs(d2) > MOTION_NOISE)
+    return bool((significant & (np.sign(d1) != np.sign(d2))).any())
+
+
+def interpolate_gaps(landmarks: np.ndarray, known: np.ndarray, fill: np.ndarray) -> None:
+    """Rellena in situ los fotogramas ``fill`` interpolando linealmente entre los fotogramas ``known``."""
+    known_idx = np.flatnonzero(known)
+    fill_idx = np.flatnonzero(fill)
+    if len(known_idx) == 0 or len(fill_idx) == 0:
+        return
+    if len(known_idx) == 1:
+        landmarks[fill_idx] = landmarks[known_idx[0]]
+        return
+    right = np.clip(np.searchsorted(known_idx, fill_idx), 1, len(known_idx) - 1)
+    left_frame, right_frame = known_idx[right - 1], known_idx[right]
+    t = np.clip((fill_idx - left_frame) / (right_frame - left_frame), 0.0, 1.0).astype(np.float32)
+    t = t.reshape(-1, *([1] * (landmarks.ndim - 1)))
+    landmarks[fill_idx] = landmarks[left_frame] + t * (landmarks[right_frame] - landmarks[left_frame])
+
+
+def estimate_keyframes(
+    estimate: EstimateFn,
+    n_frames: int,
+    interval: int,
+    velocity_thresh: float,
+    error_thresh: float,
+    reset: Optional[Callable[[], None]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estima la pose de ``n_frames`` fotogramas inferiendo solo los necesarios.
+
+    La bisección vuelve a fotogramas anteriores al último inferido. Como el tracking
+    y el suavizado del estimador solo avanzan hacia delante, antes de cada inferencia
+    fuera de orden se llama a ``reset`` para que el estado de un fotograma posterior
+    no contamine al punto medio; dentro de cada nivel los puntos medios van en orden.
+
+    Returns:
+        (landmarks, inferred): array (n, 2, 33, 4) float32 con imagen y mundo (NaN sin pose)
+        y máscara (n,) de los fotogramas en los que se ejecutó el modelo.
+    """
+    landmarks = np.full((n_frames, 2, NUM_POSE_LANDMARKS, 4), np.nan, dtype=np.float32)
+    inferred = np.zeros(n_frames, dtype=bool)
+    if n_frames == 0:
+        return landmarks, inferred
+
+    last = -1
+
+    def infer(i: int) -> None:
+        nonlocal last
+        if i < last and reset is not None:
+            reset()
+        last = i
+        result = estimate(i)
+        inferred[i] = True
+        if result is not None:
+            landmarks[i, 0], landmarks[i, 1] = result
+
+    # 1. Fotogramas clave en orden (el tracking del estimador avanza hacia delante)
+    keys = list(range(0, n_frames, max(1, interval)))
+    if keys[-1] != n_frames - 1:
+        keys.append(n_frames - 1)
+    for i in keys:
+        infer(i)
+
+    # 2. Bisección de los intervalos con movimiento rápido, cambios de sentido o sin pose
+    displacements = {(a, b): _displacement(landmarks, a, b) for a, b in zip(keys, keys[1:])}
+    refine: List[Tuple[int, int]] = []
+    for k, (a, b) in enumerate(zip(keys, keys[1:])):
+        if b - a <= 1:
+            continue
+        d = displacements[(a, b)]
+        prev_d = displacements.get((keys[k - 1], a)) if k > 0 else None
+        next_d = displacements.get((b, keys[k + 2])) if k + 2 < len(keys) else None
+        if (d is None
+                or np.abs(d).max() / (b - a) > velocity_thresh
+                or _reverses(prev_d, d) or _reverses(d, next_d)):
+            refine.append((a, b))
+
+    while refine:
+        next_refine = []
+        for a, b in sorted(refine):
+            m = (a + b) // 2
+            infer(m)
+            # ¿Se habría equivocado la interpolación en el punto medio?
+            d_am, d_mb = _displacement(landmarks, a, m), _displacement(landmarks, m, b)
+            if d_am is None or d_mb is None:
+                needs_more = True
+            else:
+                t = (m - a) / (b - a)
+                expected = landmarks[a, 0][:, [X, Y]] + t * (landmarks[b, 0][:, [X, Y]] - landmarks[a, 0][:, [X, Y]])
+                visible = (landmarks[m, 0][:, VISIBILITY] > 0.5)
+                error = np.abs(landmarks[m, 0][:, [X, Y]] - expected)[visible]
+                needs_more = (error.size > 0 and error.max() > error_thresh) or _reverses(d_am, d_mb)
+            if needs_more:
+                next_refine.extend(iv for iv in ((a, m), (m, b)) if iv[1] - iv[0] > 1)
+        refine = next_refine
+
+    # 3. Interpolación lineal del resto entre los fotogramas inferidos con pose
+    valid = inferred & ~np.isnan(landmarks[:, 0, :, X]).all(axis=1)
+    interpolate_gaps(landmarks, valid, ~inferred)
+    return landmarks, inferred
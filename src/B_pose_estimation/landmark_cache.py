@@ -0,0 +1,151 @@
+# src/B_pose_estimation/landmark_cache.py
+"""
+Caché persistente de landmarks en disco. Volver a analizar el mismo clip (p. ej.
+con otro ejercicio u otros umbrales) no necesita repetir la extracción ni la
+estimación de pose: basta con los landmarks, que se guardan como ``.npz``.
+
+La clave combina el hash del contenido del vídeo con todo lo que cambia los
+landmarks (rotación, sample rate, tamaño de preproceso y ajustes del estimador).
+El tamaño total está acotado y se expulsan primero las entradas usadas hace más
+tiempo (LRU, según la fecha de modificación, que se actualiza en cada acierto).
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+from src.B_pose_estimation.landmarks import LandmarkSequence
+
+logger = logging.getLogger(__name__)
+
+# Nombre del directorio de la caché dentro del directorio de salida
+CACHE_DIRNAME = '.pose_cache'
+# Versión del formato de las entradas; cambiarla invalida todas las anteriores
+CACHE_FORMAT_VERSION = 1
+
+_HASH_CHUNK = 1 << 20
+
+# Hashes ya calculados, indexados por (ruta, tamaño, mtime) para no releer el fichero
+_content_hashes: Dict[Tuple[str, int, int], str] = {}
+_content_hashes_lock = threading.Lock()
+
+
+def video_content_hash(video_path: str) -> str:
+    """SHA-256 del contenido del vídeo, memorizado mientras el fichero no cambie."""
+    stat = os.stat(video_path)
+    memo_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+    with _content_hashes_lock:
+        cached = _content_hashes.get(memo_key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(video_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(block)
+    content_hash = digest.hexdigest()
+    with _content_hashes_lock:
+        _content_hashes[memo_key] = content_hash
+    return content_hash
+
+
+class LandmarkCache:
+    """Caché LRU de ``LandmarkSequence`` en un directorio, acotada a ``max_bytes``."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        video_path: str,
+        rotate: Optional[int],
+        sample_rate: int,
+        preprocess_size: Optional[Tuple[int, int]],
+        estimator_settings: Dict[str, Any],
+        sampling: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Construye la clave de una entrada a partir del vídeo y de la configuración de extracción."""
+        description = {
+            'version': CACHE_FORMAT_VERSION,
+            'video': video_content_hash(video_path),
+            'rotate': rotate or 0,
+            'sample_rate': int(sample_rate or 1),
+            'preprocess_size': list(preprocess_size) if preprocess_size else None,
+            'estimator': estimator_settings,
+            'sampling': sampling,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[LandmarkSequence]:
+        """Devuelve los landmarks guardados para ``key`` o None si no hay entrada válida."""
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                timestamps = data['timestamps'] if 'timestamps' in data.files else None
+                landmarks = LandmarkSequence(data['image'], data['world'], data['valid'], timestamps)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de la caché de landmarks corrupta ({path}): {e}. Se descarta.")
+            self._remove(path)
+            return None
+
+        # Marcamos la entrada como usada recientemente para el LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        logger.info(f"Landmarks recuperados de la caché: {len(landmarks)} fotogramas.")
+        return landmarks
+
+    def put(self, key: str, landmarks: LandmarkSequence) -> None:
+        """Guarda los landmarks de forma atómica y aplica el límite de tamaño."""
+        if landmarks.nbytes > self.max_bytes:
+            logger.info("Los landmarks superan el tamaño máximo de la caché; no se guardan.")
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                arrays = dict(image=landmarks.image, world=landmarks.world, valid=landmarks.valid)
+                if landmarks.timestamps is not None:
+                    arrays['timestamps'] = landmarks.timestamps
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f"No se pudieron guardar los landmarks en la caché: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Elimina las entradas usadas hace más tiempo hasta quedar por debajo de ``max_bytes``."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.npz'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            logger.info(f"Caché de landmarks llena: se elimina {os.path.basename(path)}.")
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,131 @@
+# src/B_pose_estimation/landmarks.py
+"""
+Representación compacta de los landmarks de toda una sesión. En lugar de listas de
+33 diccionarios por fotograma, guarda arrays (N, 33, 4) float32 con las columnas
+x, y, z y visibility, más una máscara de validez por fotograma. Los slices son
+vistas (sin copias) y el objeto se serializa como unos pocos buffers contiguos.
+"""
+import numpy as np
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Union
+
+from src.constants import NUM_POSE_LANDMARKS
+
+# Índices de las columnas del último eje
+X, Y, Z, VISIBILITY = range(4)
+
+
+@dataclass
+class LandmarkSequence:
+    """
+    Landmarks de N fotogramas.
+
+    Attributes:
+        image: (N, 33, 4) landmarks normalizados a la imagen procesada.
+        world: (N, 33, 4) landmarks 3D en metros centrados en la cadera.
+        valid: (N,) True si el estimador detectó una pose en el fotograma.
+        timestamps: (N,) instante real (s) de cada fotograma en el vídeo original, o
+            None si los fotogramas están equiespaciados (índice / fps).
+    """
+    image: np.ndarray
+    world: np.ndarray
+    valid: np.ndarray
+    timestamps: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls, n_frames: int) -> 'LandmarkSequence':
+        """Crea una secuencia de ``n_frames`` fotogramas sin pose (NaN)."""
+        shape = (n_frames, NUM_POSE_LANDMARKS, 4)
+        return cls(
+            image=np.full(shape, np.nan, dtype=np.float32),
+            world=np.full(shape, np.nan, dtype=np.float32),
+            valid=np.zeros(n_frames, dtype=bool),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, image: np.ndarray, world: np.ndarray, timestamps: Optional[np.ndarray] = None
+    ) -> 'LandmarkSequence':
+        """Construye la secuencia deduciendo la validez de los NaN de ``image``."""
+        image = np.ascontiguousarray(image, dtype=np.float32)
+        world = np.ascontiguousarray(world, dtype=np.float32)
+        valid = ~np.isnan(image[:, :, X]).all(axis=1)
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps, dtype=np.float64)
+        return cls(image, world, valid, timestamps)
+
+    @classmethod
+    def from_packed(cls, packed: np.ndarray, timestamps: Optional[np.ndarray] = None) -> 'LandmarkSequence':
+        """Construye la secuencia a partir del array (N, 2, 33, 4) que devuelven los workers."""
+        return cls.from_arrays(packed[:, 0], packed[:, 1], timestamps)
+
+    @classmethod
+    def from_results(cls, results: Iterable) -> 'LandmarkSequence':
+        """Construye la secuencia a partir de una lista de ``EstimationResult``."""
+        results = list(results)
+        return cls.from_arrays(
+            stack_frames([r.landmarks for r in results]),
+            stack_frames([r.world_landmarks for r in results]),
+        )
+
+    @classmethod
+    def concatenate(cls, sequences: Iterable['LandmarkSequence']) -> 'LandmarkSequence':
+        sequences = list(sequences)
+        if not sequences:
+            return cls.empty(0)
+        has_timestamps = all(s.timestamps is not None for s in sequences)
+        return cls(
+            image=np.concatenate([s.image for s in sequences]),
+            world=np.concatenate([s.world for s in sequences]),
+            valid=np.concatenate([s.valid for s in sequences]),
+            timestamps=np.concatenate([s.timestamps for s in sequences]) if has_timestamps else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, index: Union[int, slice]) -> 'LandmarkSequence':
+        """Con un slice devuelve vistas sobre los mismos arrays; con un entero, una secuencia de 1."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 if index != -1 else None)
+        timestamps = self.timestamps[index] if self.timestamps is not None else None
+        return LandmarkSequence(self.image[index], self.world[index], self.valid[index], timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        extra = self.timestamps.nbytes if self.timestamps is not None else 0
+        return self.image.nbytes + self.world.nbytes + self.valid.nbytes + extra
+
+    def times(self, fps: float) -> np.ndarray:
+        """Instante (s) de cada fotograma: los timestamps reales o, si no hay, índice / fps."""
+        if self.timestamps is not None:
+            return self.timestamps
+        return np.arange(len(self)) / fps
+
+    def frame(self, index: int) -> Optional[np.ndarray]:
+        """Landmarks de imagen (33, 4) de un fotograma, o None si no hubo detección."""
+        return self.image[index] if self.valid[index] else None
+
+    def metric_source(self, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Landmarks sobre los que se calculan las métricas: los 3D de mundo cuando
+        existen y, si no, los de imagen. Devuelve un array (N, 33, 4) nuevo, o
+        (N, len(indices), 4) si solo se piden algunos landmarks.
+        """
+        no_world = np.isnan(self.world[:, :, X]).all(axis=1)
+        if indices is None:
+            source = self.world.copy()
+            source[no_world] = self.image[no_world]
+        else:
+            source = self.world.take(indices, axis=1)
+            source[no_world] = self.image[no_world].take(indices, axis=1)
+        return source
+
+
+def stack_frames(frames: List[Optional[np.ndarray]]) -> np.ndarray:
+    """Apila landmarks (33, 4) de varios fotogramas en un array (N, 33, 4); None pasa a NaN."""
+    out = np.full((len(frames), NUM_POSE_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for i, frame in enumerate(frames):
+        if frame is not None:
+            out[i] = frame
+    return out
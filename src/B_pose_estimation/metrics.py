@@ -2,21 +2,25 @@
 """
 Contiene funciones puras para el cálculo de métricas biomecánicas.
 Responsabilidad: matemáticas y biomecánica.
+
+Los landmarks de un fotograma son arrays (33, 4) con columnas x, y, z, visibility
+(ver ``src.B_pose_estimation.landmarks``).
 """
 import numpy as np
 import pandas as pd
 import math
 
+from src.B_pose_estimation.landmarks import X, Y
+
 def normalize_landmarks(landmarks):
     """Centra los landmarks en el punto medio de la cadera."""
-    hip_left, hip_right = landmarks[23], landmarks[24]
-    cx = (hip_left['x'] + hip_right['x']) / 2.0
-    cy = (hip_left['y'] + hip_right['y']) / 2.0
-    return [{'x': lm['x'] - cx, 'y': lm['y'] - cy, 'z': lm['z'], 'visibility': lm['visibility']} for lm in landmarks]
+    normalized = np.array(landmarks, dtype=np.float32)
+    normalized[:, [X, Y]] -= (normalized[23, [X, Y]] + normalized[24, [X, Y]]) / 2.0
+    return normalized
 
 def calculate_angle(p1, p2, p3):
     """Calcula el ángulo (en grados) formado por tres puntos."""
-    v1, v2 = (p1['x'] - p2['x'], p1['y'] - p2['y']), (p3['x'] - p2['x'], p3['y'] - p2['y'])
+    v1, v2 = (p1[X] - p2[X], p1[Y] - p2[Y]), (p3[X] - p2[X], p3[Y] - p2[Y])
     dot_product, mag1, mag2 = (
         v1[0] * v2[0] + v1[1] * v2[1],
         math.hypot(v1[0], v1[1]),
@@ -40,8 +44,8 @@ def extract_joint_angles(landmarks):
 def calculate_distances(landmarks):
     """Calcula distancias clave."""
     return {
-        'anchura_hombros': abs(landmarks[12]['x'] - landmarks[11]['x']),
-        'separacion_pies': abs(landmarks[28]['x'] - landmarks[27]['x']),
+        'anchura_hombros': float(abs(landmarks[12, X] - landmarks[11, X])),
+        'separacion_pies': float(abs(landmarks[28, X] - landmarks[27, X])),
     }
 
 def calculate_angular_velocity(angle_sequence, fps):
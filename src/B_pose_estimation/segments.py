@@ -0,0 +1,154 @@
+# src/B_pose_estimation/segments.py
+"""
+Planificación de segmentos para la estimación de pose en paralelo. Los fotogramas
+se agrupan en muchos segmentos contiguos y pequeños que los workers van tomando
+del pool a medida que quedan libres, lo que reparte mejor la carga que un trozo
+grande por worker.
+
+Como MediaPipe hace tracking y suavizado entre fotogramas, un estimador que
+empieza en frío al inicio de cada segmento produciría saltos en las costuras.
+Para evitarlo, cada segmento (salvo el primero) arranca con unos pocos
+fotogramas de calentamiento, que son los últimos del segmento anterior: el
+worker los procesa para recuperar el estado y después descarta sus landmarks.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from src.B_pose_estimation.frame_transport import SharedFrameRing
+
+logger = logging.getLogger(__name__)
+
+# El calentamiento nunca pasa de esta fracción del segmento
+MAX_WARMUP_FRACTION = 0.5
+# Por encima de esta fracción de inferencias extra se avisa en el log
+WARMUP_WARNING_FRACTION = 0.25
+# Segmentos que ocupan el anillo además de los ``max_in_flight`` enviados: el que se está construyendo
+EXTRA_RING_SEGMENTS = 1
+
+
+@dataclass(frozen=True)
+class SegmentPlan:
+    """
+    Tamaños de la estimación de pose en paralelo.
+
+    Attributes:
+        segment_size: Fotogramas propios de cada segmento.
+        warmup: Fotogramas de calentamiento al inicio de cada segmento.
+        max_in_flight: Segmentos enviados al pool a la vez.
+        ring_slots: Slots del anillo, suficientes para esos segmentos.
+    """
+    segment_size: int
+    warmup: int
+    max_in_flight: int
+    ring_slots: int
+
+    @property
+    def warmup_overhead(self) -> float:
+        """Inferencias extra por fotograma útil debidas al calentamiento."""
+        return self.warmup / self.segment_size
+
+
+def plan_segments(chunk_size: int, warmup: int, workers: int, ring_slots: int = 0) -> SegmentPlan:
+    """
+    Calcula el plan de segmentos. El tamaño de segmento es siempre ``chunk_size``
+    y el calentamiento se limita a ``MAX_WARMUP_FRACTION`` de él. Con
+    ``ring_slots <= 0`` el anillo se dimensiona para tener ``2 * workers``
+    segmentos en vuelo; con un anillo fijo se reducen los segmentos en vuelo (nunca
+    el tamaño de segmento), y si no cabe ni uno se amplía el anillo al mínimo.
+    """
+    segment_size = max(1, chunk_size)
+    capped = min(max(0, warmup), int(segment_size * MAX_WARMUP_FRACTION))
+    if capped < warmup:
+        logger.warning(
+            f"segment_warmup={warmup} es demasiado para segmentos de {segment_size} fotogramas; se usan {capped}."
+        )
+    warmup = capped
+    if warmup / segment_size > WARMUP_WARNING_FRACTION:
+        logger.warning(
+            f"El calentamiento de los segmentos añade un {warmup / segment_size:.0%} de inferencias extra; "
+            f"conviene subir chunk_size o bajar segment_warmup."
+        )
+
+    slots_per_segment = segment_size + warmup
+    wanted = 2 * max(1, workers)
+    if ring_slots <= 0:
+        max_in_flight = wanted
+        ring_slots = (max_in_flight + EXTRA_RING_SEGMENTS) * slots_per_segment
+    else:
+        max_in_flight = min(wanted, ring_slots // slots_per_segment - EXTRA_RING_SEGMENTS)
+        if max_in_flight < 1:
+            max_in_flight = 1
+            minimum = (1 + EXTRA_RING_SEGMENTS) * slots_per_segment
+            logger.warning(f"ring_slots={ring_slots} no admite segmentos de {slots_per_segment} slots; se usan {minimum}.")
+            ring_slots = minimum
+        if max_in_flight < workers:
+            logger.warning(
+                f"ring_slots={ring_slots} solo admite {max_in_flight} segmentos en vuelo para {workers} procesos; "
+                f"parte de los procesos quedará ociosa (ring_slots: 0 lo ajusta automáticamente)."
+            )
+    return SegmentPlan(segment_size, warmup, max_in_flight, ring_slots)
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    Segmento listo para enviar a un worker.
+
+    Attributes:
+        slots: Slots del anillo, incluidos primero los ``warmup`` de calentamiento.
+        warmup: Número de slots iniciales cuyos landmarks se descartan.
+        items: Datos asociados a los fotogramas propios del segmento (sin calentamiento).
+    """
+    slots: List[int]
+    warmup: int
+    items: List[Any]
+
+    @property
+    def n_frames(self) -> int:
+        """Fotogramas cuyos landmarks produce el segmento."""
+        return len(self.slots) - self.warmup
+
+
+class SegmentBuilder:
+    """
+    Construye segmentos en streaming a partir de slots que llegan en orden. Los
+    slots que se reutilizan como calentamiento del segmento siguiente se retienen
+    en el anillo, así que cada slot de un segmento debe liberarse con
+    ``ring.release(segment.slots)`` cuando el worker termine.
+    """
+    def __init__(self, ring: SharedFrameRing, segment_size: int, warmup: int):
+        if warmup >= segment_size:
+            raise ValueError("El calentamiento debe ser menor que el tamaño de segmento.")
+        self.ring = ring
+        self.segment_size = segment_size
+        self.warmup = max(0, warmup)
+        self._slots: List[int] = []
+        self._items: List[Any] = []
+        self._carry: List[int] = []
+
+    def add(self, slot: int, item: Any = None) -> Optional[Segment]:
+        """Añade el slot de un fotograma; devuelve un segmento cuando se completa."""
+        self._slots.append(slot)
+        self._items.append(item)
+        if len(self._slots) == self.segment_size:
+            return self._emit()
+        return None
+
+    def flush(self) -> Optional[Segment]:
+        """Devuelve el último segmento incompleto, si lo hay, y suelta el calentamiento retenido."""
+        if self._slots:
+            return self._emit(last=True)
+        if self._carry:
+            self.ring.release(self._carry)
+            self._carry = []
+        return None
+
+    def _emit(self, last: bool = False) -> Segment:
+        segment = Segment(self._carry + self._slots, len(self._carry), self._items)
+        # Los últimos fotogramas sirven de calentamiento al siguiente segmento
+        self._carry = [] if last or not self.warmup else self._slots[-self.warmup:]
+        if self._carry:
+            self.ring.retain(self._carry)
+        self._slots, self._items = [], []
+        return segment
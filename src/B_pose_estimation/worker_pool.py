@@ -0,0 +1,242 @@
+# src/B_pose_estimation/worker_pool.py
+"""
+Pool persistente de procesos de estimación de pose. Se arranca una vez por proceso
+(GUI, Streamlit o CLI) y se reutiliza entre análisis: cada worker mantiene su
+estimador ya inicializado, de modo que los análisis consecutivos no pagan de nuevo
+la carga del modelo ni la creación de los procesos.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.constants import NUM_POSE_LANDMARKS
+from src.B_pose_estimation.estimators import BaseEstimator
+from src.B_pose_estimation.frame_transport import FrameBufferRef, attach_frames
+from src.B_pose_estimation.keyframes import estimate_keyframes
+
+logger = logging.getLogger(__name__)
+
+
+# --- Lado worker ---
+
+# Estimador propio de cada proceso worker, creado una única vez por el initializer
+_worker_estimator: Optional[BaseEstimator] = None
+
+
+def _init_pose_worker(use_3d_analysis: bool) -> None:
+    """Initializer de los procesos hijo: crea el estimador UNA vez por proceso."""
+    # Importamos y creamos el estimador DENTRO del proceso hijo
+    from src.B_pose_estimation.estimators import BlazePose3DEstimator, CroppedPoseEstimator
+
+    # Los workers solo devuelven landmarks: la anotación la hace el pipeline si la necesita.
+    # Los fotogramas del anillo ya llegan en RGB (ver ``process_ring_slots``).
+    global _worker_estimator
+    estimator_cls = BlazePose3DEstimator if use_3d_analysis else CroppedPoseEstimator
+    _worker_estimator = estimator_cls(draw_annotations=False, input_rgb=True)
+
+
+def _worker_status() -> Dict[str, Any]:
+    """Tarea de health check: identifica al worker e indica si su estimador está listo."""
+    # Pequeña espera para que las sondas se repartan entre todos los procesos
+    time.sleep(0.05)
+    return {'pid': os.getpid(), 'ready': _worker_estimator is not None}
+
+
+def _estimate_slot(estimator: BaseEstimator, frame: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Estima un fotograma y devuelve (imagen, mundo) como arrays (33, 4); None si no hay pose o falla."""
+    try:
+        result = estimator.estimate(frame)
+    except Exception as e:
+        # Dejamos el fotograma sin pose (NaN) para no romper la secuencia
+        logger.error(f"Error procesando un frame en un worker: {e}")
+        return None
+    if result.landmarks is None:
+        return None
+    world = result.world_landmarks
+    if world is None:
+        world = np.full_like(result.landmarks, np.nan)
+    return result.landmarks, world
+
+
+def process_ring_slots(
+    ref: FrameBufferRef,
+    slots: List[int],
+    warmup: int = 0,
+    keyframes: Optional[Dict[str, float]] = None
+) -> Tuple[np.ndarray, int]:
+    """
+    Función worker que se ejecuta en un proceso del pool.
+    Lee un segmento de fotogramas consecutivos (en RGB, ya preprocesados) directamente
+    del anillo de memoria compartida y devuelve solo sus landmarks como un array (n, 2, 33, 4) float32
+    (imagen y mundo), con NaN en los fotogramas sin pose, junto al número de
+    fotogramas en los que se ejecutó el modelo. Los ``warmup`` primeros slots solo
+    sirven para que el tracking arranque en caliente: se procesan y se descartan,
+    así que ``n = len(slots) - warmup``.
+
+    Con ``keyframes`` ({'interval', 'velocity_thresh', 'error_thresh'}) el modelo
+    solo se ejecuta en los fotogramas clave que elige ``estimate_keyframes`` y el
+    resto se interpola.
+    """
+    estimator = _worker_estimator
+    frames = attach_frames(ref)
+
+    # Cada segmento empieza sin estado de tracking, igual que con un estimador nuevo
+    estimator.reset()
+
+    interval = int(keyframes['interval']) if keyframes else 1
+    # El calentamiento sigue el mismo paso que los fotogramas clave y acaba justo antes del segmento
+    for slot in slots[:warmup][::-1][::interval][::-1]:
+        _estimate_slot(estimator, frames[slot])
+
+    body = slots[warmup:]
+    if interval > 1:
+        landmarks, inferred = estimate_keyframes(
+            lambda i: _estimate_slot(estimator, frames[body[i]]), len(body), interval,
+            keyframes['velocity_thresh'], keyframes['error_thresh'], reset=estimator.reset,
+        )
+        return landmarks, int(inferred.sum())
+
+    landmarks = np.full((len(body), 2, NUM_POSE_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for i, slot in enumerate(body):
+        result = _estimate_slot(estimator, frames[slot])
+        if result is not None:
+            landmarks[i, 0], landmarks[i, 1] = result
+    return landmarks, len(body)
+
+
+# --- Lado proceso principal ---
+
+def _default_workers() -> int:
+    from src.config import settings
+    workers = settings.performance_params.max_workers
+    return workers if workers > 0 else max(1, (os.cpu_count() or 2) - 1)
+
+
+def _default_use_3d() -> bool:
+    from src.config import settings
+    return settings.analysis_params.use_3d_analysis
+
+
+class PoseWorkerPool:
+    """
+    Envoltorio de larga vida sobre un ``ProcessPoolExecutor`` cuyos procesos tienen
+    un estimador caliente. Si el pool se rompe (p. ej. un worker muere), se recrea
+    en el siguiente ``submit``.
+    """
+    def __init__(self, max_workers: Optional[int] = None, use_3d_analysis: Optional[bool] = None):
+        self.max_workers = max_workers or _default_workers()
+        self.use_3d_analysis = _default_use_3d() if use_3d_analysis is None else use_3d_analysis
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    @property
+    def estimator_settings(self) -> Dict[str, Any]:
+        """Ajustes del estimador de los workers; determinan los landmarks que producen."""
+        from src.B_pose_estimation.estimators import CROP_SETTINGS, POSE_SETTINGS
+        if self.use_3d_analysis:
+            return {'estimator': 'BlazePose3DEstimator', **POSE_SETTINGS}
+        return {'estimator': 'CroppedPoseEstimator', **CROP_SETTINGS}
+
+    def start(self, warm_up: bool = True) -> 'PoseWorkerPool':
+        """Crea los procesos. Con ``warm_up`` lanza sondas para que carguen el modelo ya."""
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Arrancando pool de pose con {self.max_workers} procesos (3D={self.use_3d_analysis}).")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_pose_worker,
+                    initargs=(self.use_3d_analysis,),
+                )
+                if warm_up:
+                    for _ in range(self.max_workers):
+                        self._executor.submit(_worker_status)
+        return self
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Envía una tarea al pool, recreándolo si se había roto."""
+        self.start(warm_up=False)
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            logger.warning("El pool de pose estaba roto; se recrea.")
+            self.shutdown(wait=False)
+            self.start(warm_up=False)
+            return self._executor.submit(fn, *args)
+
+    def health_check(self, timeout: float = 30.0) -> Dict[str, Any]:
+        """
+        Sondea a los workers y devuelve un resumen: si el pool responde, qué procesos
+        contestaron y cuántos tienen el estimador inicializado.
+        """
+        if self._executor is None:
+            return {'alive': False, 'workers': 0, 'ready': 0, 'pids': []}
+        try:
+            futures = [self._executor.submit(_worker_status) for _ in range(self.max_workers)]
+        except BrokenProcessPool:
+            return {'alive': False, 'workers': 0, 'ready': 0, 'pids': []}
+
+        done, _ = wait(futures, timeout=timeout)
+        statuses = {}
+        for future in done:
+            try:
+                status = future.result()
+                statuses[status['pid']] = status['ready']
+            except Exception as e:
+                logger.error(f"Un worker de pose no respondió al health check: {e}")
+        return {
+            'alive': bool(statuses),
+            'workers': len(statuses),
+            'ready': sum(statuses.values()),
+            'pids': sorted(statuses),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Detiene los procesos de forma ordenada, cancelando las tareas pendientes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info("Deteniendo el pool de pose.")
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Pool compartido por todo el proceso
+_pool: Optional[PoseWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pose_worker_pool() -> PoseWorkerPool:
+    """
+    Devuelve el pool del proceso, arrancándolo si hace falta. Si la configuración
+    del estimador ha cambiado desde el arranque, el pool se recrea.
+    """
+    global _pool
+    with _pool_lock:
+        workers, use_3d = _default_workers(), _default_use_3d()
+        if _pool is not None and (_pool.max_workers, _pool.use_3d_analysis) != (workers, use_3d):
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = PoseWorkerPool(workers, use_3d)
+        return _pool.start()
+
+
+def shutdown_pose_worker_pool(wait: bool = True) -> None:
+    """Detiene el pool del proceso si estaba arrancado."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+atexit.register(shutdown_pose_worker_pool)
@@ -3,15 +3,18 @@
 Módulo central y unificado para todo el análisis de ejercicios.
 Contiene un motor de análisis genérico, robusto y optimizado.
 """
+import numpy as np
 import pandas as pd
 from scipy.signal import find_peaks
 import logging
-from typing import List, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from src.config import ExerciseParams, MetricDefinition
-from src.constants import MetricType
 from src.B_pose_estimation.estimators import EstimationResult
-from src.D_modeling.math_utils import calculate_angle_3d
+from src.B_pose_estimation.landmarks import LandmarkSequence
+from src.D_modeling.fault_engine import compile_fault_rules, exercise_fault_rules
+from src.D_modeling.metric_engine import compile_metrics
 
 try:
     import mediapipe as mp
@@ -23,96 +26,209 @@ logger = logging.getLogger(__name__)
 
 
 def calculate_metrics(
-    estimation_results: List[EstimationResult], 
+    landmarks: Union[LandmarkSequence, List[EstimationResult]],
     fps: int, 
     metric_definitions: List[MetricDefinition]
 ) -> pd.DataFrame:
     """
     Motor de cálculo de métricas genérico, optimizado y robusto.
-    Calcula solo las métricas especificadas en la lista de definiciones.
+    Calcula solo las métricas especificadas en la lista de definiciones a partir
+    de una ``LandmarkSequence`` (o de una lista de ``EstimationResult``).
 
     Returns:
         pd.DataFrame: Un DataFrame con una fila por frame y columnas para
-                      cada métrica calculada.
+                      cada métrica calculada (NaN si los landmarks no son visibles).
     """
     if not PoseLandmark:
         logger.error("MediaPipe no está disponible para calcular métricas.")
         return pd.DataFrame()
 
-    # Preparamos las estructuras de salida y convertimos los nombres de landmark
-    # a índices para evitar búsquedas costosas dentro del bucle principal
-    name_to_idx = {lm.name: lm.value for lm in PoseLandmark}
-
-    metric_rules = []  # (tipo, nombre_columna, indices)
-    for metric in metric_definitions:
-        if metric.type == MetricType.ANGLE:
-            idxs = [name_to_idx[n] for n in metric.point_names]
-            metric_rules.append((MetricType.ANGLE, metric.name, idxs))
-        elif metric.type == MetricType.HEIGHT:
-            idx = name_to_idx[metric.point_name]
-            metric_rules.append((MetricType.HEIGHT, metric.name, [idx]))
-
-    base_columns = {'frame_idx': [], 'time_s': []}
-    metric_columns = {name: [] for _, name, _ in metric_rules}
-    data = {**base_columns, **metric_columns}
-
-    for frame_idx, result in enumerate(estimation_results):
-        data['frame_idx'].append(frame_idx)
-        data['time_s'].append(frame_idx / fps)
-
-        source_landmarks = result.world_landmarks or result.landmarks
-        if source_landmarks:
-            visible_landmarks = [lm if lm['visibility'] > 0.5 else None for lm in source_landmarks]
-        else:
-            visible_landmarks = []
-
-        for rule_type, metric_name, idxs in metric_rules:
-            metric_value = None
-            try:
-                if all(i < len(visible_landmarks) and visible_landmarks[i] is not None for i in idxs):
-                    if rule_type == MetricType.ANGLE:
-                        p1, p2, p3 = (visible_landmarks[i] for i in idxs)
-                        metric_value = calculate_angle_3d(p1, p2, p3)
-                    else:  # HEIGHT
-                        metric_value = visible_landmarks[idxs[0]]['y']
-            except Exception as e:
-                logger.error(f"Error calculando métrica '{metric_name}' en frame {frame_idx}: {e}")
-
-            data[metric_name].append(metric_value)
-
-    return pd.DataFrame.from_dict(data)
+    if not isinstance(landmarks, LandmarkSequence):
+        landmarks = LandmarkSequence.from_results(landmarks)
 
+    # El motor se compila una vez por conjunto de definiciones y evalúa todos los
+    # fotogramas con operaciones vectorizadas
+    return compile_metrics(metric_definitions).evaluate(landmarks, fps)
 
-def count_repetitions(df_metrics: pd.DataFrame, params: ExerciseParams) -> int:
+
+def _rep_signal(df_metrics: pd.DataFrame, params: ExerciseParams) -> Tuple[np.ndarray, Optional[np.ndarray]]:
     """
-    Wrapper unificado que cuenta repeticiones usando el robusto algoritmo de detección de valles.
-    Recibe todos los parámetros a través del objeto de configuración.
+    Serie sobre la que se buscan las repeticiones y, si se remuestreó, el instante
+    de cada una de sus muestras (None si coincide con las filas del DataFrame).
     """
-    angle_column = params.rep_counter_metric
-    
-    if df_metrics.empty or angle_column not in df_metrics.columns:
-        logger.warning(f"No se puede contar repeticiones, falta la columna '{angle_column}'.")
-        return 0
-
-    angles = df_metrics[angle_column].ffill().bfill().to_numpy()
-    if len(angles) == 0:
-        return 0
-
-    inverted_angles = -angles
-    inverted_threshold = -params.low_thresh
-    
+    values = df_metrics[params.rep_counter_metric].ffill().bfill().to_numpy()
+    if 'time_s' in df_metrics.columns and len(values) > 2:
+        times = df_metrics['time_s'].to_numpy()
+        steps = np.diff(times)
+        positive = steps[steps > 0]
+        if len(positive) and not np.allclose(steps, positive.min()):
+            grid = np.arange(times[0], times[-1] + positive.min() / 2, positive.min())
+            return np.interp(grid, times, values), grid
+    return values, None
+
+
+def _valleys(values: np.ndarray, params: ExerciseParams) -> np.ndarray:
+    if len(values) == 0:
+        return np.array([], dtype=int)
     valleys, _ = find_peaks(
-        inverted_angles, height=inverted_threshold, 
+        -values, height=-params.low_thresh,
         prominence=params.peak_prominence, distance=params.peak_distance
     )
-    
+    return valleys
+
+
+def find_rep_valleys(df_metrics: pd.DataFrame, params: ExerciseParams) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Localiza los valles (fondo de cada repetición) de la métrica de conteo.
+
+    Si los fotogramas no están equiespaciados en el tiempo (muestreo por movimiento),
+    la métrica se remuestrea antes por interpolación lineal sobre una rejilla uniforme
+    con el menor paso entre fotogramas, para que ``peak_distance`` y la prominencia
+    signifiquen lo mismo que con el vídeo completo.
+
+    Returns:
+        (values, valleys): la serie sobre la que se buscaron los valles y sus índices.
+    """
+    values, _ = _rep_signal(df_metrics, params)
+    return values, _valleys(values, params)
+
+
+def _empty_index() -> np.ndarray:
+    return np.array([], dtype=int)
+
+
+def _empty_values() -> np.ndarray:
+    return np.array([], dtype=float)
+
+
+@dataclass
+class RepSegmentation:
+    """
+    Repeticiones detectadas en una serie de métricas, una posición por repetición.
+    Se calcula una sola vez (``segment_repetitions``) y la comparten el pipeline,
+    la detección de fallos, la GUI y la base de datos.
+
+    Attributes:
+        start, bottom, end: Fotograma (``frame_idx``) de inicio, fondo y final de cada
+            repetición. El final de una repetición es el inicio de la siguiente.
+        duration_s: Duración de cada repetición en segundos.
+        bottom_value: Valor de la métrica de conteo en el fondo de cada repetición.
+        metric: Nombre de la métrica de conteo.
+    """
+    start: np.ndarray = field(default_factory=_empty_index)
+    bottom: np.ndarray = field(default_factory=_empty_index)
+    end: np.ndarray = field(default_factory=_empty_index)
+    duration_s: np.ndarray = field(default_factory=_empty_values)
+    bottom_value: np.ndarray = field(default_factory=_empty_values)
+    metric: Optional[str] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.bottom)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def key_metric_avg(self) -> Optional[float]:
+        """Media de la métrica de conteo en el fondo de las repeticiones (None si no hay)."""
+        return float(self.bottom_value.mean()) if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representación serializable (JSON) de la segmentación."""
+        return {
+            'metric': self.metric,
+            'start': self.start.tolist(),
+            'bottom': self.bottom.tolist(),
+            'end': self.end.tolist(),
+            'duration_s': self.duration_s.tolist(),
+            'bottom_value': self.bottom_value.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RepSegmentation':
+        return cls(
+            start=np.asarray(data.get('start', []), dtype=int),
+            bottom=np.asarray(data.get('bottom', []), dtype=int),
+            end=np.asarray(data.get('end', []), dtype=int),
+            duration_s=np.asarray(data.get('duration_s', []), dtype=float),
+            bottom_value=np.asarray(data.get('bottom_value', []), dtype=float),
+            metric=data.get('metric'),
+        )
+
+
+def segment_repetitions(df_metrics: pd.DataFrame, params: ExerciseParams) -> RepSegmentation:
+    """
+    Detecta las repeticiones una sola vez y devuelve su segmentación completa.
+
+    Los fondos son los valles de ``find_rep_valleys``; los límites entre repeticiones
+    son el máximo de la métrica entre dos fondos consecutivos (y, en los extremos,
+    el máximo antes del primer fondo y después del último).
+    """
+    metric = params.rep_counter_metric
+    if df_metrics.empty or metric not in df_metrics.columns:
+        logger.warning(f"No se puede contar repeticiones, falta la columna '{metric}'.")
+        return RepSegmentation(metric=metric)
+
+    values, grid = _rep_signal(df_metrics, params)
+    valleys = _valleys(values, params)
     logger.info(f"Detección de picos encontró {len(valleys)} repeticiones válidas.")
-    return len(valleys)
+    if len(valleys) == 0:
+        return RepSegmentation(metric=metric)
+
+    # Límites: máximo de la serie entre fondos consecutivos (en la misma rejilla que los valles)
+    edges = np.concatenate(([0], valleys, [len(values)]))
+    bounds = np.array([lo + int(np.argmax(values[lo:hi])) for lo, hi in zip(edges[:-1], edges[1:])])
+    starts, ends = bounds[:-1], bounds[1:]
+
+    n_rows = len(df_metrics)
+    times = df_metrics['time_s'].to_numpy() if 'time_s' in df_metrics.columns else np.arange(n_rows, dtype=float)
+    frames = df_metrics['frame_idx'].to_numpy() if 'frame_idx' in df_metrics.columns else np.arange(n_rows)
+    if grid is not None:
+        # La serie se remuestreó en una rejilla uniforme: volvemos a la fila más cercana
+        def to_rows(positions: np.ndarray) -> np.ndarray:
+            rows = np.clip(np.searchsorted(times, grid[positions]), 1, n_rows - 1)
+            closer_before = grid[positions] - times[rows - 1] < times[rows] - grid[positions]
+            return rows - closer_before
+    else:
+        def to_rows(positions: np.ndarray) -> np.ndarray:
+            return positions
+
+    start_rows, bottom_rows, end_rows = to_rows(starts), to_rows(valleys), to_rows(ends)
+    return RepSegmentation(
+        start=frames[start_rows].astype(int),
+        bottom=frames[bottom_rows].astype(int),
+        end=frames[end_rows].astype(int),
+        duration_s=(times[end_rows] - times[start_rows]).astype(float),
+        bottom_value=values[valleys].astype(float),
+        metric=metric,
+    )
+
+
+def count_repetitions(df_metrics: pd.DataFrame, params: ExerciseParams) -> int:
+    """
+    Wrapper unificado que cuenta repeticiones usando el robusto algoritmo de detección de valles.
+    Si además se necesitan las posiciones, usar ``segment_repetitions`` directamente.
+    """
+    return segment_repetitions(df_metrics, params).count
 
 
-def detect_faults(df_metrics: pd.DataFrame, rep_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def detect_faults(
+    df_metrics: pd.DataFrame,
+    reps: RepSegmentation,
+    params: Optional[ExerciseParams] = None
+) -> List[Dict[str, Any]]:
     """
-    Placeholder para la lógica de detección de fallos.
+    Evalúa las ``fault_rules`` del ejercicio (y la regla de profundidad implícita
+    de ``depth_fail_thresh``) sobre cada repetición de la segmentación ya calculada.
+    Devuelve un diccionario por fallo con la repetición (desde 1), el nombre de la
+    regla, el valor medido y el fotograma del fondo de la repetición.
     """
-    logger.info("La detección de fallos aún no está implementada.")
-    return []
+    if params is None or reps.count == 0 or df_metrics.empty:
+        return []
+    rules = exercise_fault_rules(params)
+    if not rules:
+        return []
+    faults = compile_fault_rules(rules).evaluate(df_metrics, reps)
+    logger.info(f"Fallos detectados: {len(faults)} en {reps.count} repeticiones ({len(rules)} reglas).")
+    return faults
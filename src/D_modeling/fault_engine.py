@@ -0,0 +1,158 @@
+# src/D_modeling/fault_engine.py
+"""
+Motor de detección de fallos vectorizado. Las ``fault_rules`` de un ejercicio se
+compilan una sola vez: las columnas que usan se reúnen en una matriz (N, reglas)
+y las reglas con el mismo tramo y la misma reducción se evalúan juntas, para
+todas las repeticiones a la vez, con ``ufunc.reduceat`` sobre los límites de los
+tramos. El coste es O(fotogramas x reglas) sin bucles Python por repetición.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+from src.config import ExerciseParams, FaultRule
+from src.constants import FaultReduce, FaultType, FaultWindow
+
+if TYPE_CHECKING:
+    from src.D_modeling.exercise_analyzer import RepSegmentation
+
+logger = logging.getLogger(__name__)
+
+# Nombre de la regla implícita que genera ``depth_fail_thresh``
+DEPTH_RULE_NAME = 'profundidad_insuficiente'
+
+
+def exercise_fault_rules(params: ExerciseParams) -> List[FaultRule]:
+    """Reglas de un ejercicio: las de ``fault_rules`` más la de profundidad si ``depth_fail_thresh > 0``."""
+    rules = list(params.fault_rules)
+    if params.depth_fail_thresh > 0 and all(rule.name != DEPTH_RULE_NAME for rule in rules):
+        rules.append(FaultRule(
+            name=DEPTH_RULE_NAME, metric=params.rep_counter_metric,
+            reduce=FaultReduce.MIN, max=params.depth_fail_thresh
+        ))
+    return rules
+
+
+def _window_reduce(signals: np.ndarray, start: np.ndarray, end: np.ndarray, reduce: FaultReduce) -> np.ndarray:
+    """
+    Resume cada columna de ``signals`` (N, G) en los tramos cerrados [start, end]
+    de cada repetición. Los tramos están ordenados y solo comparten extremos, así
+    que los semiabiertos [start, end) intercalados forman índices crecientes para
+    ``reduceat``; el extremo ``end`` se añade después. Ignora NaN (NaN si no hay datos).
+    """
+    if reduce == FaultReduce.RISE:
+        return signals[end] - signals[start]
+
+    bounds = np.column_stack([start, end]).ravel()
+    last = signals[end]
+    if reduce in (FaultReduce.MIN, FaultReduce.MAX, FaultReduce.RANGE):
+        low = np.fmin(np.fmin.reduceat(signals, bounds, axis=0)[::2], last)
+        high = np.fmax(np.fmax.reduceat(signals, bounds, axis=0)[::2], last)
+        if reduce == FaultReduce.MIN:
+            return low
+        if reduce == FaultReduce.MAX:
+            return high
+        return high - low
+
+    # MEAN
+    valid = ~np.isnan(signals)
+    filled = np.where(valid, signals, 0.0)
+    # En un tramo vacío [a, a) ``reduceat`` devuelve la fila ``a``: es el propio extremo, que se descuenta
+    empty = (start == end)[:, None]
+    sums = np.add.reduceat(filled, bounds, axis=0)[::2] + np.where(empty, 0.0, filled[end])
+    counts = np.add.reduceat(valid, bounds, axis=0)[::2] + np.where(empty, 0, valid[end])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+class FaultEngine:
+    """
+    Conjunto de reglas de fallo compilado. Agrupa las reglas por (tramo, reducción)
+    para evaluar cada grupo en una única operación sobre todas las repeticiones.
+    """
+    def __init__(self, rules: Sequence[FaultRule]):
+        self.rules = list(rules)
+        metric_rules = [i for i, rule in enumerate(self.rules) if rule.type == FaultType.METRIC]
+        self._metric_rules = np.array(metric_rules, dtype=np.intp)
+        self.columns: List[str] = sorted({
+            name for i in metric_rules for name in (self.rules[i].metric, self.rules[i].minus) if name
+        })
+        position = {name: pos for pos, name in enumerate(self.columns)}
+        # La posición ``len(columns)`` es una columna de ceros para las reglas sin ``minus``
+        zero = len(self.columns)
+        self._metric_pos = np.array([position[self.rules[i].metric] for i in metric_rules], dtype=np.intp)
+        self._minus_pos = np.array(
+            [position[self.rules[i].minus] if self.rules[i].minus else zero for i in metric_rules], dtype=np.intp
+        )
+        self._absolute = np.array([self.rules[i].absolute for i in metric_rules], dtype=bool)
+
+        # Posiciones (dentro de las reglas de métrica) agrupadas por (tramo, reducción)
+        groups: Dict[Tuple[FaultWindow, FaultReduce], List[int]] = {}
+        for pos, i in enumerate(metric_rules):
+            groups.setdefault((self.rules[i].window, self.rules[i].reduce), []).append(pos)
+        self._groups = {key: np.array(positions, dtype=np.intp) for key, positions in groups.items()}
+        self._duration_rules = [(i, rule.window) for i, rule in enumerate(self.rules) if rule.type == FaultType.DURATION]
+
+        self._low = np.array([-np.inf if rule.min is None else rule.min for rule in self.rules])
+        self._high = np.array([np.inf if rule.max is None else rule.max for rule in self.rules])
+
+    def measure(self, df_metrics: pd.DataFrame, reps: 'RepSegmentation') -> np.ndarray:
+        """Valor de cada regla en cada repetición: matriz (repeticiones, reglas), NaN si no hay datos."""
+        values = np.full((reps.count, len(self.rules)), np.nan)
+        if reps.count == 0 or df_metrics.empty:
+            return values
+
+        n = len(df_metrics)
+        frames = df_metrics['frame_idx'].to_numpy() if 'frame_idx' in df_metrics.columns else np.arange(n)
+        start, bottom, end = (np.clip(np.searchsorted(frames, f), 0, n - 1) for f in (reps.start, reps.bottom, reps.end))
+        windows = {
+            FaultWindow.REP: (start, end),
+            FaultWindow.DESCENT: (start, bottom),
+            FaultWindow.ASCENT: (bottom, end),
+        }
+
+        if len(self._metric_rules):
+            data = np.column_stack(
+                [df_metrics[name].to_numpy(dtype=np.float64) for name in self.columns] + [np.zeros(n)]
+            )
+            signals = data[:, self._metric_pos] - data[:, self._minus_pos]
+            signals[:, self._absolute] = np.abs(signals[:, self._absolute])
+            for (window, reduce), positions in self._groups.items():
+                a, b = windows[window]
+                values[:, self._metric_rules[positions]] = _window_reduce(signals[:, positions], a, b, reduce)
+
+        if self._duration_rules:
+            times = df_metrics['time_s'].to_numpy(dtype=np.float64)
+            for i, window in self._duration_rules:
+                a, b = windows[window]
+                values[:, i] = times[b] - times[a]
+        return values
+
+    def evaluate(self, df_metrics: pd.DataFrame, reps: 'RepSegmentation') -> List[Dict[str, Any]]:
+        """Fallos detectados, ordenados por repetición y por regla."""
+        values = self.measure(df_metrics, reps)
+        # NaN no es menor ni mayor que nada: una regla sin datos no marca fallo
+        faults = (values < self._low) | (values > self._high)
+        return [
+            {
+                'rep': int(r) + 1,
+                'type': self.rules[k].name,
+                'value': round(float(values[r, k]), 2),
+                'frame': int(reps.bottom[r]),
+            }
+            for r, k in zip(*np.nonzero(faults))
+        ]
+
+
+# Motores ya compilados, indexados por la serialización de sus reglas
+_compiled: Dict[Tuple[str, ...], FaultEngine] = {}
+
+
+def compile_fault_rules(rules: Sequence[FaultRule]) -> FaultEngine:
+    """Compila (o recupera de la caché) el motor para una lista de reglas de fallo."""
+    key = tuple(rule.json() for rule in rules)
+    engine = _compiled.get(key)
+    if engine is None:
+        engine = _compiled[key] = FaultEngine(rules)
+    return engine
@@ -1,16 +1,16 @@
 # src/D_modeling/math_utils.py
 
 import numpy as np
-from typing import Dict
 
-def calculate_angle_3d(p1: Dict, p2: Dict, p3: Dict) -> float:
+def calculate_angle_3d(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> float:
     """
     Calcula el ángulo ∡p1–p2–p3 en espacio 3D.
-    Ahora asume que p1, p2, p3 son diccionarios con claves 'x', 'y', 'z'.
+    Los puntos son arrays cuyas tres primeras componentes son x, y, z
+    (p. ej. filas de un array de landmarks (33, 4)).
     """
-    # --- Usamos acceso por clave ['x'] en lugar de por atributo .x ---
-    v1 = np.array([p1['x'] - p2['x'], p1['y'] - p2['y'], p1['z'] - p2['z']])
-    v2 = np.array([p3['x'] - p2['x'], p3['y'] - p2['y'], p3['z'] - p2['z']])
+    p2 = np.asarray(p2[:3], dtype=np.float64)
+    v1 = np.asarray(p1[:3], dtype=np.float64) - p2
+    v2 = np.asarray(p3[:3], dtype=np.float64) - p2
 
     dot_product = np.dot(v1, v2)
     norm_product = np.linalg.norm(v1) * np.linalg.norm(v2)
@@ -21,3 +21,31 @@ def calculate_angle_3d(p1: Dict, p2: Dict, p3: Dict) -> float:
     angle_rad = np.arccos(cos_angle)
     
     return np.degrees(angle_rad)
+
+
+def calculate_angles_3d(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> np.ndarray:
+    """
+    Versión vectorizada de ``calculate_angle_3d``: p1, p2 y p3 son arrays (..., 3)
+    con la misma forma y se devuelve un array (...) de ángulos en grados.
+    """
+    v1 = p1 - p2
+    v2 = p3 - p2
+
+    dot_product = np.einsum('...i,...i->...', v1, v2)
+    norm_product = np.sqrt(np.einsum('...i,...i->...', v1, v1) * np.einsum('...i,...i->...', v2, v2))
+
+    norm_product += 1e-8
+
+    cos_angle = np.clip(dot_product / norm_product, -1.0, 1.0)
+    return np.degrees(np.arccos(cos_angle))
+
+
+def calculate_symmetries(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Versión vectorizada de ``calculate_symmetry`` (src.B_pose_estimation.metrics):
+    1 - |izq - der| / max(|izq|, |der|), 1.0 si ambos son 0 y NaN si falta alguno.
+    """
+    max_value = np.maximum(np.abs(left), np.abs(right))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        symmetry = 1.0 - np.abs(left - right) / max_value
+    return np.where(max_value == 0, 1.0, symmetry)
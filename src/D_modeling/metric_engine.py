@@ -0,0 +1,205 @@
+# src/D_modeling/metric_engine.py
+"""
+Motor de métricas vectorizado. Las ``metric_definitions`` de un ejercicio se
+compilan una sola vez en tablas de índices de landmarks y después cada tipo de
+métrica se evalúa para todos los fotogramas a la vez con operaciones de arrays
+sobre el tensor (N, 33, 4) de landmarks, sin bucles Python por fotograma.
+
+Las métricas derivadas de otras (velocidad y aceleración angular, simetría) se
+evalúan después, por niveles de dependencia, con una operación por tipo y nivel
+sobre las columnas ya calculadas. Añadir métricas a un ejercicio solo añade
+columnas a esas operaciones, no pasadas nuevas sobre los fotogramas.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple
+
+from src.config import MetricDefinition
+from src.constants import MetricType
+from src.B_pose_estimation.landmarks import LandmarkSequence, X, Y, Z, VISIBILITY
+from src.D_modeling.math_utils import calculate_angles_3d, calculate_symmetries
+
+try:
+    import mediapipe as mp
+    PoseLandmark = mp.solutions.pose.PoseLandmark
+except ImportError:
+    PoseLandmark = None
+
+logger = logging.getLogger(__name__)
+
+# Umbral de visibilidad por debajo del cual un landmark no se usa en las métricas
+VISIBILITY_THRESHOLD = 0.5
+
+# Tipos que se calculan a partir de otras métricas (``sources``) en lugar de landmarks
+DERIVED_TYPES = (MetricType.ANGULAR_VELOCITY, MetricType.ANGULAR_ACCELERATION, MetricType.SYMMETRY)
+
+# Landmarks del tronco: hombros y caderas
+TORSO_POINTS = ('LEFT_SHOULDER', 'RIGHT_SHOULDER', 'LEFT_HIP', 'RIGHT_HIP')
+
+
+class MetricEngine:
+    """
+    Conjunto de métricas compilado. Agrupa las métricas del mismo tipo para
+    calcularlas en una única operación batched por tipo.
+    """
+    def __init__(self, metric_definitions: Sequence[MetricDefinition]):
+        if not PoseLandmark:
+            raise RuntimeError("MediaPipe no está disponible para compilar las métricas.")
+        name_to_idx = {lm.name: lm.value for lm in PoseLandmark}
+
+        self.columns: List[str] = []
+        # Métricas sobre landmarks: tipo -> (nombres, índices de landmarks de cada una)
+        landmark_metrics: Dict[MetricType, Tuple[List[str], List[List[int]]]] = {}
+        # Desplazamientos horizontales medidos respecto a la posición inicial del punto
+        from_start: List[bool] = []
+        # Métricas derivadas: nivel -> tipo -> (nombres, métricas de origen de cada una)
+        derived: Dict[int, Dict[MetricType, Tuple[List[str], List[List[str]]]]] = {}
+        level: Dict[str, int] = {}
+
+        for metric in metric_definitions:
+            if metric.type in DERIVED_TYPES:
+                missing = [name for name in metric.sources if name not in level]
+                if missing:
+                    raise ValueError(f"La métrica '{metric.name}' usa {missing}, que no están definidas antes.")
+                level[metric.name] = 1 + max(level[name] for name in metric.sources)
+                names, sources = derived.setdefault(level[metric.name], {}).setdefault(metric.type, ([], []))
+                names.append(metric.name)
+                sources.append(list(metric.sources))
+                self.columns.append(metric.name)
+                continue
+
+            if metric.type == MetricType.ANGLE or metric.type == MetricType.DISTANCE:
+                points = [name_to_idx[n] for n in metric.point_names]
+            elif metric.type == MetricType.HEIGHT:
+                points = [name_to_idx[metric.point_name]]
+            elif metric.type == MetricType.HORIZONTAL_DISPLACEMENT:
+                # Con un solo punto la referencia es el propio punto en su primer fotograma visible
+                points = [name_to_idx[n] for n in (metric.point_names or [metric.point_name] * 2)]
+                from_start.append(not metric.point_names)
+            elif metric.type == MetricType.TORSO_LEAN:
+                points = [name_to_idx[n] for n in TORSO_POINTS]
+            else:
+                continue
+            names, idxs = landmark_metrics.setdefault(metric.type, ([], []))
+            names.append(metric.name)
+            idxs.append(points)
+            level[metric.name] = 0
+            self.columns.append(metric.name)
+
+        # Solo se extraen de la secuencia los landmarks que usa alguna métrica; los
+        # índices de cada métrica se reescriben como posiciones dentro de ese subconjunto
+        all_idxs = [i for _, idxs in landmark_metrics.values() for points in idxs for i in points]
+        used = np.unique(np.array(all_idxs, dtype=np.intp))
+        position = {idx: pos for pos, idx in enumerate(used)}
+        self._used_idxs = used
+        self._landmark_metrics: Dict[MetricType, Tuple[List[str], np.ndarray]] = {
+            metric_type: (names, np.array([[position[i] for i in points] for points in idxs], dtype=np.intp))
+            for metric_type, (names, idxs) in landmark_metrics.items()
+        }                                                              # tipo -> (nombres, (M, k))
+        self._from_start = np.array(from_start, dtype=bool)
+        self._derived = [derived[lvl] for lvl in sorted(derived)]
+
+    def evaluate(self, landmarks: LandmarkSequence, fps: float) -> pd.DataFrame:
+        """
+        Calcula todas las métricas para todos los fotogramas. Las métricas cuyos
+        landmarks no superan el umbral de visibilidad quedan a NaN.
+        """
+        frame_idx = np.arange(len(landmarks))
+        # Con muestreo no uniforme, time_s es el instante real de cada fotograma en el vídeo
+        times = landmarks.times(fps)
+        data: Dict[str, np.ndarray] = {'frame_idx': frame_idx, 'time_s': times}
+
+        computed: Dict[str, np.ndarray] = {}
+        if self._landmark_metrics:
+            # Usamos los landmarks 3D de mundo si existen y solo los puntos con visibilidad suficiente
+            source = landmarks.metric_source(self._used_idxs).astype(np.float64)
+            visible = source[:, :, VISIBILITY] > VISIBILITY_THRESHOLD  # NaN cuenta como no visible
+            for metric_type, (names, idxs) in self._landmark_metrics.items():
+                values = self._landmark_kernel(metric_type, source, idxs)
+                values[~_all_visible(visible, idxs)] = np.nan
+                if metric_type == MetricType.HORIZONTAL_DISPLACEMENT and self._from_start.any():
+                    values[:, self._from_start] -= _first_valid(values[:, self._from_start])
+                computed.update(zip(names, values.T))
+
+        for stage in self._derived:
+            for metric_type, (names, sources) in stage.items():
+                values = self._derived_kernel(
+                    metric_type, [np.column_stack([computed[s[k]] for s in sources]) for k in range(len(sources[0]))],
+                    times
+                )
+                computed.update(zip(names, values.T))
+
+        for name in self.columns:
+            data[name] = computed[name]
+        return pd.DataFrame(data)
+
+    def _landmark_kernel(self, metric_type: MetricType, source: np.ndarray, idxs: np.ndarray) -> np.ndarray:
+        """Evalúa las M métricas de un tipo sobre ``source`` (N, P, 4); ``idxs`` es (M, k). Devuelve (N, M)."""
+        if metric_type == MetricType.ANGLE:
+            points = source.take(idxs, axis=1)[..., :3]                # (N, M, 3, 3)
+            return calculate_angles_3d(points[:, :, 0], points[:, :, 1], points[:, :, 2])
+
+        # El resto trabaja por planos de coordenadas (N, M): ``take`` sobre el eje de
+        # landmarks evita la indexación avanzada mixta y las reducciones sobre ejes de 3
+        def plane(axis: int, k: int) -> np.ndarray:
+            return source[:, :, axis].take(idxs[:, k], axis=1)
+
+        if metric_type == MetricType.HEIGHT:
+            return plane(Y, 0)
+        if metric_type == MetricType.DISTANCE:
+            squared = sum((plane(axis, 0) - plane(axis, 1)) ** 2 for axis in (X, Y, Z))
+            return np.sqrt(squared)
+        if metric_type == MetricType.HORIZONTAL_DISPLACEMENT:
+            # Las medidas desde la posición inicial se referencian después, en ``evaluate``
+            return plane(X, 0) - np.where(self._from_start, 0.0, plane(X, 1))
+        if metric_type == MetricType.TORSO_LEAN:
+            # Vector cadera -> hombros (puntos medios); la y crece hacia abajo, así que la vertical es -y
+            dx, dy, dz = (plane(axis, 0) + plane(axis, 1) - plane(axis, 2) - plane(axis, 3) for axis in (X, Y, Z))
+            return np.degrees(np.arctan2(np.hypot(dx, dz), -dy))
+        raise ValueError(f"Tipo de métrica sin kernel de landmarks: {metric_type}")
+
+    @staticmethod
+    def _derived_kernel(metric_type: MetricType, inputs: List[np.ndarray], times: np.ndarray) -> np.ndarray:
+        """
+        Evalúa las métricas derivadas de un tipo; ``inputs`` tiene una matriz (N, M)
+        por métrica de origen. Las derivadas (con signo, en unidades por segundo)
+        usan el instante real de cada fotograma.
+        """
+        if metric_type == MetricType.SYMMETRY:
+            return calculate_symmetries(inputs[0], inputs[1])
+        values = inputs[0]
+        if len(values) < 2:
+            return np.full(values.shape, np.nan)
+        values = np.gradient(values, times, axis=0)
+        if metric_type == MetricType.ANGULAR_ACCELERATION:
+            values = np.gradient(values, times, axis=0)
+        return values
+
+
+def _all_visible(visible: np.ndarray, idxs: np.ndarray) -> np.ndarray:
+    """(N, M): True si los k landmarks de cada métrica (``idxs`` (M, k)) son visibles."""
+    result = visible.take(idxs[:, 0], axis=1)
+    for k in range(1, idxs.shape[1]):
+        result &= visible.take(idxs[:, k], axis=1)
+    return result
+
+
+def _first_valid(values: np.ndarray) -> np.ndarray:
+    """Primer valor no NaN de cada columna de una matriz (N, M); NaN si no hay ninguno."""
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=0)
+    return np.where(valid.any(axis=0), values[first, np.arange(values.shape[1])], np.nan)
+
+
+# Motores ya compilados, indexados por la serialización de sus definiciones
+_compiled: Dict[Tuple[str, ...], MetricEngine] = {}
+
+
+def compile_metrics(metric_definitions: Sequence[MetricDefinition]) -> MetricEngine:
+    """Compila (o recupera de la caché) el motor para una lista de definiciones de métricas."""
+    key = tuple(metric.json() for metric in metric_definitions)
+    engine = _compiled.get(key)
+    if engine is None:
+        engine = _compiled[key] = MetricEngine(metric_definitions)
+    return engine
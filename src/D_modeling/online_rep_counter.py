@@ -0,0 +1,218 @@
+# src/D_modeling/online_rep_counter.py
+"""
+Conteo de repeticiones incremental, para análisis en directo o en streaming.
+``OnlineRepCounter`` consume la métrica de conteo muestra a muestra (o en
+lotes) y emite un ``RepEvent`` por repetición con la misma semántica que
+``find_peaks(-values, height=-low_thresh, prominence=peak_prominence,
+distance=peak_distance)`` sobre la serie completa:
+
+- Los valles son mínimos locales; en una meseta se toma su punto medio.
+- La altura se filtra primero, después la distancia (gana el valle más
+  profundo de cada grupo) y por último la prominencia, igual que SciPy.
+- La prominencia usa como bases el máximo de la métrica entre el valle y la
+  muestra más baja que él a cada lado (o el extremo de la serie).
+
+Cada repetición se emite en cuanto su decisión ya no puede cambiar: tras
+``peak_distance`` muestras sin un valle más profundo cerca y cuando la métrica
+ha subido lo suficiente para confirmar la prominencia. El estado no crece con
+la duración de la serie: solo se guardan los valles pendientes de decidir y
+una pila con los niveles de la métrica por debajo de ``low_thresh`` que aún
+pueden limitar la prominencia de un valle futuro.
+
+Como en ``find_rep_valleys``, los NaN se rellenan con el último valor válido
+(y los iniciales con el primero). Las muestras deben estar equiespaciadas; una
+serie con muestreo por movimiento se remuestrea antes.
+"""
+import math
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from src.config import ExerciseParams
+
+
+@dataclass(frozen=True)
+class RepEvent:
+    """Repetición detectada: índice de la muestra del fondo y valor de la métrica en él."""
+    bottom: int
+    value: float
+
+
+class _Valley:
+    """Valle pendiente de decidir (en el dominio negado, donde es un pico)."""
+    __slots__ = ('index', 'height', 'left_base', 'right_base', 'accepted')
+
+    def __init__(self, index: int, height: float, left_base: float):
+        self.index = index
+        self.height = height
+        self.left_base = left_base
+        # Las muestras de la meseta a la derecha del punto medio valen lo mismo que el pico
+        self.right_base = height
+        self.accepted: Optional[bool] = None
+
+
+class OnlineRepCounter:
+    """
+    Contador incremental equivalente a ``find_peaks`` con los umbrales de un ejercicio.
+
+    Uso::
+
+        counter = OnlineRepCounter.from_params(params)
+        for value in metric_stream:
+            for rep in counter.update(value):
+                ...
+        remaining = counter.finish()
+    """
+    def __init__(self, low_thresh: float, prominence: float, distance: int):
+        # Internamente se trabaja con la serie negada, como ``find_peaks(-values)``
+        self.min_height = -low_thresh
+        self.prominence = prominence
+        self.distance = max(1, math.ceil(distance))
+        self.count = 0
+
+        self._index = 0
+        # Última muestra válida (sin negar), para rellenar los NaN
+        self._previous: Optional[float] = None
+        # Última muestra consumida, ya negada
+        self._last: Optional[float] = None
+        self._leading_nans = 0
+        # Meseta candidata a pico: índice de inicio y valor
+        self._plateau_start: Optional[int] = None
+        self._plateau_height = 0.0
+        # Pila de (valor, mínimo desde la entrada anterior) con valores estrictamente decrecientes
+        self._levels: List[List[float]] = []
+        # Valles que superan la altura, agrupados mientras están a menos de ``distance``
+        self._cluster: List[_Valley] = []
+        # Valles que superan la distancia, en orden, a la espera de su prominencia
+        self._selected: List[_Valley] = []
+        self._finished = False
+
+    @classmethod
+    def from_params(cls, params: ExerciseParams) -> 'OnlineRepCounter':
+        return cls(params.low_thresh, params.peak_prominence, params.peak_distance)
+
+    # --- API pública ---
+
+    def update(self, value: float) -> List[RepEvent]:
+        """Consume una muestra y devuelve las repeticiones que quedan confirmadas."""
+        if self._finished:
+            raise RuntimeError("El contador ya se ha cerrado con finish().")
+        if value is None or math.isnan(value):
+            if self._previous is None:
+                self._leading_nans += 1
+                return []
+            value = self._previous
+        elif self._previous is None and self._leading_nans:
+            # Los NaN iniciales toman el primer valor válido
+            for _ in range(self._leading_nans):
+                self._consume(-value)
+            self._leading_nans = 0
+        self._consume(-value)
+        self._previous = value
+        return self._emit()
+
+    def extend(self, values: Iterable[float]) -> List[RepEvent]:
+        """Consume un lote de muestras."""
+        events = []
+        for value in values:
+            events.extend(self.update(value))
+        return events
+
+    def finish(self) -> List[RepEvent]:
+        """Cierra la serie: una meseta abierta al final no es valle y se deciden los pendientes."""
+        if self._finished:
+            return []
+        self._finished = True
+        self._plateau_start = None
+        for valley in self._cluster + self._selected:
+            if valley.accepted is None:
+                self._close(valley)
+        self._select_cluster()
+        return self._emit()
+
+    # --- Detalle del algoritmo ---
+
+    def _consume(self, y: float) -> None:
+        index = self._index
+        previous, self._last = self._last, y
+
+        # 1) Máximos locales (con mesetas), como ``_local_maxima_1d``
+        if self._plateau_start is not None:
+            if y < self._plateau_height:
+                self._on_peak((self._plateau_start + index - 1) // 2, self._plateau_height)
+                self._plateau_start = None
+            elif y > self._plateau_height:
+                self._plateau_start, self._plateau_height = index, y
+        elif previous is not None and y > previous:
+            self._plateau_start, self._plateau_height = index, y
+
+        # 2) Base derecha de los valles pendientes
+        for valley in self._cluster + self._selected:
+            if valley.accepted is None:
+                if y > valley.height:
+                    self._close(valley)
+                else:
+                    valley.right_base = min(valley.right_base, y)
+                    self._decide(valley)
+
+        # 3) Pila de niveles para la base izquierda de los picos futuros
+        segment_min = y
+        while self._levels and self._levels[-1][0] <= y:
+            segment_min = min(segment_min, self._levels.pop()[1])
+        self._levels.append([y, segment_min])
+        # Los niveles por debajo de la altura mínima nunca limitan a un pico válido: se fusionan
+        if len(self._levels) > 1 and self._levels[-2][0] < self.min_height:
+            top = self._levels.pop()
+            self._levels[-1][1] = min(self._levels[-1][1], top[1])
+
+        self._index += 1
+
+        # 4) Un grupo se cierra cuando ningún pico futuro puede caer a menos de ``distance``
+        next_peak = self._plateau_start if self._plateau_start is not None else self._index
+        if self._cluster and next_peak - self._cluster[-1].index >= self.distance:
+            self._select_cluster()
+
+    def _on_peak(self, index: int, height: float) -> None:
+        if height < self.min_height:
+            return
+        # La cima de la pila es la última muestra de la meseta: su mínimo cubre desde la
+        # muestra anterior más alta que el pico (o el inicio) hasta el pico
+        left_base = self._levels[-1][1]
+        if self._cluster and index - self._cluster[-1].index >= self.distance:
+            self._select_cluster()
+        valley = _Valley(index, height, left_base)
+        self._decide(valley)
+        self._cluster.append(valley)
+
+    def _decide(self, valley: _Valley) -> None:
+        """Acepta el valle en cuanto su prominencia (que solo puede crecer) llega al mínimo."""
+        if valley.height - max(valley.left_base, valley.right_base) >= self.prominence:
+            valley.accepted = True
+
+    def _close(self, valley: _Valley) -> None:
+        """La base derecha ya es definitiva: si no se aceptó, se descarta."""
+        self._decide(valley)
+        if valley.accepted is None:
+            valley.accepted = False
+
+    def _select_cluster(self) -> None:
+        """Selección por distancia de ``find_peaks`` dentro del grupo: primero los más altos."""
+        cluster, self._cluster = self._cluster, []
+        keep = [True] * len(cluster)
+        order = sorted(range(len(cluster)), key=lambda i: cluster[i].height)
+        for i in reversed(order):
+            if not keep[i]:
+                continue
+            for j in range(len(cluster)):
+                if j != i and abs(cluster[j].index - cluster[i].index) < self.distance:
+                    keep[j] = False
+        self._selected.extend(valley for valley, kept in zip(cluster, keep) if kept)
+
+    def _emit(self) -> List[RepEvent]:
+        """Emite en orden los valles seleccionados cuya prominencia ya está decidida."""
+        events = []
+        while self._selected and self._selected[0].accepted is not None:
+            valley = self._selected.pop(0)
+            if valley.accepted:
+                self.count += 1
+                events.append(RepEvent(valley.index, -valley.height))
+        return events
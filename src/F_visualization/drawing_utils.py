@@ -2,40 +2,112 @@
 
 import cv2
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 from mediapipe.python.solutions.pose import POSE_CONNECTIONS
 
+from src.B_pose_estimation.estimators import landmarks_to_array
+from src.B_pose_estimation.landmarks import X, Y, VISIBILITY
+
+
+class SkeletonRenderer:
+    """
+    Dibuja esqueletos con un estilo fijo sin bucles de Python por landmark: las
+    coordenadas se pasan a píxeles en una sola operación sobre el array (33, 4),
+    los pares de índices de las conexiones se precalculan al crear el renderer y
+    todos los segmentos visibles se dibujan con una única llamada a ``cv2.polylines``.
+    Los puntos se estampan a la vez con los desplazamientos de un círculo relleno
+    dibujado una sola vez por ``cv2.circle``, así que el resultado es idéntico.
+    """
+    def __init__(
+        self,
+        line_color: Tuple[int, int, int],
+        point_color: Tuple[int, int, int],
+        line_thickness: int,
+        point_radius: int,
+        connections: Iterable[Tuple[int, int]] = POSE_CONNECTIONS,
+        visibility_thresh: float = 0.5
+    ):
+        self.line_color = tuple(line_color)
+        self.point_color = tuple(point_color)
+        self.line_thickness = line_thickness
+        self.point_radius = point_radius
+        self.visibility_thresh = visibility_thresh
+        # (C, 2) índices de inicio y fin de cada conexión
+        self.connections = np.array(sorted(connections), dtype=np.intp).reshape(-1, 2)
+        # Desplazamientos (dy, dx) de los píxeles de un punto respecto a su centro
+        r = max(0, int(point_radius))
+        stamp = np.zeros((2 * r + 1, 2 * r + 1), dtype=np.uint8)
+        cv2.circle(stamp, (r, r), r, 1, -1)
+        dy, dx = np.nonzero(stamp)
+        self._stamp_dy, self._stamp_dx = dy - r, dx - r
+
+    def project(self, landmarks: np.ndarray, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pasa landmarks normalizados (N, 4) a píxeles. Devuelve (N, 2) int32 y la
+        máscara de landmarks visibles (NaN en la visibilidad cuenta como no visible).
+        """
+        visible = landmarks[:, VISIBILITY] > self.visibility_thresh
+        # Multiplicamos en el dtype de los landmarks y truncamos, igual que ``int(x * w)``
+        coords = landmarks[:, [X, Y]] * np.array([width, height], dtype=landmarks.dtype)
+        points = np.zeros(coords.shape, dtype=np.int32)
+        np.copyto(points, coords, casting='unsafe', where=visible[:, None])
+        return points, visible
+
+    def draw_points(self, image: np.ndarray, points: np.ndarray, visible: np.ndarray) -> None:
+        """Dibuja conexiones y puntos ya en píxeles; solo los ``visible`` (y las conexiones entre ellos)."""
+        pairs = self.connections
+        if len(pairs) and pairs.max() >= len(points):
+            pairs = pairs[(pairs < len(points)).all(axis=1)]
+        pairs = pairs[visible[pairs[:, 0]] & visible[pairs[:, 1]]]
+        if len(pairs):
+            # (K, 2, 2): cada conexión es una polilínea abierta de dos puntos
+            cv2.polylines(image, points[pairs], False, self.line_color, self.line_thickness)
+
+        centers = points[visible]
+        if len(centers) == 0:
+            return
+        ys = (centers[:, 1:2] + self._stamp_dy).ravel()
+        xs = (centers[:, 0:1] + self._stamp_dx).ravel()
+        h, w = image.shape[:2]
+        inside = (ys >= 0) & (ys < h) & (xs >= 0) & (xs < w)
+        image[ys[inside], xs[inside]] = self.point_color
+
+    def draw(self, image: np.ndarray, landmarks: Optional[np.ndarray]) -> None:
+        """Dibuja en ``image`` (in place) el esqueleto de un array (33, 4) de landmarks normalizados."""
+        if landmarks is None or len(landmarks) == 0:
+            return
+        h, w = image.shape[:2]
+        self.draw_points(image, *self.project(landmarks, w, h))
+
+
+def draw_landmarks(
+    image: np.ndarray,
+    landmarks: np.ndarray,
+    line_color: Tuple[int, int, int],
+    point_color: Tuple[int, int, int],
+    line_thickness: int,
+    point_radius: int
+):
+    """
+    Dibuja landmarks y conexiones en una imagen a partir de un array (33, 4)
+    (x, y, z, visibility normalizados) y parámetros de estilo explícitos.
+    Para muchos fotogramas con el mismo estilo es mejor reutilizar un ``SkeletonRenderer``.
+    """
+    SkeletonRenderer(line_color, point_color, line_thickness, point_radius).draw(image, landmarks)
+
+
 def draw_landmarks_from_dicts(
-    image: np.ndarray, 
-    landmarks: List[Dict], 
+    image: np.ndarray,
+    landmarks: List[Dict],
     line_color: Tuple[int, int, int],
     point_color: Tuple[int, int, int],
     line_thickness: int,
     point_radius: int
 ):
     """
-    Dibuja landmarks y conexiones en una imagen a partir de una lista de diccionarios
-    y parámetros de estilo explícitos.
+    Variante de ``draw_landmarks`` para landmarks en el formato antiguo
+    (lista de diccionarios con claves 'x', 'y', 'z', 'visibility').
     """
     if not landmarks:
         return
-
-    h, w, _ = image.shape
-    
-    # Dibujar las conexiones
-    for connection in POSE_CONNECTIONS:
-        start_idx, end_idx = connection
-        if start_idx < len(landmarks) and end_idx < len(landmarks):
-            start_point, end_point = landmarks[start_idx], landmarks[end_idx]
-            if start_point and end_point and start_point.get('visibility', 0) > 0.5 and end_point.get('visibility', 0) > 0.5:
-                cv2.line(image, 
-                         (int(start_point['x'] * w), int(start_point['y'] * h)), 
-                         (int(end_point['x'] * w), int(end_point['y'] * h)),
-                         line_color, line_thickness)
-
-    # Dibujar los puntos (landmarks)
-    for landmark in landmarks:
-        if landmark and landmark.get('visibility', 0) > 0.5:
-            cv2.circle(image, 
-                       (int(landmark['x'] * w), int(landmark['y'] * h)), 
-                       point_radius, point_color, -1)
+    draw_landmarks(image, landmarks_to_array(landmarks), line_color, point_color, line_thickness, point_radius)
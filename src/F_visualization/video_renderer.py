@@ -1,28 +1,140 @@
 # src/F_visualization/video_renderer.py (Versión Definitiva)
 
 import cv2
+import queue
+import threading
 import numpy as np
 import logging
+from functools import partial
+from time import perf_counter
+from typing import Callable, Optional, Union
+
 from src import constants, config
+from src.B_pose_estimation.landmarks import LandmarkSequence, X, Y
+from src.F_visualization.drawing_utils import SkeletonRenderer
 
 logger = logging.getLogger(__name__)
 
+# Fotogramas que pueden esperar a ser codificados; acota la memoria del renderizado
+DEFAULT_WRITER_QUEUE = 8
+
+# Marcador de fin de vídeo para el hilo codificador
+_END_OF_VIDEO = object()
+
+
+class StreamingVideoWriter:
+    """
+    ``cv2.VideoWriter`` con la codificación en un hilo de fondo. Quien dibuja
+    entrega los fotogramas con ``write`` a través de una cola pequeña y sigue
+    trabajando mientras el hilo los codifica, así que la memoria es O(cola) y la
+    codificación se solapa con el resto del pipeline. El vídeo se abre con el
+    tamaño del primer fotograma recibido.
+    """
+    def __init__(self, output_path: str, fps: float, fourcc: str = 'mp4v', queue_size: int = DEFAULT_WRITER_QUEUE):
+        self.output_path = output_path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.frames_written = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def _encode(self, frame_size) -> None:
+        """Hilo codificador: abre el vídeo y escribe los fotogramas en orden."""
+        writer = cv2.VideoWriter(self.output_path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, frame_size)
+        try:
+            if not writer.isOpened():
+                raise IOError(f"No se pudo abrir VideoWriter para la ruta: {self.output_path}")
+            while True:
+                t0 = perf_counter()
+                entry = self._queue.get()
+                self.idle += perf_counter() - t0
+                if entry is _END_OF_VIDEO:
+                    break
+                frame, on_written = entry
+                t0 = perf_counter()
+                writer.write(frame)
+                self.busy += perf_counter() - t0
+                self.frames_written += 1
+                if on_written is not None:
+                    on_written()
+        except BaseException as e:
+            # ``write`` y ``close`` ven el error y dejan de esperar a este hilo
+            self._error = e
+        finally:
+            writer.release()
+
+    def write(self, frame: np.ndarray, on_written: Optional[Callable[[], None]] = None) -> None:
+        """
+        Encola un fotograma para codificarlo. El fotograma no debe modificarse hasta
+        que se haya codificado; ``on_written`` se llama (desde el hilo codificador)
+        en cuanto ocurre, p. ej. para devolver su buffer a un anillo.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._thread is None:
+            height, width = frame.shape[:2]
+            self._thread = threading.Thread(
+                target=self._encode, args=((width, height),), name="video-encoder", daemon=True
+            )
+            self._thread.start()
+        self._put((frame, on_written))
+
+    def _put(self, item) -> None:
+        # Esperamos con timeout para no quedarnos bloqueados si el hilo codificador ha fallado
+        while self._thread.is_alive():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """Espera a que se codifiquen los fotogramas pendientes y cierra el vídeo."""
+        if self._thread is None:
+            return
+        try:
+            self._put(_END_OF_VIDEO)
+            self._thread.join()
+        finally:
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def render_landmarks_on_video_hq(
     original_frames: list,
-    landmarks_sequence: np.ndarray,
+    landmarks_sequence: Union[LandmarkSequence, np.ndarray],
     crop_boxes: np.ndarray,
     output_path: str,
     fps: float
 ):
     """
     Dibuja landmarks (transformando coordenadas correctamente) sobre los
-    fotogramas originales de alta calidad y guarda el vídeo.
+    fotogramas originales de alta calidad y guarda el vídeo. ``landmarks_sequence``
+    es una ``LandmarkSequence`` o un array (N, 33, 4) de landmarks de imagen.
     """
     logger.info(f"Iniciando renderizado de vídeo HQ en: {output_path}")
     if not original_frames:
         logger.warning("No hay fotogramas para renderizar.")
         return
 
+    landmarks = landmarks_sequence.image if isinstance(landmarks_sequence, LandmarkSequence) else landmarks_sequence
+
     orig_h, orig_w, _ = original_frames[0].shape
     proc_w, proc_h = constants.DEFAULT_TARGET_WIDTH, constants.DEFAULT_TARGET_HEIGHT
     
@@ -30,58 +142,47 @@ def render_landmarks_on_video_hq(
     scale_x = orig_w / proc_w
     scale_y = orig_h / proc_h
 
-    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'avc1'), fps, (orig_w, orig_h))
-    if not writer.isOpened():
-        logger.error(f"No se pudo abrir VideoWriter para la ruta: {output_path}")
-        return
+    renderer = SkeletonRenderer(constants.CONNECTION_COLOR, constants.LANDMARK_COLOR, 2, 4, constants.POSE_CONNECTIONS)
+    # Buffers de salida reutilizados: el codificador devuelve cada uno en cuanto lo ha escrito,
+    # así que en régimen estable solo hay tantos como fotogramas caben en su cola
+    free_buffers: queue.Queue = queue.Queue()
 
-    for i, frame in enumerate(original_frames):
-        annotated_frame = frame.copy()
-        
-        if i < len(landmarks_sequence) and landmarks_sequence[i] is not None:
-            frame_landmarks = landmarks_sequence[i]
-            if all(np.isnan(lm['x']) for lm in frame_landmarks):
-                writer.write(annotated_frame)
-                continue
-            
-            points_to_draw = {}
-            crop_box = crop_boxes[i] if crop_boxes is not None and i < len(crop_boxes) and not np.isnan(crop_boxes[i]).all() else None
-
-            for lm_idx, lm in enumerate(frame_landmarks):
-                if not np.isnan(lm['x']):
-                    
-                    # --- LÓGICA DE TRANSFORMACIÓN CORREGIDA ---
-                    
+    # La codificación se hace en un hilo de fondo mientras se dibujan los siguientes fotogramas
+    try:
+        with StreamingVideoWriter(output_path, fps, fourcc='avc1') as writer:
+            for i, frame in enumerate(original_frames):
+                try:
+                    annotated_frame = free_buffers.get_nowait()
+                    np.copyto(annotated_frame, frame)
+                except queue.Empty:
+                    annotated_frame = frame.copy()
+
+                frame_landmarks = landmarks[i] if i < len(landmarks) else None
+                drawn = ~np.isnan(frame_landmarks[:, X]) if frame_landmarks is not None else None
+                if drawn is not None and drawn.any():
+                    crop_box = crop_boxes[i] if crop_boxes is not None and i < len(crop_boxes) and not np.isnan(crop_boxes[i]).all() else None
+
+                    # --- Transformación de todos los landmarks a la vez ---
                     if crop_box is not None:
                         # --- Caso CON CROP ---
-                        # 1. Convertir landmark de [0,1] (relativo al crop) a píxeles en la imagen procesada (256x256)
+                        # 1. Convertir landmarks de [0,1] (relativos al crop) a píxeles en la imagen procesada
                         x1_p, y1_p, x2_p, y2_p = crop_box
-                        crop_w_p = x2_p - x1_p
-                        crop_h_p = y2_p - y1_p
-                        
-                        abs_x_p = x1_p + lm['x'] * crop_w_p
-                        abs_y_p = y1_p + lm['y'] * crop_h_p
-                        
-                        # 2. Escalar el punto de la imagen procesada a la imagen original (alta resolución)
-                        final_x = int(abs_x_p * scale_x)
-                        final_y = int(abs_y_p * scale_y)
-                        
+                        abs_x_p = x1_p + frame_landmarks[:, X] * (x2_p - x1_p)
+                        abs_y_p = y1_p + frame_landmarks[:, Y] * (y2_p - y1_p)
+
+                        # 2. Escalar los puntos de la imagen procesada a la imagen original (alta resolución)
+                        final_x, final_y = abs_x_p * scale_x, abs_y_p * scale_y
                     else:
                         # --- Caso SIN CROP ---
-                        # Los landmarks son relativos a la imagen procesada (256x256). Solo necesitamos escalarlos.
-                        final_x = int(lm['x'] * orig_w)
-                        final_y = int(lm['y'] * orig_h)
-                        
-                    points_to_draw[lm_idx] = (final_x, final_y)
-
-            # Dibujar el esqueleto con los puntos ya transformados
-            for p1_idx, p2_idx in constants.POSE_CONNECTIONS:
-                if p1_idx in points_to_draw and p2_idx in points_to_draw:
-                    cv2.line(annotated_frame, points_to_draw[p1_idx], points_to_draw[p2_idx], constants.CONNECTION_COLOR, 2)
-            for point in points_to_draw.values():
-                cv2.circle(annotated_frame, point, 4, constants.LANDMARK_COLOR, -1)
-        
-        writer.write(annotated_frame)
-
-    writer.release()
+                        # Los landmarks son relativos a la imagen procesada. Solo necesitamos escalarlos.
+                        final_x, final_y = frame_landmarks[:, X] * orig_w, frame_landmarks[:, Y] * orig_h
+
+                    points = np.zeros((len(frame_landmarks), 2), dtype=np.int32)
+                    np.copyto(points, np.stack([final_x, final_y], axis=1), casting='unsafe', where=drawn[:, None])
+                    renderer.draw_points(annotated_frame, points, drawn)
+
+                writer.write(annotated_frame, partial(free_buffers.put, annotated_frame))
+    except IOError as e:
+        logger.error(str(e))
+        return
     logger.info("Vídeo de depuración HQ renderizado con éxito.")
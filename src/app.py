@@ -5,6 +5,16 @@ import os
 # Importación directa de la función del pipeline y la configuración global
 from src.pipeline import run_full_pipeline_in_memory
 from src.config import settings as global_settings
+from src.B_pose_estimation.worker_pool import get_pose_worker_pool
+
+
+@st.cache_resource
+def _warm_pose_worker_pool():
+    """Arranca una sola vez por servidor el pool de pose que reutilizan todos los análisis."""
+    return get_pose_worker_pool()
+
+
+_warm_pose_worker_pool()
 
 st.title("Gym Performance Analysis - Banco de Pruebas")
 
@@ -6,7 +6,7 @@ import logging
 import os
 from typing import Optional, List, Tuple, Dict
 
-from src.constants import MetricType
+from src.constants import FaultReduce, FaultType, FaultWindow, MetricType
 
 logger = logging.getLogger(__name__)
 
@@ -24,23 +24,87 @@ class AnalysisParams(BaseModel):
     generate_debug_video: bool
     debug_mode: bool
     default_rotate: int
+    landmark_filter: str = 'savgol'
+    landmark_max_gap_s: float = 0.5
+    landmark_smoothing_s: float = 0.25
+    landmark_polyorder: int = 2
 
 class MetricDefinition(BaseModel):
-    """Define una única métrica, su tipo y los puntos necesarios."""
+    """
+    Define una única métrica, su tipo y los puntos necesarios. Las métricas sobre
+    landmarks usan ``point_names`` o ``point_name``; las derivadas de otras
+    métricas (velocidad, aceleración, simetría) las nombran en ``sources``.
+    """
     name: str
     type: MetricType = MetricType.ANGLE
     point_names: Optional[List[str]] = None
     point_name: Optional[str] = None
+    sources: Optional[List[str]] = None
 
     @validator('point_names', always=True)
     def validate_angle_points(cls, v, values):
-        if values.get('type') == MetricType.ANGLE:
+        metric_type = values.get('type')
+        if metric_type == MetricType.ANGLE:
             if not v or len(v) != 3:
                 raise ValueError("Métricas de tipo 'angle' deben tener una lista de 3 'point_names'.")
-            if PoseLandmark and v:
-                for point in v:
-                    if point not in PoseLandmark.__members__:
-                        raise ValueError(f"Landmark '{point}' no es un miembro válido de PoseLandmark.")
+        elif metric_type == MetricType.DISTANCE:
+            if not v or len(v) != 2:
+                raise ValueError("Métricas de tipo 'distance' deben tener una lista de 2 'point_names'.")
+        elif metric_type == MetricType.HORIZONTAL_DISPLACEMENT and v is not None and len(v) != 2:
+            raise ValueError("'horizontal_displacement' usa 2 'point_names' (punto y referencia) o un 'point_name'.")
+        if PoseLandmark and v:
+            for point in v:
+                if point not in PoseLandmark.__members__:
+                    raise ValueError(f"Landmark '{point}' no es un miembro válido de PoseLandmark.")
+        return v
+
+    @validator('point_name', always=True)
+    def validate_single_point(cls, v, values):
+        metric_type = values.get('type')
+        if metric_type == MetricType.HEIGHT and not v:
+            raise ValueError("Métricas de tipo 'height' deben tener un 'point_name'.")
+        if metric_type == MetricType.HORIZONTAL_DISPLACEMENT and not v and not values.get('point_names'):
+            raise ValueError("'horizontal_displacement' necesita un 'point_name' o 2 'point_names'.")
+        if PoseLandmark and v and v not in PoseLandmark.__members__:
+            raise ValueError(f"Landmark '{v}' no es un miembro válido de PoseLandmark.")
+        return v
+
+    @validator('sources', always=True)
+    def validate_sources(cls, v, values):
+        metric_type = values.get('type')
+        expected = {
+            MetricType.ANGULAR_VELOCITY: 1, MetricType.ANGULAR_ACCELERATION: 1, MetricType.SYMMETRY: 2,
+        }.get(metric_type)
+        if expected is not None and (not v or len(v) != expected):
+            raise ValueError(f"Métricas de tipo '{metric_type.value}' deben tener {expected} métrica(s) en 'sources'.")
+        return v
+
+class FaultRule(BaseModel):
+    """
+    Regla de fallo evaluada en cada repetición: resume ``metric`` (menos ``minus``,
+    opcionalmente en valor absoluto) en el tramo ``window`` con ``reduce``, o toma la
+    duración del tramo si ``type`` es 'duration', y marca fallo si queda fuera de [min, max].
+    """
+    name: str
+    type: FaultType = FaultType.METRIC
+    metric: Optional[str] = None
+    minus: Optional[str] = None
+    absolute: bool = False
+    window: FaultWindow = FaultWindow.REP
+    reduce: FaultReduce = FaultReduce.MIN
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    @validator('metric', always=True)
+    def validate_metric(cls, v, values):
+        if values.get('type') == FaultType.METRIC and not v:
+            raise ValueError("Las reglas de tipo 'metric' necesitan 'metric'.")
+        return v
+
+    @validator('max', always=True)
+    def validate_bounds(cls, v, values):
+        if v is None and values.get('min') is None:
+            raise ValueError("Una regla de fallo necesita 'min', 'max' o ambos.")
         return v
 
 # Renombrado de SquatParams a ExerciseParams para admitir múltiples ejercicios
@@ -53,12 +117,18 @@ class ExerciseParams(BaseModel):
     depth_fail_thresh: float
     peak_prominence: float
     peak_distance: int
+    fault_rules: List[FaultRule] = []
 
     @validator('metric_definitions')
     def check_unique_metric_names(cls, v):
         names = [metric.name for metric in v]
         if len(names) != len(set(names)):
             raise ValueError("Los nombres en 'metric_definitions' deben ser únicos.")
+        # Las métricas derivadas solo pueden usar métricas definidas antes que ellas
+        for i, metric in enumerate(v):
+            for source in metric.sources or []:
+                if source not in names[:i]:
+                    raise ValueError(f"La métrica '{metric.name}' usa '{source}', que no está definida antes.")
         return v
         
     @validator('rep_counter_metric')
@@ -69,10 +139,34 @@ class ExerciseParams(BaseModel):
                 raise ValueError(f"'{v}' no está definido en 'metric_definitions'.")
         return v
 
+    @validator('fault_rules')
+    def check_fault_rule_metrics_exist(cls, v, values):
+        if 'metric_definitions' in values:
+            defined_names = {metric.name for metric in values['metric_definitions']}
+            for rule in v:
+                for name in (rule.metric, rule.minus):
+                    if name is not None and name not in defined_names:
+                        raise ValueError(f"La regla '{rule.name}' usa '{name}', que no está en 'metric_definitions'.")
+        return v
+
 class PerformanceParams(BaseModel):
     """Parámetros para ajustar el rendimiento y el uso de recursos."""
     max_workers: int
     preprocess_size: Optional[List[int]]
+    prefetch_frames: int = 32
+    decode_workers: int = 1
+    decode_chunk_frames: int = 64
+    chunk_size: int = 64
+    ring_slots: int = 0
+    frame_store: str = 'auto'
+    render_mode: str = 'inline'
+    segment_warmup: int = 8
+    motion_threshold: float = 0.0
+    motion_max_skip: int = 15
+    keyframe_interval: int = 1
+    keyframe_velocity_thresh: float = 0.01
+    keyframe_error_thresh: float = 0.01
+    landmark_cache_mb: int = 512
 
 class PlotThemeParams(BaseModel):
     """Define los colores y estilos para un tema del gráfico."""
@@ -31,6 +31,34 @@ class MetricType(str, Enum):
     """Define los tipos de métricas que nuestro analizador puede calcular."""
     ANGLE = "angle"
     HEIGHT = "height"
+    DISTANCE = "distance"                                  # entre dos landmarks
+    HORIZONTAL_DISPLACEMENT = "horizontal_displacement"    # en x, respecto a otro landmark o a su posición inicial
+    TORSO_LEAN = "torso_lean"                              # inclinación del tronco respecto a la vertical
+    ANGULAR_VELOCITY = "angular_velocity"                  # derivada temporal de otra métrica
+    ANGULAR_ACCELERATION = "angular_acceleration"          # segunda derivada temporal de otra métrica
+    SYMMETRY = "symmetry"                                  # entre dos métricas (izquierda y derecha)
+
+class FaultType(str, Enum):
+    """Qué mide una regla de fallo: una métrica por fotograma o la duración del tramo."""
+    METRIC = "metric"
+    DURATION = "duration"
+
+class FaultWindow(str, Enum):
+    """Tramo de cada repetición sobre el que se evalúa una regla de fallo."""
+    REP = "rep"            # de inicio a final
+    DESCENT = "descent"    # de inicio al fondo
+    ASCENT = "ascent"      # del fondo al final
+
+class FaultReduce(str, Enum):
+    """Cómo se resume la métrica en el tramo: un valor por repetición."""
+    MIN = "min"
+    MAX = "max"
+    MEAN = "mean"
+    RANGE = "range"        # máximo - mínimo
+    RISE = "rise"          # valor al final del tramo - valor al principio
+
+# Número de landmarks que devuelve BlazePose por fotograma
+NUM_POSE_LANDMARKS = 33
 
 # Conexiones del modelo de pose de MediaPipe
 try:
@@ -1,3 +1,4 @@
+import json
 import sqlite3
 import logging
 from typing import Dict, Any, List
@@ -23,10 +24,15 @@ def init_db() -> None:
             """
             CREATE TABLE IF NOT EXISTS analysis_results(
                 id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, exercise_name TEXT, 
-                rep_count INTEGER, key_metric_avg REAL, video_path TEXT, metrics_df_json TEXT
+                rep_count INTEGER, key_metric_avg REAL, video_path TEXT, metrics_df_json TEXT,
+                reps_json TEXT
             )
             """
         )
+        # Bases de datos creadas antes de guardar la segmentación de repeticiones
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(analysis_results)")}
+        if "reps_json" not in columns:
+            conn.execute("ALTER TABLE analysis_results ADD COLUMN reps_json TEXT")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS exercises(
@@ -123,6 +129,36 @@ def get_analysis_results_by_exercise(exercise_name: str) -> list:
     conn.close()
     return [dict(row) for row in rows]
 
+def save_analysis_results(results: Dict[str, Any], settings: Dict[str, Any]) -> int:
+    """
+    Guarda el resultado de un análisis del pipeline y devuelve su ID. La
+    segmentación de repeticiones se guarda como JSON (``reps_json``) para no
+    tener que volver a detectarlas al consultar el análisis.
+    """
+    df = results.get("dataframe_metricas")
+    segmentation = results.get("segmentacion_repeticiones")
+    conn = get_db_connection()
+    with conn:
+        cur = conn.execute(
+            """
+            INSERT INTO analysis_results(
+                timestamp, exercise_name, rep_count, key_metric_avg, video_path, metrics_df_json, reps_json
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                datetime.utcnow().isoformat(),
+                results.get("exercise") or settings.get("exercise"),
+                results.get("repeticiones_contadas"),
+                results.get("key_metric_avg"),
+                results.get("debug_video_path") or settings.get("video_path"),
+                df.to_json(orient="split") if df is not None else None,
+                json.dumps(segmentation.to_dict()) if segmentation is not None else None,
+            ),
+        )
+        analysis_id = cur.lastrowid
+    conn.close()
+    return int(analysis_id)
+
 def get_exercises_by_group(muscle_group: str) -> List[Dict[str, Any]]:
     conn = get_db_connection()
     if muscle_group == "Todos":
@@ -12,6 +12,7 @@ import time
 # Importación directa de la función del pipeline y la configuración global
 from src.pipeline import run_full_pipeline_in_memory
 from src.config import settings as global_settings
+from src.B_pose_estimation.worker_pool import get_pose_worker_pool
 
 # Configuración de la página
 st.set_page_config(
@@ -21,6 +22,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_resource
+def _warm_pose_worker_pool():
+    """Arranca una sola vez por servidor el pool de pose que reutilizan todos los análisis."""
+    return get_pose_worker_pool()
+
+
+_warm_pose_worker_pool()
+
 # CSS personalizado para mejor apariencia
 st.markdown("""
 <style>
@@ -1,6 +1,9 @@
 # src/gui/gui_utils.py
 
+import cv2
+import numpy as np
 import pandas as pd
+from PyQt5.QtGui import QImage, QPixmap
 from typing import Optional
 
 METRICS_MAP = {
@@ -14,3 +17,10 @@ def get_first_available_series(df: pd.DataFrame, logical_name: str) -> Optional[
         if column_name in df.columns:
             return df[column_name]
     return None
+
+
+def bgr_to_pixmap(frame: np.ndarray) -> QPixmap:
+    """Convierte un fotograma BGR de OpenCV en un QPixmap (copiando los datos)."""
+    frame_rgb = np.ascontiguousarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    image = QImage(frame_rgb.data, frame_rgb.shape[1], frame_rgb.shape[0], frame_rgb.strides[0], QImage.Format_RGB888)
+    return QPixmap.fromImage(image)
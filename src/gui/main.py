@@ -18,6 +18,7 @@ from src.i18n.translator import Translator
 
 from src import database
 from src.database import save_training_plan
+from src.B_pose_estimation.worker_pool import get_pose_worker_pool, shutdown_pose_worker_pool
 from src.gui.pages.plans_page import sample_plan
 
 # Instancia global del traductor
@@ -105,11 +106,17 @@ def run_app():
     database.init_db()
     _ensure_active_plan()
 
+    # Arrancamos el pool de pose antes de crear la GUI: los workers cargan el modelo
+    # en segundo plano y se reutilizan en todos los análisis de la sesión
+    get_pose_worker_pool()
+
     app = QApplication(sys.argv)
     # No forzamos aquí el tema: _apply_theme del MainWindow leerá el checkbox
     window = MainWindow(project_root=PROJECT_ROOT, translator=translator)
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    shutdown_pose_worker_pool()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     run_app()
@@ -1,7 +1,6 @@
 # src/gui/main_window.py
 
 import os
-import cv2
 import logging
 from PyQt5.QtWidgets import (
     QMainWindow,
@@ -16,14 +15,16 @@ from PyQt5.QtWidgets import (
     QButtonGroup,
 )
 from PyQt5.QtCore import Qt, QSettings, QByteArray
-from PyQt5.QtGui import QPixmap, QImage, QTransform, QCloseEvent, QIcon
-from typing import Dict, Any, Optional
+from PyQt5.QtGui import QPixmap, QTransform, QCloseEvent, QIcon
+from typing import Dict, Any, Optional, Set
 
 import qtawesome as qta
 
 import src.constants as app_constants
 from src.gui.style_utils import load_stylesheet
-from src.gui.worker import AnalysisWorker
+from src.gui.worker import AnalysisWorker, PreviewWorker
+from src.gui.gui_utils import bgr_to_pixmap
+from src.A_preprocessing.video_preview import load_preview
 from src.config import settings
 from src import database
 from .pages import (
@@ -71,6 +72,8 @@ class MainWindow(QMainWindow):
         self.current_rotation: int = 0
         self.original_pixmap: Optional[QPixmap] = None
         self.current_exercise_name: Optional[str] = None
+        # Hilos que generan tiras de scrub; cada uno se suelta cuando termina
+        self._preview_workers: Set[PreviewWorker] = set()
 
         self.setWindowTitle(app_constants.APP_NAME)
         self.setWindowIcon(QIcon('assets/FitControl_logo.ico'))
@@ -238,13 +241,27 @@ class MainWindow(QMainWindow):
             logger.error(f"Fallo en autodetección de rotación: {e}")
             self.current_rotation = 0
 
-        cap = cv2.VideoCapture(path)
-        ret, frame = cap.read()
-        cap.release()
-        if ret:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.original_pixmap = QPixmap.fromImage(QImage(frame_rgb.data, frame_rgb.shape[1], frame_rgb.shape[0], frame_rgb.strides[0], QImage.Format_RGB888))
+        # La miniatura sale de la caché de previsualizaciones de la sesión; la tira
+        # de scrub se genera (o se carga) en segundo plano
+        session_dir = self._session_dir(path)
+        self.exercise_detail_page.analysis_page.video_display.set_scrub_preview(None)
+        try:
+            preview = load_preview(path, session_dir, build_strip=False)
+        except Exception as e:
+            logger.error(f"No se pudo generar la miniatura: {e}")
+            preview = None
+        if preview is not None:
+            self.original_pixmap = bgr_to_pixmap(preview.thumbnail)
             self._update_thumbnail()
+            # Las tiras de vídeos anteriores ya no sirven: se interrumpen, pero siguen
+            # referenciadas hasta que su hilo termina
+            for worker in self._preview_workers:
+                worker.requestInterruption()
+            worker = PreviewWorker(path, session_dir, parent=self)
+            worker.finished.connect(self._on_preview_ready)
+            worker.finished.connect(lambda *_, w=worker: self._release_preview_worker(w))
+            self._preview_workers.add(worker)
+            worker.start()
         
         self.exercise_detail_page.analysis_page.process_btn.setEnabled(True)
         self.exercise_detail_page.analysis_page.progress_bar.setValue(0)
@@ -254,6 +271,22 @@ class MainWindow(QMainWindow):
             self.nav_buttons[3].setEnabled(False)
         self._navigate(self.stack.indexOf(self.exercise_detail_page))
         
+    def _session_dir(self, video_path: str) -> str:
+        """Directorio de la sesión de un vídeo (el mismo que usa el pipeline)."""
+        output_dir = self.settings_page.output_dir_edit.text().strip() or '.'
+        return os.path.join(output_dir, os.path.splitext(os.path.basename(video_path))[0])
+
+    def _release_preview_worker(self, worker: PreviewWorker):
+        """Suelta un ``PreviewWorker`` terminado (su señal se emite justo antes de salir de ``run``)."""
+        self._preview_workers.discard(worker)
+        worker.wait()
+        worker.deleteLater()
+
+    def _on_preview_ready(self, path: str, preview):
+        """Activa el scrub de la previsualización si el vídeo sigue seleccionado."""
+        if preview is not None and path == self.video_path:
+            self.exercise_detail_page.analysis_page.video_display.set_scrub_preview(preview)
+
     def _on_rotation_requested(self, angle: int):
         """Manejador para la rotación manual de la previsualización del vídeo."""
         if self.original_pixmap is None:
@@ -267,6 +300,7 @@ class MainWindow(QMainWindow):
             return
         transform = QTransform().rotate(self.current_rotation)
         rotated_pixmap = self.original_pixmap.transformed(transform)
+        self.exercise_detail_page.analysis_page.video_display.set_rotation(self.current_rotation)
         self.exercise_detail_page.analysis_page.video_display.set_thumbnail(
             rotated_pixmap.scaled(
                 self.exercise_detail_page.analysis_page.video_display.size(),
@@ -366,6 +400,11 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event: QCloseEvent):
         """Guarda las preferencias del usuario al cerrar la aplicación."""
+        # Un QThread destruido mientras corre aborta la aplicación: paramos las tiras en curso
+        for worker in list(self._preview_workers):
+            worker.requestInterruption()
+        for worker in list(self._preview_workers):
+            worker.wait()
         self.q_settings.setValue(
             "output_dir", self.settings_page.output_dir_edit.text()
         )
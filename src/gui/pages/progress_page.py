@@ -1,3 +1,4 @@
+import json
 from typing import Dict, Any, List
 from io import StringIO
 from PyQt5.QtWidgets import (
@@ -20,6 +21,7 @@ import logging
 from ... import database
 from ..widgets.results_panel import ResultsPanel
 from src.config import settings
+from src.D_modeling.exercise_analyzer import RepSegmentation
 
 
 class ProgressPage(QWidget):
@@ -123,11 +125,19 @@ class ProgressPage(QWidget):
                 self.results_panel.clear_results()
                 self.results_panel.status_label.setText("Datos corruptos para este análisis.")
                 return
+        segmentation = None
+        reps_json = row.get("reps_json")
+        if reps_json:
+            try:
+                segmentation = RepSegmentation.from_dict(json.loads(reps_json))
+            except ValueError as e:
+                logging.warning("Segmentación de repeticiones corrupta en el análisis %s: %s", analysis_id, e)
         full_results = {
             "repeticiones_contadas": row.get("rep_count"),
             "debug_video_path": row.get("video_path"),
             "dataframe_metricas": df,
             "exercise": row.get("exercise_name"),
+            "segmentacion_repeticiones": segmentation,
         }
         self.results_panel.update_results(full_results)
 
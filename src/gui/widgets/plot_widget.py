@@ -7,10 +7,11 @@ import pyqtgraph as pg
 from PyQt5.QtCore import pyqtSignal, Qt, QPointF
 from PyQt5.QtGui import QGuiApplication
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 
 from src.gui.gui_utils import get_first_available_series
 from src.config import settings, ExerciseParams
+from src.D_modeling.exercise_analyzer import RepSegmentation
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,7 @@ class PlotWidget(QWidget):
         self._x_data: Optional[np.ndarray] = None
         self._is_dark_theme: bool = True
         self._plotted_curves: Dict[str, pg.PlotDataItem] = {}
+        self._rep_regions: List[pg.LinearRegionItem] = []
         
         self.plot_item = pg.PlotWidget()
         self._vb = self.plot_item.getPlotItem().getViewBox()
@@ -138,8 +140,13 @@ class PlotWidget(QWidget):
             if curve_idx < len(main_curve.yData):
                 self.marker.setData([frame_index], [main_curve.yData[curve_idx]])
 
-    def plot_data(self, df_metrics: pd.DataFrame, params: ExerciseParams) -> None:
-        """Dibuja las métricas desde el DataFrame y activa los elementos visuales."""
+    def plot_data(
+        self, df_metrics: pd.DataFrame, params: ExerciseParams, reps: Optional[RepSegmentation] = None
+    ) -> None:
+        """
+        Dibuja las métricas desde el DataFrame y activa los elementos visuales. Si se
+        pasa la segmentación de repeticiones, sombrea el tramo de cada una.
+        """
         # 1) Limpiamos todo lo anterior
         self.clear_plots()
         try:
@@ -170,6 +177,9 @@ class PlotWidget(QWidget):
                 self.h_line_high.setPos(params.high_thresh)
                 self.h_line_high.show()
             
+            if reps is not None:
+                self._add_rep_regions(reps, plot_params)
+
             self.legend.setVisible(bool(self._plotted_curves))
             self.plot_item.setTitle("Ángulos de Rodilla", color=plot_params.axis_color, size="12pt")
             self.plot_item.autoRange()
@@ -189,6 +199,18 @@ class PlotWidget(QWidget):
                                     symbol='o', symbolSize=5, symbolBrush=pen_color)
         self._plotted_curves[display_name] = curve
         
+    def _add_rep_regions(self, reps: RepSegmentation, plot_params) -> None:
+        """Sombrea el tramo [inicio, final] de cada repetición, alternando la intensidad."""
+        color = pg.mkColor(plot_params.vline_color)
+        for i, (start, end) in enumerate(zip(reps.start, reps.end)):
+            color.setAlpha(40 if i % 2 == 0 else 20)
+            region = pg.LinearRegionItem(
+                values=(int(start), int(end)), movable=False, brush=pg.mkBrush(color), pen=pg.mkPen(None)
+            )
+            region.setZValue(-10)
+            self.plot_item.addItem(region)
+            self._rep_regions.append(region)
+
     def set_curve_visibility(self, name: str, visible: bool):
         """Muestra u oculta una curva y actualiza la leyenda."""
         if name not in self._plotted_curves:
@@ -208,6 +230,9 @@ class PlotWidget(QWidget):
         for curve in self._plotted_curves.values():
             self.plot_item.removeItem(curve)
         self._plotted_curves.clear()
+        for region in self._rep_regions:
+            self.plot_item.removeItem(region)
+        self._rep_regions.clear()
         self._x_data = None
         self.v_line.hide()
         self.marker.clear()
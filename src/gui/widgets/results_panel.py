@@ -1,5 +1,6 @@
 # src/gui/widgets/results_panel.py
 
+import os
 import logging
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QListWidget, QFrame, QCheckBox, QGroupBox)
@@ -10,6 +11,7 @@ from typing import Dict, Any, Optional
 from .plot_widget import PlotWidget
 from .video_player import VideoPlayerWidget
 from src.config import settings
+from src.A_preprocessing.video_preview import load_preview
 
 logger = logging.getLogger(__name__)
 
@@ -129,7 +131,7 @@ class ResultsPanel(QWidget):
         self.status_label.setText("Estado: Análisis completado.")
         exercise_name = results.get("exercise", next(iter(settings.exercises)))
         exercise_params = settings.exercises.get(exercise_name)
-        self.plot_widget.plot_data(df, exercise_params)
+        self.plot_widget.plot_data(df, exercise_params, results.get("segmentacion_repeticiones"))
         
         curves_found = self.plot_widget._plotted_curves.keys()
         any_cb_visible = False
@@ -153,6 +155,13 @@ class ResultsPanel(QWidget):
         video_path = results.get("debug_video_path")
         if video_path:
             self.video_player.load_video(video_path)
+            # La tira de scrub del vídeo de depuración la genera el pipeline al renderizarlo
+            try:
+                self.video_player.set_scrub_preview(
+                    load_preview(video_path, os.path.dirname(video_path), build_strip=False)
+                )
+            except Exception as e:
+                logger.warning(f"Sin tira de scrub para el vídeo de depuración: {e}")
             self.video_player.media_player.positionChanged.connect(self.on_video_position_changed)
 
     def _create_box(self, title: str, widget: QWidget) -> QFrame:
@@ -1,7 +1,10 @@
 # src/gui/widgets/video_display.py
 import os
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QPushButton
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QEvent, pyqtSignal
+from PyQt5.QtGui import QTransform
+
+from src.gui.gui_utils import bgr_to_pixmap
 
 class VideoDisplayWidget(QWidget):
     file_dropped = pyqtSignal(str)
@@ -17,6 +20,12 @@ class VideoDisplayWidget(QWidget):
 
         self.image_label = QLabel(self.default_text, self)
         self.image_label.setAlignment(Qt.AlignCenter)
+        # Al pasar el ratón por encima se recorre el vídeo con la tira de scrub
+        self.image_label.setMouseTracking(True)
+        self.image_label.installEventFilter(self)
+        self._thumbnail = None
+        self._scrub_preview = None
+        self._rotation = 0
         self.image_label.setStyleSheet("color: #777; font-size: 16px; background: transparent;")
         main_layout.addWidget(self.image_label, 1) # El '1' le da stretch
 
@@ -57,10 +66,42 @@ class VideoDisplayWidget(QWidget):
 
     def set_thumbnail(self, pixmap):
         # --- CAMBIO CLAVE: Simplificado para no interferir con el layout ---
+        self._thumbnail = pixmap
         self.image_label.setPixmap(pixmap)
         self.show_controls(True)
 
+    def set_rotation(self, angle: int):
+        """Rotación con la que se muestran los fotogramas de la tira de scrub."""
+        self._rotation = angle
+
+    def set_scrub_preview(self, preview):
+        """Activa el scrub con la ``VideoPreview`` del vídeo (None lo desactiva)."""
+        self._scrub_preview = preview if preview is not None and preview.strip is not None else None
+
+    def eventFilter(self, obj, event):
+        if obj is self.image_label and event.type() == QEvent.MouseMove:
+            self._on_scrub_move(event)
+        return super().eventFilter(obj, event)
+
+    def _on_scrub_move(self, event):
+        """Muestra el fotograma de la tira correspondiente a la posición horizontal del ratón."""
+        preview = self._scrub_preview
+        if preview is None or self.image_label.width() <= 0:
+            return
+        fraction = min(max(event.x() / self.image_label.width(), 0.0), 1.0)
+        frame = preview.frame_at(fraction * (len(preview.strip) - 1) * preview.interval_ms)
+        pixmap = bgr_to_pixmap(frame).transformed(QTransform().rotate(self._rotation))
+        self.image_label.setPixmap(pixmap.scaled(self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def leaveEvent(self, event):
+        # Al salir del widget se vuelve a la miniatura
+        if self._scrub_preview is not None and self._thumbnail is not None:
+            self.image_label.setPixmap(self._thumbnail)
+        super().leaveEvent(event)
+
     def clear_content(self):
+        self._thumbnail = None
+        self._scrub_preview = None
         self.image_label.clear()
         self.image_label.setText(self.default_text)
         self.show_controls(False)
@@ -8,6 +8,8 @@ from PyQt5.QtMultimediaWidgets import QVideoWidget
 from PyQt5.QtCore import QUrl, Qt, QTimer, pyqtSignal
 from typing import Optional
 
+from src.gui.gui_utils import bgr_to_pixmap
+
 logger = logging.getLogger(__name__)
 
 class VideoPlayerWidget(QWidget):
@@ -22,6 +24,9 @@ class VideoPlayerWidget(QWidget):
         """Inicializa el reproductor, los widgets y el timer de animación."""
         super().__init__(parent)
         self._was_playing_before_drag: bool = False
+        # Tira de scrub del vídeo cargado: al arrastrar el slider se muestran sus
+        # fotogramas y el reproductor solo salta al soltarlo
+        self._scrub_preview = None
         
         # --- Creación de Widgets ---
         self.media_player = QMediaPlayer(None, QMediaPlayer.VideoSurface)
@@ -32,6 +37,10 @@ class VideoPlayerWidget(QWidget):
         
         self.position_slider = QSlider(Qt.Horizontal)
 
+        self.scrub_label = QLabel(self)
+        self.scrub_label.setAlignment(Qt.AlignCenter)
+        self.scrub_label.hide()
+
         self.speed_combo = QComboBox()
         self.speed_combo.addItems(['0.25x', '0.5x', '1.0x', '1.5x', '2.0x'])
         
@@ -45,7 +54,7 @@ class VideoPlayerWidget(QWidget):
         
         # --- Conexiones de Señales a Slots ---
         self.play_button.clicked.connect(self.toggle_play)
-        self.position_slider.sliderMoved.connect(self.set_position_ms)
+        self.position_slider.sliderMoved.connect(self._on_slider_moved)
         self.position_slider.sliderPressed.connect(self._on_slider_press)
         self.position_slider.sliderReleased.connect(self._on_slider_release)
         self.speed_combo.currentTextChanged.connect(self.set_playback_rate)
@@ -64,6 +73,7 @@ class VideoPlayerWidget(QWidget):
 
         main_layout = QVBoxLayout(self)
         main_layout.addWidget(video_widget)
+        main_layout.addWidget(self.scrub_label)
         main_layout.addLayout(controls_layout)
         
         self.media_player.setVideoOutput(video_widget)
@@ -98,6 +108,20 @@ class VideoPlayerWidget(QWidget):
         else:
             self.clear_media()
 
+    def set_scrub_preview(self, preview) -> None:
+        """Asigna la ``VideoPreview`` del vídeo cargado (None para buscar directamente en el vídeo)."""
+        self._scrub_preview = preview if preview is not None and preview.strip is not None else None
+
+    def _on_slider_moved(self, position_ms: int) -> None:
+        """Mientras se arrastra, muestra la tira de scrub si la hay; si no, busca en el vídeo."""
+        if self._scrub_preview is None:
+            self.set_position_ms(position_ms)
+            return
+        pixmap = bgr_to_pixmap(self._scrub_preview.frame_at(position_ms))
+        self.scrub_label.setPixmap(pixmap)
+        self.scrub_label.show()
+        self.smooth_position_changed.emit(position_ms)
+
     def set_playback_rate(self, text: str) -> None:
         """Ajusta la velocidad de reproducción a partir del texto del ComboBox."""
         rate_str = text.replace('x', '')
@@ -117,6 +141,10 @@ class VideoPlayerWidget(QWidget):
 
     def _on_slider_release(self) -> None:
         """Slot que se activa al soltar el clic del slider. Reanuda si estaba en play."""
+        if self._scrub_preview is not None:
+            # La búsqueda en el vídeo se hace una sola vez, al soltar
+            self.scrub_label.hide()
+            self.set_position_ms(self.position_slider.value())
         if self._was_playing_before_drag:
             self.media_player.play()
         self._was_playing_before_drag = False
@@ -149,6 +177,8 @@ class VideoPlayerWidget(QWidget):
         self.animation_timer.stop()
         self.media_player.stop()
         self.media_player.setMedia(QMediaContent())
+        self._scrub_preview = None
+        self.scrub_label.hide()
         self.play_button.setEnabled(False)
         self.speed_combo.setEnabled(False)
         self.speed_combo.setCurrentText('1.0x')
@@ -2,6 +2,7 @@
 import logging
 from PyQt5.QtCore import QThread, pyqtSignal
 from src.pipeline import run_full_pipeline_in_memory
+from src.A_preprocessing.video_preview import load_preview
 
 logger = logging.getLogger(__name__)
 
@@ -27,3 +28,22 @@ class AnalysisWorker(QThread):
         except Exception as e:
             logger.exception("Error durante la ejecución del pipeline en el WorkerThread")
             self.error.emit(str(e))
+
+
+class PreviewWorker(QThread):
+    """Genera (o carga de disco) la tira de scrub de un vídeo sin bloquear la GUI."""
+    finished = pyqtSignal(str, object)
+
+    def __init__(self, video_path, session_dir, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.session_dir = session_dir
+
+    def run(self):
+        try:
+            # Entre fotogramas se comprueba si la ventana pidió parar (otro vídeo o cierre)
+            preview = load_preview(self.video_path, self.session_dir, should_stop=self.isInterruptionRequested)
+        except Exception as e:
+            logger.error(f"No se pudo generar la previsualización de {self.video_path}: {e}")
+            preview = None
+        self.finished.emit(self.video_path, preview)
@@ -2,58 +2,38 @@
 
 import logging
 import os
+from functools import partial
 import pandas as pd
-import cv2
 from time import perf_counter
-import math
-from itertools import chain
-from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from typing import List, Dict, Any, Optional, Callable
 
 # Importación de la configuración global desde nuestro sistema Pydantic/YAML
 from src.config import settings as global_settings 
 # Importación del resto de módulos de nuestra aplicación
-from src.A_preprocessing.frame_extraction import extract_and_preprocess_frames
-from src.B_pose_estimation.estimators import BaseEstimator, EstimationResult
-from src.D_modeling.exercise_analyzer import calculate_metrics, count_repetitions, detect_faults
-from scipy.signal import find_peaks
-from src.F_visualization.drawing_utils import draw_landmarks_from_dicts
+from src.A_preprocessing.frame_extraction import FramePreprocessor, FrameStream
+from src.A_preprocessing.video_preview import ScrubStripBuilder, save_preview, scrub_interval_ms
+from src.B_pose_estimation.landmarks import LandmarkSequence
+from src.B_pose_estimation.frame_transport import (
+    MemmapFrameStore, SharedFrameRing, create_frame_ring, should_spill
+)
+from src.B_pose_estimation.filtering import filter_landmarks
+from src.B_pose_estimation.landmark_cache import CACHE_DIRNAME, LandmarkCache
+from src.B_pose_estimation.segments import SegmentBuilder, plan_segments
+from src.B_pose_estimation.worker_pool import get_pose_worker_pool, process_ring_slots
+from src.D_modeling.exercise_analyzer import RepSegmentation, calculate_metrics, detect_faults, segment_repetitions
+from src.F_visualization.drawing_utils import SkeletonRenderer
+from src.F_visualization.video_renderer import DEFAULT_WRITER_QUEUE, StreamingVideoWriter
+from src.stage_graph import Stage, StageGraph
 
 logger = logging.getLogger(__name__)
 
 
-def _process_frame_chunk(frames_chunk: List[np.ndarray]) -> List[EstimationResult]:
-    """
-    Función worker que se ejecuta en un proceso separado.
-    Procesa un "trozo" (chunk) de fotogramas. Es auto-contenida para ser segura
-    en el multiprocesamiento.
-    """
-    # Importamos y creamos el estimador DENTRO del proceso hijo
-    from src.B_pose_estimation.estimators import BlazePose3DEstimator, CroppedPoseEstimator
-    from src.config import settings
-    
-    # Creamos el estimador basándonos en la configuración global
-    estimator: BaseEstimator = BlazePose3DEstimator() if settings.analysis_params.use_3d_analysis else CroppedPoseEstimator()
-    
-    results = []
-    for frame in frames_chunk:
-        try:
-            result = estimator.estimate(frame)
-            results.append(result)
-        except Exception as e:
-            logger.error(f"Error procesando un frame en un worker: {e}")
-            # Devolvemos un resultado vacío con la imagen original para no romper la secuencia
-            results.append(EstimationResult(annotated_image=frame))
-            
-    estimator.close()
-    return results
-
-
 def run_full_pipeline_in_memory(
     video_path: str, 
     settings: Dict[str, Any], 
-    progress_callback: Optional[Callable[[int, str], None]] = None
+    progress_callback: Optional[Callable[[int, str], None]] = None,
+    stage_progress_callback: Optional[Callable[[Dict[str, int]], None]] = None
 ) -> Dict[str, Any]:
     """
     Ejecuta el pipeline completo de análisis en memoria, con procesamiento en paralelo,
@@ -63,6 +43,8 @@ def run_full_pipeline_in_memory(
         video_path: Ruta al fichero de vídeo a analizar.
         settings: Diccionario con los ajustes de la sesión actual de la GUI (output_dir, rotate, etc.).
         progress_callback: Función opcional para reportar el progreso a la GUI.
+        stage_progress_callback: Función opcional que recibe, periódicamente, los
+            fotogramas procesados por cada etapa del grafo ({'decode': n, ...}).
 
     Returns:
         Un diccionario con los resultados del análisis.
@@ -82,109 +64,315 @@ def run_full_pipeline_in_memory(
         mode = '3D' if global_settings.analysis_params.use_3d_analysis else '2D'
         notify(0, f"Inicializando pipeline en modo {mode}...")
 
-        # --- FASE 1: Extracción ---
-        t0 = perf_counter()
-        notify(5, "FASE 1: Extrayendo fotogramas...")
-        original_frames, fps = extract_and_preprocess_frames(video_path, settings.get('rotate'), settings.get('sample_rate', 1))
-        timings['fase_1_extraction'] = perf_counter() - t0
-        if not original_frames: raise ValueError("No se pudieron extraer fotogramas.")
-        
-        # --- PASO DE OPTIMIZACIÓN: Pre-redimensionado ---
-        frames_to_process = original_frames
-        if global_settings.performance_params.preprocess_size:
-            t0_resize = perf_counter()
-            w, h = global_settings.performance_params.preprocess_size
-            logger.info(f"Redimensionando {len(original_frames)} frames a ({w}x{h}) para optimizar rendimiento...")
-            frames_to_process = [cv2.resize(f, (w, h), interpolation=cv2.INTER_LINEAR) for f in original_frames]
-            timings['fase_1a_resizing'] = perf_counter() - t0_resize
-            
-        # --- FASE 2: Estimación de Pose en Paralelo ---
+        # --- FASES 1 y 2: Grafo de etapas concurrentes ---
+        # decode -> resize -> dispatch -> pose [-> render] se ejecutan a la vez, cada
+        # una en su hilo y unidas por colas acotadas, de modo que el tiempo total se
+        # acerca al de la etapa más lenta y la memoria no crece con la duración del clip.
+        notify(5, "FASE 1: Preparando el grafo de etapas...")
+        perf = global_settings.performance_params
+        generate_video = settings.get('generate_debug_video', global_settings.analysis_params.generate_debug_video)
+        # 'inline' dibuja sobre los originales mientras viajan por el grafo; 'redecode' solo
+        # guarda los landmarks y vuelve a decodificar el vídeo para renderizar al final
+        render_mode = settings.get('render_mode', perf.render_mode)
+        inline_video = generate_video and render_mode != 'redecode'
+        resize_to = tuple(perf.preprocess_size) if perf.preprocess_size else None
+        # Sin vídeo de depuración nadie necesita el original rotado: la rotación se
+        # fusiona con el redimensionado y la conversión a RGB al copiar al anillo
+        rotate = settings.get('rotate')
+        preprocessor = FramePreprocessor(None if inline_video else rotate, resize_to, to_rgb=True)
+
+        def open_stream(rotate_frames: bool) -> FrameStream:
+            return FrameStream(
+                video_path, rotate if rotate_frames else None, settings.get('sample_rate', 1), prefetch=0,
+                motion_threshold=perf.motion_threshold, motion_max_skip=perf.motion_max_skip,
+                decode_workers=perf.decode_workers, decode_chunk=perf.decode_chunk_frames
+            )
+
+        stream = open_stream(inline_video)
+        fps = stream.fps
+
+        # Pool persistente: los workers ya tienen el estimador cargado de análisis anteriores
+        pool = get_pose_worker_pool()
+        workers = pool.max_workers
+        # Segmentos de chunk_size fotogramas; el anillo se dimensiona para los que van en vuelo
+        plan = plan_segments(perf.chunk_size, perf.segment_warmup, workers, perf.ring_slots)
+        batch_size, warmup, max_in_flight = plan.segment_size, plan.warmup, plan.max_in_flight
+        expected_frames = max(1, stream.expected_frames)
+        keyframes = None
+        if perf.keyframe_interval > 1:
+            keyframes = {
+                'interval': perf.keyframe_interval,
+                'velocity_thresh': perf.keyframe_velocity_thresh,
+                'error_thresh': perf.keyframe_error_thresh,
+            }
+
+        # Caché de landmarks: si este clip ya se analizó con la misma configuración de
+        # extracción y estimador, nos saltamos la estimación de pose por completo
+        cache: Optional[LandmarkCache] = None
+        cache_key = None
+        cached_landmarks: Optional[LandmarkSequence] = None
+        if perf.landmark_cache_mb > 0:
+            try:
+                cache = LandmarkCache(os.path.join(output_dir, CACHE_DIRNAME), perf.landmark_cache_mb * 1024 * 1024)
+                cache_key = cache.make_key(
+                    video_path, settings.get('rotate'), stream.sample_rate, resize_to,
+                    {**pool.estimator_settings, 'batch_size': batch_size, 'warmup': warmup, 'keyframes': keyframes},
+                    sampling=stream.sampling_settings if stream.motion_threshold > 0 else None
+                )
+                cached_landmarks = cache.get(cache_key)
+            except OSError as e:
+                logger.warning(f"Caché de landmarks no disponible: {e}")
+                cache = None
+
+        landmark_batches: List[np.ndarray] = []
+        # Instante real de cada fotograma: con muestreo por movimiento no es uniforme
+        timestamps: List[float] = []
+        n_collected = 0
+        n_inferred = 0
+        n_rendered = 0
+        # El anillo se crea con el primer fotograma, cuando ya conocemos su tamaño. Si los
+        # fotogramas en vuelo no caben cómodamente en RAM, anillo y originales van a disco
+        ring: Optional[SharedFrameRing] = None
+        originals: Optional[MemmapFrameStore] = None
+        # Slot de ``originals`` de cada fotograma en vuelo, por índice de fotograma
+        original_slots: Dict[int, int] = {}
+        debug_video_path = None
+        # El vídeo de depuración se codifica en un hilo propio a medida que se dibuja
+        writer: Optional[StreamingVideoWriter] = None
+        if inline_video:
+            writer = StreamingVideoWriter(os.path.join(session_dir, f"{base_name}_debug.mp4"), fps)
+
+        def resize_stage(items):
+            """Preprocesa cada fotograma directamente sobre un slot libre del anillo compartido."""
+            nonlocal ring, originals
+            for item in items:
+                if ring is None:
+                    frame_shape = preprocessor.output_shape(item.frame.shape)
+                    # Los originales esperan al render mientras sus fotogramas pasan por la pose
+                    originals_slots = plan.ring_slots + perf.prefetch_frames + DEFAULT_WRITER_QUEUE + 2
+                    in_flight_bytes = plan.ring_slots * int(np.prod(frame_shape))
+                    if inline_video:
+                        in_flight_bytes += originals_slots * item.frame.nbytes
+                    spill = should_spill(in_flight_bytes, perf.frame_store)
+                    ring = create_frame_ring(plan.ring_slots, frame_shape, session_dir, spill=spill)
+                    if spill and inline_video:
+                        originals = MemmapFrameStore(originals_slots, item.frame.shape, session_dir)
+                    logger.info(
+                        f"Enviando segmentos de {batch_size} fotogramas (+{warmup} de calentamiento) a {workers} procesos."
+                    )
+
+                # Backpressure: si el anillo está lleno esperamos a que se libere un slot
+                with graph.waiting('resize'):
+                    while not ring.wait_for_slot(timeout=0.1):
+                        graph.check_stopped()
+                slot = ring.acquire()
+                preprocessor(item.frame, out=ring.frames[slot])
+                if originals is not None:
+                    # El original pasa al almacén en disco y sigue adelante como vista sin copia
+                    with graph.waiting('resize'):
+                        while not originals.wait_for_slot(timeout=0.1):
+                            graph.check_stopped()
+                    original_slot = originals.acquire()
+                    np.copyto(originals.frames[original_slot], item.frame)
+                    original_slots[item.index] = original_slot
+                    item = item._replace(frame=originals.frames[original_slot])
+                # El original solo sigue adelante si el vídeo de depuración se renderiza aquí
+                yield (item if inline_video else item._replace(frame=None)), slot
+
+        def dispatch_stage(entries):
+            """Agrupa los slots en segmentos con calentamiento y los envía al pool de pose."""
+            def submit(segment):
+                future = pool.submit(process_ring_slots, ring.ref, segment.slots, segment.warmup, keyframes)
+                return future, segment
+
+            builder = None
+            for item, slot in entries:
+                if builder is None:
+                    builder = SegmentBuilder(ring, batch_size, warmup)
+                segment = builder.add(slot, item)
+                if segment is not None:
+                    yield submit(segment)
+            segment = builder.flush() if builder is not None else None
+            if segment is not None:
+                yield submit(segment)
+
+        def pose_stage(submitted):
+            """Espera los landmarks de cada segmento en orden, libera sus slots y acumula la secuencia."""
+            nonlocal n_collected, n_inferred
+            for future, segment in submitted:
+                try:
+                    packed, segment_inferred = future.result()
+                finally:
+                    ring.release(segment.slots)
+                landmark_batches.append(packed)
+                timestamps.extend(item.timestamp for item in segment.items)
+                n_collected += len(packed)
+                n_inferred += segment_inferred
+                if inline_video:
+                    yield from zip(segment.items, packed[:, 0])
+
+        # Tira de scrub del vídeo de depuración, construida con los fotogramas que ya se renderizan
+        scrub_builder = ScrubStripBuilder(scrub_interval_ms(expected_frames / (fps or 30.0)))
+
+        def render_stage(annotated):
+            """Dibuja el esqueleto sobre los originales y los entrega al codificador."""
+            is_dark_theme = settings.get('dark_mode', True)
+            theme_params = global_settings.drawing.dark_theme if is_dark_theme else global_settings.drawing.light_theme
+            skeleton = SkeletonRenderer(
+                line_color=theme_params.skeleton.line_color_bgr,
+                point_color=theme_params.skeleton.point_color_bgr,
+                line_thickness=theme_params.skeleton.thickness,
+                point_radius=theme_params.skeleton.radius
+            )
+            for item, frame_landmarks in annotated:
+                frame_to_draw = item.frame
+                skeleton.draw(frame_to_draw, frame_landmarks)
+                # Posición del fotograma en el vídeo de depuración, que se escribe a ``fps``
+                position_ms = item.index * 1000.0 / (fps or 30.0)
+                if item.index == 0 or scrub_builder.wants(position_ms):
+                    scrub_builder.add(position_ms, frame_to_draw)
+                # Un original del almacén en disco se libera cuando el codificador lo ha escrito
+                original_slot = original_slots.pop(item.index, None)
+                on_written = partial(originals.release, [original_slot]) if original_slot is not None else None
+                # Si el codificador va por detrás, esperamos a que haya hueco en su cola
+                with graph.waiting('render'):
+                    writer.write(frame_to_draw, on_written)
+                yield item.index
+
+        def lookup_stage(items):
+            """Al volver a decodificar, empareja cada fotograma con sus landmarks ya calculados."""
+            nonlocal n_rendered
+            for item in items:
+                if item.index >= len(landmarks):
+                    break
+                n_rendered += 1
+                yield item, landmarks.image[item.index]
+
+        # Sin estimar la pose (acierto de caché) o con render_mode 'redecode', el vídeo de
+        # depuración se renderiza en una segunda pasada que vuelve a decodificar el original
+        render_pass = generate_video and (not inline_video or cached_landmarks is not None)
+        stages = []
+        if cached_landmarks is None:
+            stages = [
+                Stage('decode', lambda source: source, queue_size=perf.prefetch_frames),
+                Stage('resize', resize_stage, queue_size=batch_size),
+                Stage('dispatch', dispatch_stage, queue_size=max_in_flight),
+                Stage('pose', pose_stage, queue_size=perf.prefetch_frames),
+            ]
+            if inline_video:
+                stages.append(Stage('render', render_stage))
+
+        # Trabajo total en fotogramas: la estimación de pose y, si la hay, la pasada de render
+        total_work = expected_frames * ((cached_landmarks is None) + render_pass)
+        last_progress = 5
+        def on_progress(counts: Dict[str, int]) -> None:
+            nonlocal last_progress
+            logger.debug("Progreso por etapa: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+            if stage_progress_callback:
+                stage_progress_callback(counts)
+            # El progreso global lo marcan los fotogramas con landmarks recogidos o renderizados (15% -> 90%)
+            progress = 15 + int(75 * min(1.0, (n_collected + n_rendered) / total_work))
+            if progress != last_progress and progress_callback:
+                progress_callback(progress)
+            last_progress = progress
+
         t0 = perf_counter()
-        notify(15, "FASE 2: Estimando pose en paralelo...")
-        
-        workers = global_settings.performance_params.max_workers
-        if workers <= 0: workers = max(1, os.cpu_count() - 1)
-        
-        chunk_size = math.ceil(len(frames_to_process) / workers)
-        frame_chunks = [frames_to_process[i:i + chunk_size] for i in range(0, len(frames_to_process), chunk_size)]
-        
-        logger.info(f"Distribuyendo {len(frames_to_process)} fotogramas en {len(frame_chunks)} trozos para {workers} procesos.")
-        
-        with ProcessPoolExecutor(max_workers=workers) as executor:
-            results_in_chunks = list(executor.map(_process_frame_chunk, frame_chunks))
-        
-        estimation_results = list(chain.from_iterable(results_in_chunks))
-        
-        notify(75, "FASE 2: Estimación de pose completada.")
-        timings['fase_2_pose_estimation'] = perf_counter() - t0
-        
+        try:
+            if stages:
+                notify(15, "FASE 2: Decodificando y estimando la pose en paralelo...")
+                graph = StageGraph(stream, stages)
+                graph.run(on_progress=on_progress)
+                timings.update(graph.timings())
+        finally:
+            try:
+                # Esperamos a que el codificador vacíe su cola y cierre el fichero
+                if writer is not None:
+                    writer.close()
+            finally:
+                for store in (ring, originals):
+                    if store is not None:
+                        store.close()
+        timings['stages_wall'] = perf_counter() - t0
+
+        if cached_landmarks is not None:
+            landmarks = cached_landmarks
+        else:
+            if not landmark_batches: raise ValueError("No se pudieron extraer fotogramas.")
+            landmarks = LandmarkSequence.from_packed(np.concatenate(landmark_batches), np.asarray(timestamps))
+            del landmark_batches
+            if cache is not None:
+                cache.put(cache_key, landmarks)
+
+        if render_pass:
+            # Segunda pasada: solo los landmarks siguen en memoria; los originales se
+            # vuelven a decodificar (con el mismo muestreo) y se dibujan en streaming
+            t0 = perf_counter()
+            if cached_landmarks is None:
+                notify(15 + int(75 * n_collected / total_work), "FASE 2: Re-decodificando el vídeo para renderizarlo...")
+            else:
+                notify(15, "FASE 2: Landmarks en caché; solo se renderiza el vídeo de depuración...")
+            writer = StreamingVideoWriter(os.path.join(session_dir, f"{base_name}_debug.mp4"), fps)
+            try:
+                graph = StageGraph(open_stream(True), [
+                    Stage('decode', lambda source: source, queue_size=perf.prefetch_frames),
+                    Stage('lookup', lookup_stage, queue_size=perf.prefetch_frames),
+                    Stage('render', render_stage),
+                ])
+                graph.run(on_progress=on_progress)
+                timings.update({f"redecode_{k}": v for k, v in graph.timings().items()})
+            finally:
+                writer.close()
+            timings['redecode_wall'] = perf_counter() - t0
+
+        if writer is not None:
+            timings['encode_busy'], timings['encode_idle'] = writer.busy, writer.idle
+            if writer.frames_written:
+                debug_video_path = writer.output_path
+                preview = scrub_builder.build()
+                if preview is not None:
+                    save_preview(debug_video_path, session_dir, preview)
+        # Fracción de fotogramas en los que se ejecutó el modelo (0 si los landmarks venían de la caché)
+        inference_ratio = n_inferred / len(landmarks) if len(landmarks) else 0.0
+        logger.info(
+            f"Se han procesado {len(landmarks)} fotogramas en streaming ({landmarks.valid.sum()} con pose, "
+            f"modelo ejecutado en el {inference_ratio:.0%})."
+        )
+        notify(90, "FASE 2: Estimación de pose completada.")
+
         # --- FASE 3: Análisis Unificado y Data-Driven ---
         t0 = perf_counter()
-        notify(80, "FASE 3: Analizando métricas y repeticiones...")
+        notify(92, "FASE 3: Analizando métricas y repeticiones...")
         
         selected_exercise = settings.get('exercise', next(iter(global_settings.exercises)))
         exercise_params = global_settings.exercises[selected_exercise]
 
+        # Huecos cortos y ruido del estimador se corrigen sobre el tensor completo antes de las métricas
+        analysis = global_settings.analysis_params
+        landmarks = filter_landmarks(
+            landmarks, fps, mode=analysis.landmark_filter, max_gap_s=analysis.landmark_max_gap_s,
+            window_s=analysis.landmark_smoothing_s, polyorder=analysis.landmark_polyorder
+        )
+        timings['filter'] = perf_counter() - t0
+
         df_metrics = calculate_metrics(
-            estimation_results,
+            landmarks,
             fps,
             metric_definitions=exercise_params.metric_definitions
         )
 
-        key_metric_avg = None
-        metric_col = exercise_params.rep_counter_metric
-        if not df_metrics.empty and metric_col in df_metrics.columns:
-            try:
-                metric_series = df_metrics[metric_col].ffill().bfill()
-                inverted = -metric_series.to_numpy()
-                valleys, _ = find_peaks(
-                    inverted,
-                    height=-exercise_params.low_thresh,
-                    prominence=exercise_params.peak_prominence,
-                    distance=exercise_params.peak_distance,
-                )
-                if len(valleys) > 0:
-                    key_metric_avg = float(metric_series.iloc[valleys].mean())
-            except Exception as e:
-                logger.error(f"Error calculando key_metric_avg: {e}")
+        # Una sola detección de repeticiones: de ella salen el conteo, la métrica clave,
+        # los fallos y las posiciones que usan la GUI y la base de datos
+        try:
+            rep_segmentation = segment_repetitions(df_metrics, exercise_params)
+        except Exception as e:
+            logger.error(f"Error segmentando las repeticiones: {e}")
+            rep_segmentation = RepSegmentation(metric=exercise_params.rep_counter_metric)
+        n_reps = rep_segmentation.count
+        key_metric_avg = rep_segmentation.key_metric_avg
 
-        n_reps = count_repetitions(df_metrics, params=exercise_params)
+        faults_detected = detect_faults(df_metrics, rep_segmentation, exercise_params)
+        timings['analysis'] = perf_counter() - t0
         
-        faults_detected = detect_faults(df_metrics, {"reps": n_reps})
-        timings['fase_3_analysis'] = perf_counter() - t0
-        
-        # --- FASE EXTRA: Renderizado de Vídeo de Alta Calidad ---
-        debug_video_path = None
-        if settings.get('generate_debug_video', global_settings.analysis_params.generate_debug_video):
-            t0 = perf_counter()
-            notify(98, "FASE EXTRA: Renderizando vídeo de depuración HQ...")
-            
-            is_dark_theme = settings.get('dark_mode', True)
-            theme_params = global_settings.drawing.dark_theme if is_dark_theme else global_settings.drawing.light_theme
-            
-            annotated_frames_hq = []
-            for original_frame, result in zip(original_frames, estimation_results):
-                frame_to_draw = original_frame.copy()
-                if result.landmarks:
-                    draw_landmarks_from_dicts(
-                        image=frame_to_draw, 
-                        landmarks=result.landmarks,
-                        line_color=tuple(theme_params.skeleton.line_color_bgr),
-                        point_color=tuple(theme_params.skeleton.point_color_bgr),
-                        line_thickness=theme_params.skeleton.thickness,
-                        point_radius=theme_params.skeleton.radius
-                    )
-                annotated_frames_hq.append(frame_to_draw)
-            
-            if annotated_frames_hq:
-                height, width, _ = annotated_frames_hq[0].shape
-                output_path = os.path.join(session_dir, f"{base_name}_debug.mp4")
-                writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
-                for fr in annotated_frames_hq: writer.write(fr)
-                writer.release()
-                debug_video_path = output_path
-            timings['fase_extra_video_render'] = perf_counter() - t0
-
         if settings.get('debug_mode', global_settings.analysis_params.debug_mode) and not df_metrics.empty:
             metric_file = os.path.join(session_dir, f"{base_name}_metrics.csv")
             df_metrics.to_csv(metric_file, index=False)
@@ -199,10 +387,12 @@ def run_full_pipeline_in_memory(
             "repeticiones_contadas": n_reps,
             "dataframe_metricas": df_metrics,
             "key_metric_avg": key_metric_avg,
+            "segmentacion_repeticiones": rep_segmentation,
             "debug_video_path": debug_video_path,
             "fallos_detectados": faults_detected,
             "fps": fps, # Añadimos fps a los resultados para que la GUI lo use
-            "exercise": selected_exercise
+            "exercise": selected_exercise,
+            "inference_ratio": inference_ratio
         }
 
     except Exception as e:
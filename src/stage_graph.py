@@ -0,0 +1,197 @@
+# src/stage_graph.py
+"""
+Ejecutor de un grafo lineal de etapas concurrentes. Cada etapa corre en su propio
+hilo y se conecta con la siguiente mediante una cola acotada, de modo que una etapa
+lenta frena a las anteriores (backpressure) en lugar de acumular datos en memoria.
+El tiempo total tiende al de la etapa más lenta y no a la suma de todas.
+
+Una etapa es una función ``fn(entradas) -> salidas`` que recibe un iterable y
+devuelve otro (normalmente un generador), así que puede agrupar, filtrar o
+expandir elementos. Para cada etapa se mide el tiempo ocupado (``busy``) y el
+tiempo esperando a la etapa anterior o a la siguiente (``idle``).
+"""
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marcador de fin de stream entre etapas
+_END_OF_STREAM = object()
+# Intervalo (s) con el que las esperas comprueban si el grafo se ha detenido
+_POLL_INTERVAL = 0.1
+
+
+class StageGraphStopped(Exception):
+    """Se lanza dentro de una etapa cuando el grafo se detiene por un error en otra etapa."""
+
+
+@dataclass
+class Stage:
+    """
+    Una etapa del grafo.
+
+    Attributes:
+        name: Nombre de la etapa (se usa en logs, progreso y tiempos).
+        fn: Transformación ``iterable -> iterable``. La primera etapa recibe la fuente.
+        queue_size: Capacidad de la cola de salida hacia la siguiente etapa.
+    """
+    name: str
+    fn: Callable[[Iterable[Any]], Iterable[Any]]
+    queue_size: int = 8
+
+
+@dataclass
+class StageStats:
+    """Contadores de una etapa: elementos producidos y tiempos ocupado/en espera."""
+    items: int = 0
+    busy: float = 0.0
+    idle: float = 0.0
+    _start: float = field(default=0.0, repr=False)
+
+
+class StageGraph:
+    """
+    Ejecuta ``source -> stage_1 -> ... -> stage_n`` con un hilo por etapa. La salida
+    de la última etapa se descarta, así que la última etapa es el sumidero (escribe,
+    acumula, etc.). Si cualquier etapa falla, el grafo se detiene y ``run`` relanza
+    la primera excepción.
+    """
+    def __init__(self, source: Iterable[Any], stages: List[Stage]):
+        if not stages:
+            raise ValueError("El grafo necesita al menos una etapa.")
+        self.source = source
+        self.stages = stages
+        self.stats: Dict[str, StageStats] = {stage.name: StageStats() for stage in stages}
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    @property
+    def stopped(self) -> bool:
+        """True si el grafo se está deteniendo por un error."""
+        return self._stop.is_set()
+
+    def check_stopped(self) -> None:
+        """Para etapas que esperan recursos externos: lanza ``StageGraphStopped`` si el grafo se detiene."""
+        if self._stop.is_set():
+            raise StageGraphStopped()
+
+    @contextmanager
+    def waiting(self, stage_name: str):
+        """Contabiliza como tiempo idle de la etapa una espera por un recurso externo (p. ej. un slot libre)."""
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.stats[stage_name].idle += perf_counter() - t0
+
+    def progress(self) -> Dict[str, int]:
+        """Elementos producidos hasta ahora por cada etapa."""
+        return {name: stats.items for name, stats in self.stats.items()}
+
+    def timings(self) -> Dict[str, float]:
+        """Tiempos ocupado y en espera de cada etapa, como ``{'<etapa>_busy': s, '<etapa>_idle': s}``."""
+        result = {}
+        for name, stats in self.stats.items():
+            result[f"{name}_busy"] = stats.busy
+            result[f"{name}_idle"] = stats.idle
+        return result
+
+    # --- Comunicación entre etapas ---
+
+    def _get(self, inbox: queue.Queue, stats: StageStats) -> Iterator[Any]:
+        """Itera la cola de entrada contabilizando la espera como tiempo idle."""
+        while True:
+            t0 = perf_counter()
+            while True:
+                self.check_stopped()
+                try:
+                    item = inbox.get(timeout=_POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    continue
+            stats.idle += perf_counter() - t0
+            if item is _END_OF_STREAM:
+                return
+            yield item
+
+    def _put(self, outbox: queue.Queue, item: Any, stats: StageStats) -> None:
+        """Encola un elemento para la etapa siguiente; esperar por una cola llena cuenta como idle."""
+        t0 = perf_counter()
+        while True:
+            self.check_stopped()
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        stats.idle += perf_counter() - t0
+
+    def _run_stage(self, stage: Stage, inputs: Iterable[Any], outbox: Optional[queue.Queue]) -> None:
+        stats = self.stats[stage.name]
+        stats._start = perf_counter()
+        try:
+            for item in stage.fn(inputs):
+                stats.items += 1
+                if outbox is not None:
+                    self._put(outbox, item, stats)
+            if outbox is not None:
+                self._put(outbox, _END_OF_STREAM, stats)
+        except StageGraphStopped:
+            pass
+        except BaseException as e:
+            with self._error_lock:
+                if self._error is None:
+                    self._error = e
+                    logger.error(f"Error en la etapa '{stage.name}': {e}")
+            self._stop.set()
+        finally:
+            stats.busy = max(0.0, perf_counter() - stats._start - stats.idle)
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+        interval: float = 0.25
+    ) -> None:
+        """
+        Arranca todas las etapas y espera a que terminen. ``on_progress`` se llama
+        desde el hilo que invoca ``run`` cada ``interval`` segundos con el progreso
+        por etapa, así que es seguro usarlo con callbacks de interfaz.
+        """
+        threads = []
+        inputs: Iterable[Any] = self.source
+        for i, stage in enumerate(self.stages):
+            is_last = i == len(self.stages) - 1
+            outbox = None if is_last else queue.Queue(maxsize=max(1, stage.queue_size))
+            thread = threading.Thread(
+                target=self._run_stage, args=(stage, inputs, outbox),
+                name=f"stage-{stage.name}", daemon=True
+            )
+            threads.append(thread)
+            if outbox is not None:
+                inputs = self._get(outbox, self.stats[self.stages[i + 1].name])
+
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=interval)
+                    if on_progress:
+                        on_progress(self.progress())
+        finally:
+            # Si el llamador se interrumpe, detenemos el resto de etapas
+            if any(thread.is_alive() for thread in threads):
+                self._stop.set()
+                for thread in threads:
+                    thread.join()
+
+        if self._error is not None:
+            raise self._error
+        if on_progress:
+            on_progress(self.progress())